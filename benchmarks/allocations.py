@@ -0,0 +1,84 @@
+"""Count the wrapper objects that scanning and parsing allocate for each token.
+
+Run this on two revisions to compare them, the counts don't depend on the speed of the machine.
+"""
+
+import argparse
+import cProfile
+import pstats
+import timeit
+
+from koda import Err, Just, Ok
+
+from wode.parser import ParserState, parse_all, parse_expression
+from wode.scanner import ScannerState, scan_all_tokens, scan_one_token
+from wode.source import Source
+from wode.token_type import TokenType
+
+# The constructors whose calls are counted
+COUNTED_CLASSES = [Just, Ok, Err, ScannerState, ParserState]
+
+
+def generate_source(n_statements: int) -> Source:
+    lines = [f"foo_{i % 10} + {i} * bar - {i}.5 ^ -baz;" for i in range(n_statements)]
+    return Source(None, "\n".join(lines))
+
+
+def scan_with_states(source: Source) -> None:
+    # The `Maybe` and `Result` based API, one scanner state at a time
+    state = ScannerState(source)
+    while True:
+        result, state = scan_one_token(state)
+        match result:
+            case Ok(Just(token)) if token.token_type == TokenType.EOF:
+                return
+            case _:
+                pass
+
+
+def parse_with_states(source: Source, tokens) -> None:
+    state = ParserState(tokens, source)
+    while state.chomp()[0].token_type != TokenType.EOF:
+        _, state = parse_expression(state, 0)
+        if state.chomp()[0].token_type == TokenType.SEMICOLON:
+            state = state.chomp()[1]
+
+
+def count_allocations(f) -> dict:
+    profile = cProfile.Profile()
+    profile.runcall(f)
+    stats = getattr(pstats.Stats(profile), "stats")
+    counts = {}
+    for cls in COUNTED_CLASSES:
+        code = cls.__init__.__code__
+        key = (code.co_filename, code.co_firstlineno, code.co_name)
+        counts[cls.__name__] = stats[key][1] if key in stats else 0
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--statements", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    source = generate_source(args.statements)
+    tokens, _ = scan_all_tokens(source)
+    n_tokens = len(tokens)
+    print(f"Statements: {args.statements}")
+    print(f"Tokens:     {n_tokens}")
+    for name, f in [
+        ("scan_all_tokens", lambda: scan_all_tokens(source)),
+        ("scan_one_token loop", lambda: scan_with_states(source)),
+        ("parse_all", lambda: parse_all(ParserState(tokens, source))),
+        ("parse_expression loop", lambda: parse_with_states(source, tokens)),
+    ]:
+        counts = count_allocations(f)
+        time = min(timeit.repeat(f, number=1, repeat=args.repeat))
+        per_token = ", ".join(f"{k} {v / n_tokens:.2f}" for k, v in counts.items())
+        print(f"{name}: {time / n_tokens * 1e6:.2f} µs per token")
+        print(f"    Allocations per token: {per_token}")
+
+
+if __name__ == "__main__":
+    main()
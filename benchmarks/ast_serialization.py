@@ -0,0 +1,47 @@
+"""Compare loading a serialised AST against scanning and parsing the source again."""
+
+import argparse
+import timeit
+
+from wode.ast_serialization import dump_expressions, load_expressions
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+
+
+def generate_source(n_statements: int) -> Source:
+    lines = [f"foo_{i % 10} + {i} * bar - {i}.5 ^ -baz;" for i in range(n_statements)]
+    return Source(None, "\n".join(lines))
+
+
+def scan_and_parse(source: Source) -> None:
+    tokens, _ = scan_all_tokens(source)
+    parse_all(ParserState(tokens, source))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--statements", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    source = generate_source(args.statements)
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source))
+    payload = dump_expressions(source, tokens, expressions)
+
+    parse_time = min(
+        timeit.repeat(lambda: scan_and_parse(source), number=1, repeat=args.repeat)
+    )
+    load_time = min(
+        timeit.repeat(lambda: load_expressions(payload), number=1, repeat=args.repeat)
+    )
+    print(f"Statements:          {args.statements}")
+    print(f"Payload size:        {len(payload)} bytes")
+    print(f"Scan and parse:      {parse_time * 1000:.2f} ms")
+    print(f"Load serialised AST: {load_time * 1000:.2f} ms")
+    print(f"Speed up:            {parse_time / load_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
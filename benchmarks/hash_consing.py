@@ -0,0 +1,101 @@
+"""Compare plain and hash-consed ASTs of generated code that repeats the same subexpressions.
+
+The node counts and memory don't depend on the speed of the machine, the timings do.
+"""
+
+import argparse
+import timeit
+import tracemalloc
+
+from wode.ast import HashConsed
+from wode.ast_arena import NODE_LAYOUTS, get_child_nodes, get_node_kind
+from wode.ast_to_s_expression import convert_all_to_s_expressions
+from wode.hash_consing import AstInterner
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+
+
+def generate_source(n_statements: int, n_unique: int) -> Source:
+    # Like generated code, most statements are copies of a few templates
+    lines = [
+        f"foo + {i % n_unique} * -bar ^ 2 - {i % n_unique}.5 * baz + {i % n_unique};"
+        for i in range(n_statements)
+    ]
+    return Source(None, "\n".join(lines))
+
+
+def count_nodes(expressions) -> tuple:
+    # Count every node in the trees, and the distinct objects among them
+    n_nodes = 0
+    seen = set()
+    stack = list(expressions)
+    while len(stack) > 0:
+        node = stack.pop()
+        n_nodes += 1
+        seen.add(id(node))
+        stack.extend(get_child_nodes(node, NODE_LAYOUTS[get_node_kind(node)]))
+    return n_nodes, len(seen)
+
+
+def measure_memory(f) -> tuple:
+    tracemalloc.start()
+    result = f()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--statements", type=int, default=10000)
+    parser.add_argument("--unique", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    source = generate_source(args.statements, args.unique)
+    tokens, _ = scan_all_tokens(source)
+    print(f"Statements: {args.statements} ({args.unique} unique)")
+    print(f"Tokens:     {len(tokens)}")
+
+    def parse_plain():
+        return parse_all(ParserState(tokens, source))[0]
+
+    def parse_hash_consed():
+        return parse_all(ParserState(tokens, source, interner=AstInterner()))[0]
+
+    results = {}
+    for name, f in [("plain", parse_plain), ("hash-consed", parse_hash_consed)]:
+        expressions, size = measure_memory(f)
+        results[name] = expressions
+        n_nodes, n_objects = count_nodes(expressions)
+        parse_time = min(timeit.repeat(f, number=1, repeat=args.repeat))
+        render_time = min(
+            timeit.repeat(
+                lambda: convert_all_to_s_expressions(expressions),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        print(f"{name}:")
+        print(f"    Nodes: {n_nodes}, distinct objects: {n_objects}")
+        print(f"    Memory: {size / 1024:.0f} KiB")
+        print(f"    Parse: {parse_time * 1e3:.1f} ms")
+        print(f"    Render: {render_time * 1e3:.1f} ms")
+
+    # Compare every statement to the first, the plain nodes are compared field by field
+    for name, expressions in results.items():
+        first = expressions[0]
+        time = min(
+            timeit.repeat(
+                lambda: [e == first for e in expressions],
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        print(f"{name} equality: {time / len(expressions) * 1e9:.0f} ns per comparison")
+    assert isinstance(results["hash-consed"][0], HashConsed)
+
+
+if __name__ == "__main__":
+    main()
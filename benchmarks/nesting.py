@@ -0,0 +1,59 @@
+"""Measure how the parser's time per token changes with the nesting depth of brackets.
+
+Every program has about the same number of tokens, split into statements that are nested to the given depth.
+The time per token should stay flat as the depth grows, including past Python's recursion limit.
+"""
+
+import argparse
+import sys
+import timeit
+
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+
+
+def generate_statement(depth: int, kind: str) -> str:
+    match kind:
+        case "groups":
+            return "(" * depth + "1" + " + 2)" * depth + ";"
+        case "calls":
+            return "f(" * depth + "x" + ", 1)" * depth + ";"
+        case _:
+            raise ValueError(f"Unknown kind of nesting `{kind}`.")
+
+
+def generate_source(depth: int, kind: str, n_tokens: int) -> Source:
+    statement = generate_statement(depth, kind)
+    n_statement_tokens = len(scan_all_tokens(Source(None, statement))[0]) - 1
+    n_statements = max(n_tokens // n_statement_tokens, 1)
+    return Source(None, "\n".join([statement] * n_statements))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=100000)
+    parser.add_argument(
+        "--depths", type=int, nargs="+", default=[1, 10, 100, 1000, 10000, 50000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Recursion limit: {sys.getrecursionlimit()}")
+    for kind in ["groups", "calls"]:
+        print(f"{kind}:")
+        for depth in args.depths:
+            source = generate_source(depth, kind, args.tokens)
+            tokens, _ = scan_all_tokens(source)
+            time = min(
+                timeit.repeat(
+                    lambda: parse_all(ParserState(tokens, source)),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            print(f"    Depth {depth:>6}: {time / len(tokens) * 1e6:.2f} µs per token")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compare parsing one large file sequentially against parsing its statements in parallel."""
+
+import argparse
+import timeit
+
+from wode.parallel_parser import parse_all_in_parallel
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+
+
+def generate_source(n_statements: int) -> Source:
+    lines = [f"foo_{i % 10} + {i} * bar - {i}.5 ^ -baz;" for i in range(n_statements)]
+    return Source(None, "\n".join(lines))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--statements", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--min-chunk-size", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    source = generate_source(args.statements)
+    tokens, _ = scan_all_tokens(source)
+
+    def time(f) -> float:
+        return min(timeit.repeat(f, number=1, repeat=args.repeat))
+
+    sequential_time = time(lambda: parse_all(ParserState(tokens, source)))
+    print(f"Statements: {args.statements}")
+    print(f"Tokens:     {len(tokens)}")
+    print(f"Sequential: {sequential_time * 1000:.0f} ms")
+    for workers in args.workers:
+        for include_expressions in [True, False]:
+            parallel_time = time(
+                lambda: parse_all_in_parallel(
+                    source,
+                    tokens,
+                    workers,
+                    args.min_chunk_size,
+                    include_expressions,
+                )
+            )
+            output = "AST and errors" if include_expressions else "errors only"
+            print(
+                f"{workers} workers, {output}: {parallel_time * 1000:.0f} ms"
+                f" ({sequential_time / parallel_time:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measure the resolver's time per identifier use on programs with up to millions of uses.
+
+Every module declares functions with nested blocks, loops and match arms that shadow each other's names, so lookups see deep scopes with many bindings for the same name.
+The time per use should stay flat as the programs grow.
+"""
+
+import argparse
+import timeit
+
+from wode.parser import ParserState, parse_all
+from wode.resolver import resolve_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+
+MODULE = """
+let scale{i} = (x, y) -> x * y + {i};
+let step{i} = (n, total) -> {{
+    let x = n * 2 + total;
+    for item in range(n) {{
+        let total = total + item * x;
+        while total > x {{
+            let x = x + total / 2;
+            let total = scale{i}(total, x) - x;
+        }}
+        match item {{
+            0 => total,
+            other => {{ return step{i}(other - 1, total + x * other); }},
+        }};
+    }}
+    return scale{i}(x, total);
+}};
+"""
+
+
+def generate_source(n_modules: int) -> Source:
+    return Source(None, "".join(MODULE.format(i=i) for i in range(n_modules)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--modules", type=int, nargs="+", default=[100, 1000, 10000, 50000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n_modules in args.modules:
+        source = generate_source(n_modules)
+        tokens, _ = scan_all_tokens(source)
+        expressions, parser_errors = parse_all(ParserState(tokens, source))
+        resolution, resolver_errors = resolve_all(expressions, source, ["range"])
+        assert parser_errors == [] and resolver_errors == []
+        time = min(
+            timeit.repeat(
+                lambda: resolve_all(expressions, source, ["range"]),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        n_uses = len(resolution)
+        print(
+            f"{n_uses:>9} uses, {len(resolution.bindings):>8} bindings: "
+            f"{time * 1e3:8.1f} ms, {time / n_uses * 1e9:.0f} ns per use"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure the parser's throughput on large programs that use every kind of statement.
+
+The programs are made of copies of a realistic module with renamed identifiers, so the time per token should stay flat as the programs grow.
+"""
+
+import argparse
+import timeit
+
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+
+MODULE = """
+# Module {i}
+struct Point{i} {{ x: Float, y: Float }}
+
+let distance{i} = (ax, ay, bx, by) -> sqrt((ax - bx) ^ 2 + (ay - by) ^ 2);
+
+let classify{i} = (n) -> match n {{
+    0 => "zero",
+    1 => "one",
+    other => {{
+        if other < 0 {{
+            return "negative";
+        }} elif other > 100 {{
+            return "large";
+        }} else {{
+            return "small";
+        }}
+    }},
+}};
+
+let total{i} = 0;
+for item in range(1000) {{
+    let value = item * {i} + 1;
+    while value > 10 && !done(value) {{
+        let value = value / 2;
+        yield classify{i}(value);
+    }}
+}}
+"""
+
+
+def generate_source(n_modules: int) -> Source:
+    return Source(None, "".join(MODULE.format(i=i) for i in range(n_modules)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--modules", type=int, nargs="+", default=[10, 100, 1000, 10000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n_modules in args.modules:
+        source = generate_source(n_modules)
+        tokens, scanner_errors = scan_all_tokens(source)
+        expressions, parser_errors = parse_all(ParserState(tokens, source))
+        assert scanner_errors == [] and parser_errors == []
+        time = min(
+            timeit.repeat(
+                lambda: parse_all(ParserState(tokens, source)),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        n_lines = source.code.count("\n")
+        print(
+            f"{n_lines:>7} lines, {len(tokens):>8} tokens: "
+            f"{time * 1e3:8.1f} ms, {time / len(tokens) * 1e6:.2f} µs per token, "
+            f"{len(tokens) / time / 1e6:.2f} M tokens per second"
+        )
+
+
+if __name__ == "__main__":
+    main()
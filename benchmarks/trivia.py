@@ -0,0 +1,56 @@
+"""Check that scanning without trivia costs the same as before trivia could be kept."""
+
+import argparse
+import timeit
+
+from wode.scanner import scan_all_tokens, scan_token_at
+from wode.source import Source
+from wode.symbol_table import SymbolTable
+from wode.token_type import TokenType
+
+
+def generate_source(n_statements: int) -> Source:
+    lines = [f"foo_{i % 10} + {i} * bar;  # Comment {i}" for i in range(n_statements)]
+    return Source(None, "\n".join(lines))
+
+
+def scan_without_trivia(source: Source) -> None:
+    # The scanning loop from before trivia could be kept, it skips whitespace and comments without checking for them
+    symbol_table = SymbolTable()
+    tokens = []
+    errors = []
+    position = 0
+    while True:
+        token, error, position = scan_token_at(source, position, symbol_table)
+        if token is not None:
+            tokens.append(token)
+            if token.token_type == TokenType.EOF:
+                return
+        elif error is not None:
+            errors.append(error)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--statements", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    source = generate_source(args.statements)
+
+    def time(f) -> float:
+        return min(timeit.repeat(f, number=1, repeat=args.repeat))
+
+    # The scanning loop without any trivia handling is the baseline
+    baseline_time = time(lambda: scan_without_trivia(source))
+    disabled_time = time(lambda: scan_all_tokens(source))
+    enabled_time = time(lambda: scan_all_tokens(source, keep_trivia=True))
+    print(f"Statements:        {args.statements}")
+    print(f"Baseline:          {baseline_time * 1000:.2f} ms")
+    print(f"Trivia disabled:   {disabled_time * 1000:.2f} ms")
+    print(f"Trivia enabled:    {enabled_time * 1000:.2f} ms")
+    print(f"Disabled overhead: {(disabled_time / baseline_time - 1) * 100:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
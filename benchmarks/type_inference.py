@@ -0,0 +1,62 @@
+"""Measure how type inference scales on long lists of statements and on deeply nested arithmetic.
+
+Each statement declares a generic function and calls it with the previous statement's value, so every `let` is generalized and every use is instantiated.
+The nested arithmetic goes far past Python's recursion limit.
+The time per token should stay close to flat for both as the programs grow.
+"""
+
+import argparse
+import timeit
+
+from wode.parser import ParserState, parse_all
+from wode.resolver import resolve_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.type_inference import infer_all
+
+
+def generate_statements(n_statements: int) -> Source:
+    lines = ["let x0 = 1;"] + [
+        f"let f{i} = (a, b) -> a * b + x{i - 1}; let x{i} = f{i}(x{i - 1}, {i}) - 2;"
+        for i in range(1, n_statements)
+    ]
+    return Source(None, "\n".join(lines))
+
+
+def generate_nesting(depth: int) -> Source:
+    return Source(None, "let x = 1;" + "(" * depth + "x" + " + 1) * 2" * depth + ";")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for kind, generate_source in [
+        ("statements", generate_statements),
+        ("nesting", generate_nesting),
+    ]:
+        print(f"{kind}:")
+        for size in args.sizes:
+            source = generate_source(size)
+            tokens, _ = scan_all_tokens(source)
+            expressions, parser_errors = parse_all(ParserState(tokens, source))
+            resolution, resolver_errors = resolve_all(expressions, source)
+            _, inference_errors = infer_all(expressions, resolution, source)
+            assert parser_errors == resolver_errors == inference_errors == []
+            time = min(
+                timeit.repeat(
+                    lambda: infer_all(expressions, resolution, source),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            print(
+                f"    {size:>7}: {len(tokens):>8} tokens, {time * 1e3:8.1f} ms, "
+                f"{time / len(tokens) * 1e9:.0f} ns per token"
+            )
+
+
+if __name__ == "__main__":
+    main()
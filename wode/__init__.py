@@ -1,12 +1,33 @@
+import asyncio
 import importlib.metadata
+import json
+import os
+import sys
+from enum import Enum
 from pathlib import Path
 
 import typer
 
-from wode.ast_to_s_expression import convert_to_s_expression
+from wode.ast_to_s_expression import convert_all_to_s_expressions, format_s_expression
+from wode.errors import WodeError
+from wode.formatter import FormatCache, format_files
+from wode.fuzzing import run_differential_fuzzing, run_timing_fuzzing
+from wode.language_server import LanguageServer
+from wode.load_test import run_load_test
+from wode.parallel_parser import parse_all_in_parallel
 from wode.parser import ParserState, parse_all
+from wode.profiling import NullProfiler, ProfileFormat, Profiler
+from wode.repl import run_repl
+from wode.resolver import resolve_all
 from wode.scanner import scan_all_tokens
+from wode.semantic_tokens import SEMANTIC_TOKEN_TYPES, encode_token_stream
+from wode.server import CompileServer
 from wode.source import Source
+from wode.source_map import SourceMap
+from wode.streaming import compile_statements, read_chunks
+from wode.token_stream import TokenStream
+from wode.type_inference import infer_all
+from wode.types import List, Optional, Str, Tuple
 
 __version__ = importlib.metadata.version("wode")
 
@@ -20,32 +41,349 @@ def show_version():
 
 
 @cli.command("run")
-def main(source_file_path: Path = typer.Argument(None, dir_okay=False)):
+def main(
+    source_file_path: Path = typer.Argument(None, dir_okay=False),
+    profile: bool = typer.Option(
+        False, "--profile", help="Report the time and memory used by each phase."
+    ),
+    profile_counters: bool = typer.Option(
+        False,
+        "--profile-counters",
+        help="Also count calls to the scanner and parser using cProfile, this slows down the run.",
+    ),
+    profile_out: Optional[Path] = typer.Option(
+        None, "--profile-out", dir_okay=False, help="Write the profile to this file."
+    ),
+    profile_format: ProfileFormat = typer.Option(
+        ProfileFormat.JSON.value, "--profile-format", help="The format of the profile."
+    ),
+):
+    # Only pay for profiling when it's been asked for
+    profiler = (
+        Profiler(
+            use_cprofile=profile_counters or profile_format == ProfileFormat.CPROFILE
+        )
+        if profile or profile_out is not None
+        else NullProfiler()
+    )
+    try:
+        run(source_file_path, profiler)
+    finally:
+        profiler.stop()
+        if isinstance(profiler, Profiler):
+            if profile:
+                typer.echo(profiler.get_report(), err=True)
+            if profile_out is not None:
+                profiler.write(profile_out, profile_format)
+
+
+def run(source_file_path: Path, profiler: NullProfiler) -> None:
+    if Str(source_file_path) == "-":
+        with profiler.phase("stream"):
+            run_stream()
+        return
+
     # Read the source code from the specified file
-    with open(source_file_path, "r") as f:
-        source = Source(source_file_path, f.read())
+    with profiler.phase("read"):
+        with open(source_file_path, "r") as f:
+            source = Source(source_file_path, f.read())
 
     # Scan the source code into tokens
-    tokens, scanner_errors = scan_all_tokens(source)
+    with profiler.phase("scan"):
+        tokens, scanner_errors = scan_all_tokens(source)
+    profiler.add_counter("tokens", len(tokens))
 
     # If there were any scanning errors, show them and stop execution
     if len(scanner_errors) > 0:
-        print("Scanning errors:")
-        for error in scanner_errors:
-            print(error.get_message())
+        with profiler.phase("print"):
+            print("Scanning errors:")
+            for error in scanner_errors:
+                print(error.get_message())
         return
 
     # Parse the tokens into an AST
-    expressions, parsing_errors = parse_all(ParserState(tokens, source))
+    with profiler.phase("parse"):
+        expressions, parsing_errors = parse_all(ParserState(tokens, source))
+    profiler.add_counter("expressions", len(expressions))
 
     # If there were any parsing errors, show them and stop execution
     if len(parsing_errors) > 0:
-        print("Parsing errors:")
-        for error in parsing_errors:
-            print(error.get_message())
+        with profiler.phase("print"):
+            print("Parsing errors:")
+            for error in parsing_errors:
+                print(error.get_message())
         return
 
-    print("Parsed AST:")
-    for expression in expressions:
-        s_expression = convert_to_s_expression(expression)
-        print(s_expression)
+    with profiler.phase("print"):
+        print("Parsed AST:")
+        for s_expression in convert_all_to_s_expressions(expressions, source):
+            print(format_s_expression(s_expression))
+
+
+def run_stream() -> None:
+    # Print each statement's AST or errors as soon as the statement has been read from stdin
+    for statement in compile_statements(read_chunks(sys.stdin.buffer)):
+        for error in statement.scanner_errors + statement.parser_errors:
+            print(error.get_message(), flush=True)
+        for s_expression in convert_all_to_s_expressions(
+            statement.expressions, statement.source
+        ):
+            print(format_s_expression(s_expression), flush=True)
+
+
+@cli.command("build")
+def build(
+    source_file_paths: Optional[List[Path]] = typer.Argument(
+        None, dir_okay=False, exists=True
+    ),
+    stdin: bool = typer.Option(
+        False,
+        "--stdin",
+        help="Build code streamed from stdin, reporting errors as soon as each statement has been read.",
+    ),
+    workers: int = typer.Option(
+        0,
+        "--workers",
+        help="The number of worker processes for parsing large files, 0 parses everything in this process.",
+    ),
+):
+    """Scan and parse every file in a project, reporting the errors in all of them."""
+    if stdin:
+        n_errors = 0
+        for statement in compile_statements(read_chunks(sys.stdin.buffer)):
+            for error in statement.scanner_errors + statement.parser_errors:
+                n_errors += 1
+                typer.echo(error.get_message(), err=True)
+        print(f"Built stdin with {n_errors} errors.")
+        raise typer.Exit(1 if n_errors > 0 else 0)
+    if source_file_paths is None or len(source_file_paths) == 0:
+        typer.echo("Pass the files to build, or use `--stdin`.", err=True)
+        raise typer.Exit(2)
+
+    source_map = SourceMap()
+    # Files that are given more than once are only read and built once
+    sources = [source_map.add_file(p) for p in source_file_paths]
+    errors: List[Tuple[int, WodeError]] = []
+    for source in dict.fromkeys(sources):
+        tokens, scanner_errors = scan_all_tokens(source)
+        if len(scanner_errors) > 0:
+            file_errors = scanner_errors
+        else:
+            _, file_errors = parse_all_in_parallel(
+                source, tokens, workers, include_expressions=False
+            )
+        errors.extend(
+            (source_map.get_global_offset(e.source_range.start), e) for e in file_errors
+        )
+    # Sort by global offset, so the errors are in file order and then source order
+    errors.sort(key=lambda e: e[0])
+    for _, error in errors:
+        typer.echo(error.get_message(), err=True)
+    print(f"Built {len(source_map)} files with {len(errors)} errors.")
+    raise typer.Exit(1 if len(errors) > 0 else 0)
+
+
+@cli.command("serve")
+def serve(
+    socket_path: Optional[Path] = typer.Option(
+        None,
+        "--socket",
+        dir_okay=False,
+        help="Listen on this Unix socket instead of stdin and stdout.",
+    ),
+    workers: int = typer.Option(
+        os.cpu_count() or 1,
+        "--workers",
+        help="The number of worker processes for large sources, 0 compiles everything in the server process.",
+    ),
+    inline_threshold: int = typer.Option(
+        4096,
+        "--inline-threshold",
+        help="Sources shorter than this many characters are compiled without a worker process.",
+    ),
+):
+    """Compile newline-delimited JSON requests until the input is closed."""
+    server = CompileServer(workers, inline_threshold)
+    try:
+        if socket_path is None:
+            asyncio.run(server.serve_stdio())
+        else:
+            asyncio.run(server.serve_unix_socket(socket_path))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+@cli.command("load-test")
+def load_test(
+    socket_path: Path = typer.Option(..., "--socket", dir_okay=False),
+    source_file_path: Path = typer.Argument(..., exists=True, dir_okay=False),
+    n_requests: int = typer.Option(1000, "--requests"),
+    concurrency: int = typer.Option(8, "--concurrency"),
+):
+    """Measure the latency and throughput of a running `wode serve --socket`."""
+    with open(source_file_path, "r") as f:
+        code = f.read()
+    result = asyncio.run(run_load_test(socket_path, code, n_requests, concurrency))
+    print(result.get_report())
+
+
+@cli.command("lsp")
+def lsp():
+    """Run a language server that talks to an editor over stdin and stdout."""
+    server = LanguageServer(sys.stdin.buffer, sys.stdout.buffer)
+    server.run()
+    # The editor should always ask the server to shut down before telling it to exit
+    raise typer.Exit(0 if server.is_shut_down else 1)
+
+
+@cli.command("repl")
+def repl(
+    history_path: Optional[Path] = typer.Option(
+        Path.home() / ".wode_history",
+        "--history-file",
+        dir_okay=False,
+        help="Where to keep the history of entered lines.",
+    ),
+    no_history: bool = typer.Option(
+        False, "--no-history", help="Don't keep a history."
+    ),
+):
+    """Parse statements interactively and show their S-expressions."""
+    run_repl(None if no_history else history_path)
+
+
+@cli.command("check")
+def check(
+    source_file_paths: List[Path] = typer.Argument(..., dir_okay=False, exists=True),
+):
+    """Check that every name used in each file has been defined and that its types are consistent, without running anything."""
+    n_failed = 0
+    for source_file_path in source_file_paths:
+        with open(source_file_path, "r") as f:
+            source = Source(source_file_path, f.read())
+        tokens, scanner_errors = scan_all_tokens(source)
+        expressions, parser_errors = parse_all(ParserState(tokens, source))
+        resolution, resolver_errors = resolve_all(expressions, source)
+        _, type_errors = infer_all(expressions, resolution, source)
+        errors = scanner_errors + parser_errors + resolver_errors + type_errors
+        if len(errors) > 0:
+            n_failed += 1
+            for error in errors:
+                typer.echo(error.get_message(), err=True)
+    raise typer.Exit(1 if n_failed > 0 else 0)
+
+
+class TokensFormat(Enum):
+    TEXT = "text"
+    LSP_SEMANTIC = "lsp-semantic"
+
+
+@cli.command("tokens")
+def tokens(
+    source_file_path: Path = typer.Argument(None, dir_okay=False),
+    tokens_format: TokensFormat = typer.Option(
+        TokensFormat.TEXT.value, "--format", help="The format of the tokens."
+    ),
+    start_line: Optional[int] = typer.Option(
+        None, "--start-line", min=1, help="Only output tokens from this line onwards."
+    ),
+    end_line: Optional[int] = typer.Option(
+        None, "--end-line", min=1, help="Only output tokens up to this line."
+    ),
+):
+    """Scan a file and output its tokens, for example for syntax highlighting."""
+    with open(source_file_path, "r") as f:
+        source = Source(source_file_path, f.read())
+    scanned_tokens, scanner_errors = scan_all_tokens(source)
+    token_stream = TokenStream.from_tokens(source, scanned_tokens)
+    # Line numbers start at one and the range includes the end line
+    first_line_index = 0 if start_line is None else start_line - 1
+    last_line_index = len(source.line_start_positions) if end_line is None else end_line
+    match tokens_format:
+        case TokensFormat.LSP_SEMANTIC:
+            data = encode_token_stream(
+                token_stream, (first_line_index, last_line_index)
+            )
+            print(json.dumps({"legend": SEMANTIC_TOKEN_TYPES, "data": data}))
+        case TokensFormat.TEXT:
+            for i in range(len(token_stream)):
+                start = token_stream.starts[i]
+                line_index, column = source.get_line_index_and_column(start)
+                if first_line_index <= line_index < last_line_index:
+                    token_type = token_stream.get_token_type(i)
+                    print(
+                        f"{line_index + 1}:{column} {token_type.value} {token_stream.get_lexeme(i)!r}"
+                    )
+    for error in scanner_errors:
+        typer.echo(error.get_message(), err=True)
+
+
+@cli.command("fmt")
+def fmt(
+    source_file_paths: List[Path] = typer.Argument(..., dir_okay=False, exists=True),
+    check: bool = typer.Option(
+        False,
+        "--check",
+        help="Report files that need formatting without changing them.",
+    ),
+    workers: int = typer.Option(
+        os.cpu_count() or 1,
+        "--workers",
+        help="The number of worker processes, 0 formats every file in this process.",
+    ),
+    cache_path: Optional[Path] = typer.Option(
+        Path(".wode-fmt-cache.json"),
+        "--cache",
+        dir_okay=False,
+        help="Where to store the hashes of formatted files, so unchanged files are skipped.",
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Format every file."),
+):
+    """Format files in place, printing each file that was changed as soon as it's done."""
+    cache = FormatCache(None if no_cache else cache_path)
+    n_failed = 0
+    try:
+        for result in format_files(source_file_paths, check, cache, workers):
+            if len(result.error_messages) > 0:
+                n_failed += 1
+                typer.echo(f"Couldn't format {result.file_path}:", err=True)
+                for message in result.error_messages:
+                    typer.echo(message, err=True)
+            elif result.is_changed:
+                if check:
+                    n_failed += 1
+                print(
+                    f"{'Would reformat' if check else 'Reformatted'} {result.file_path}"
+                )
+    finally:
+        cache.save()
+    raise typer.Exit(1 if n_failed > 0 else 0)
+
+
+@cli.command("fuzz")
+def fuzz(
+    seed: int = typer.Option(0, "--seed"),
+    n_programs: int = typer.Option(1000, "--programs"),
+    timing: bool = typer.Option(
+        False,
+        "--timing",
+        help="Look for inputs whose scanning or parsing time grows faster than linearly.",
+    ),
+    max_growth_exponent: float = typer.Option(1.5, "--max-growth-exponent"),
+):
+    """Compare the scanner and parser backends on random programs."""
+    if timing:
+        measurements, flagged = run_timing_fuzzing(
+            seed, max_growth_exponent=max_growth_exponent
+        )
+        for measurement in measurements:
+            print(f"{'SLOW ' if measurement in flagged else ''}{measurement}")
+        raise typer.Exit(1 if len(flagged) > 0 else 0)
+
+    divergences = run_differential_fuzzing(seed, n_programs)
+    for divergence in divergences:
+        print(divergence)
+    print(f"Found {len(divergences)} divergences in {n_programs} programs.")
+    raise typer.Exit(1 if len(divergences) > 0 else 0)
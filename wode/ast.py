@@ -1,41 +1,169 @@
 from dataclasses import dataclass
 
 from wode.token import Token
+from wode.types import Bool, Int, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Expression:
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class UnaryExpression(Expression):
     operator: Token
     right: Expression
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryExpression(Expression):
     left: Expression
     operator: Token
     right: Expression
 
 
-@dataclass
+@dataclass(slots=True)
 class LiteralExpression(Expression):
     literal: Token
 
+    @property
+    def symbol_id(self) -> Optional[Int]:
+        return self.literal.symbol_id
 
-@dataclass
+
+@dataclass(slots=True)
 class GroupingExpression(Expression):
     expression: Expression
 
 
-@dataclass
+@dataclass(slots=True)
+class CallExpression(Expression):
+    callee: Expression
+    arguments: List[Expression]
+    right_bracket: Token
+
+
+@dataclass(slots=True)
 class VariableExpression(Expression):
     token: Token
 
+    @property
+    def symbol_id(self) -> Optional[Int]:
+        return self.token.symbol_id
 
-@dataclass
+
+@dataclass(slots=True)
 class CommentExpression(Expression):
     token: Token
+
+
+@dataclass(slots=True)
+class BlockExpression(Expression):
+    left_curly_bracket: Token
+    statements: List[Expression]
+    right_curly_bracket: Token
+
+
+@dataclass(slots=True)
+class IfExpression(Expression):
+    keyword: Token
+    # The conditions of the `if` and each `elif`, and the block that runs for each of them
+    conditions: List[Expression]
+    bodies: List[BlockExpression]
+    else_body: Optional[BlockExpression]
+
+
+@dataclass(slots=True)
+class WhileExpression(Expression):
+    keyword: Token
+    condition: Expression
+    body: BlockExpression
+
+
+@dataclass(slots=True)
+class ForExpression(Expression):
+    keyword: Token
+    variable: Token
+    iterable: Expression
+    body: BlockExpression
+
+
+@dataclass(slots=True)
+class MatchExpression(Expression):
+    keyword: Token
+    subject: Expression
+    # Each arm's pattern and the expression it evaluates to
+    patterns: List[LiteralExpression]
+    arms: List[Expression]
+    right_curly_bracket: Token
+
+
+@dataclass(slots=True)
+class FunctionExpression(Expression):
+    parameters: List[Token]
+    arrow: Token
+    body: Expression
+
+
+@dataclass(slots=True)
+class Statement(Expression):
+    """A node that can only be parsed as a statement, not as part of another expression."""
+
+
+@dataclass(slots=True)
+class LetStatement(Statement):
+    keyword: Token
+    name: Token
+    value: Expression
+
+
+@dataclass(slots=True)
+class ReturnStatement(Statement):
+    keyword: Token
+    value: Optional[Expression]
+
+
+@dataclass(slots=True)
+class YieldStatement(Statement):
+    keyword: Token
+    value: Optional[Expression]
+
+
+@dataclass(slots=True)
+class StructStatement(Statement):
+    keyword: Token
+    name: Token
+    # Each field's name and the name of its type
+    field_names: List[Token]
+    field_types: List[Token]
+
+
+class HashConsed:
+    """A node that is shared by every structurally identical subtree, see `AstInterner`.
+
+    Structurally identical nodes are the same object, so they're compared by identity and hashed by a structural hash that's computed when they're built.
+    """
+
+    __slots__ = ()
+    structural_hash: Int
+
+    def __eq__(self, other: object) -> Bool:
+        return self is other
+
+    def __hash__(self) -> Int:
+        return self.structural_hash
+
+
+@dataclass(slots=True, eq=False)
+class SharedLiteralExpression(HashConsed, LiteralExpression):
+    structural_hash: Int = 0
+
+
+@dataclass(slots=True, eq=False)
+class SharedUnaryExpression(HashConsed, UnaryExpression):
+    structural_hash: Int = 0
+
+
+@dataclass(slots=True, eq=False)
+class SharedBinaryExpression(HashConsed, BinaryExpression):
+    structural_hash: Int = 0
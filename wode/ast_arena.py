@@ -0,0 +1,294 @@
+import typing
+from array import array
+from dataclasses import fields
+from enum import Enum
+from types import NoneType
+
+from wode.ast import (
+    BinaryExpression,
+    BlockExpression,
+    CallExpression,
+    CommentExpression,
+    Expression,
+    ForExpression,
+    FunctionExpression,
+    GroupingExpression,
+    IfExpression,
+    LetStatement,
+    LiteralExpression,
+    MatchExpression,
+    ReturnStatement,
+    StructStatement,
+    UnaryExpression,
+    VariableExpression,
+    WhileExpression,
+    YieldStatement,
+)
+from wode.source import Source
+from wode.token import Token
+from wode.token_stream import TokenStream
+from wode.types import (
+    Any,
+    Bool,
+    Dict,
+    Int,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Str,
+    Tuple,
+    Type,
+)
+
+# The order of this list defines the node kind codes, append new node types to the end
+AST_NODE_TYPES: List[Type[Any]] = [
+    UnaryExpression,
+    BinaryExpression,
+    LiteralExpression,
+    GroupingExpression,
+    VariableExpression,
+    CommentExpression,
+    CallExpression,
+    BlockExpression,
+    IfExpression,
+    WhileExpression,
+    ForExpression,
+    MatchExpression,
+    FunctionExpression,
+    LetStatement,
+    ReturnStatement,
+    YieldStatement,
+    StructStatement,
+]
+
+# Stored in a slot for an optional token or node that is missing
+NO_INDEX = -1
+
+
+class SlotType(Enum):
+    TOKEN = "token"
+    OPTIONAL_TOKEN = "optional_token"
+    TOKEN_LIST = "token_list"
+    NODE = "node"
+    OPTIONAL_NODE = "optional_node"
+    NODE_LIST = "node_list"
+
+
+def _get_slot_type(annotation: Any) -> SlotType:
+    origin = typing.get_origin(annotation)
+    arguments = typing.get_args(annotation)
+    if origin is typing.Union and len(arguments) == 2 and NoneType in arguments:
+        inner = next(a for a in arguments if a is not NoneType)
+        match _get_slot_type(inner):
+            case SlotType.TOKEN:
+                return SlotType.OPTIONAL_TOKEN
+            case SlotType.NODE:
+                return SlotType.OPTIONAL_NODE
+            case _:
+                raise TypeError(f"Unsupported optional AST field type `{annotation}`.")
+    if origin is list:
+        match _get_slot_type(arguments[0]):
+            case SlotType.TOKEN:
+                return SlotType.TOKEN_LIST
+            case SlotType.NODE:
+                return SlotType.NODE_LIST
+            case _:
+                raise TypeError(f"Unsupported list AST field type `{annotation}`.")
+    if isinstance(annotation, type) and issubclass(annotation, Token):
+        return SlotType.TOKEN
+    if isinstance(annotation, type):
+        return SlotType.NODE
+    raise TypeError(f"Unsupported AST field type `{annotation}`.")
+
+
+def _get_layout(node_type: Type[Any]) -> List[Tuple[Str, SlotType]]:
+    type_hints = typing.get_type_hints(node_type)
+    return [(f.name, _get_slot_type(type_hints[f.name])) for f in fields(node_type)]
+
+
+NODE_LAYOUTS = [_get_layout(node_type) for node_type in AST_NODE_TYPES]
+NODE_KINDS = {node_type: kind for kind, node_type in enumerate(AST_NODE_TYPES)}
+
+
+def get_node_kind(node: Any) -> Int:
+    # Look through the base classes so subclasses of the AST nodes are stored as their base type
+    for node_type in type(node).__mro__:
+        kind = NODE_KINDS.get(node_type)
+        if kind is not None:
+            return kind
+    raise TypeError(f"Can't store a node of type `{type(node)}` in an AST arena.")
+
+
+def get_child_nodes(node: Any, layout: List[Tuple[Str, SlotType]]) -> List[Any]:
+    children: List[Any] = []
+    for name, slot_type in layout:
+        value = getattr(node, name)
+        match slot_type:
+            case SlotType.NODE:
+                children.append(value)
+            case SlotType.OPTIONAL_NODE:
+                if value is not None:
+                    children.append(value)
+            case SlotType.NODE_LIST:
+                children.extend(value)
+            case _:
+                pass
+    return children
+
+
+class AstArena:
+    """A flat struct-of-arrays representation of a list of ASTs.
+
+    Every node is a kind code and a run of integer slots, which hold the indices of the node's tokens in a `TokenStream` and of its children in the arena.
+    Children always come before their parents, so all the trees can be rebuilt in a single forward pass.
+    """
+
+    def __init__(
+        self,
+        token_stream: TokenStream,
+        kinds: Sequence[Int],
+        slot_starts: Sequence[Int],
+        slots: Sequence[Int],
+        roots: Sequence[Int],
+    ) -> None:
+        self.token_stream = token_stream
+        self.kinds = kinds
+        # There is one more slot start than there are nodes so each node's slots end where the next node's start
+        self.slot_starts = slot_starts
+        self.slots = slots
+        self.roots = roots
+
+    @classmethod
+    def from_expressions(
+        cls, source: Source, tokens: List[Token], expressions: List[Expression]
+    ) -> "AstArena":
+        token_stream = TokenStream.from_tokens(source, tokens)
+        token_indices = {id(token): i for i, token in enumerate(tokens)}
+
+        def get_token_index(token: Token) -> Int:
+            try:
+                return token_indices[id(token)]
+            except KeyError:
+                raise ValueError(
+                    f"The token `{token.lexeme}` isn't in the list of tokens."
+                )
+
+        kinds = array("B")
+        slot_starts = array("i", [0])
+        slots = array("i")
+        roots = array("i")
+        node_indices: Dict[Int, Int] = {}
+        for expression in expressions:
+            # Walk the tree in post-order with an explicit stack so deep trees don't hit the recursion limit
+            stack: List[Tuple[Any, Bool]] = [(expression, False)]
+            while len(stack) > 0:
+                node, children_done = stack.pop()
+                kind = get_node_kind(node)
+                layout = NODE_LAYOUTS[kind]
+                if not children_done:
+                    # Nodes that are shared between trees are only stored once
+                    if id(node) in node_indices:
+                        continue
+                    stack.append((node, True))
+                    stack.extend(
+                        (child, False)
+                        for child in reversed(get_child_nodes(node, layout))
+                    )
+                    continue
+
+                for name, slot_type in layout:
+                    value = getattr(node, name)
+                    match slot_type:
+                        case SlotType.TOKEN:
+                            slots.append(get_token_index(value))
+                        case SlotType.OPTIONAL_TOKEN:
+                            slots.append(
+                                NO_INDEX if value is None else get_token_index(value)
+                            )
+                        case SlotType.TOKEN_LIST:
+                            slots.append(len(value))
+                            slots.extend(get_token_index(t) for t in value)
+                        case SlotType.NODE:
+                            slots.append(node_indices[id(value)])
+                        case SlotType.OPTIONAL_NODE:
+                            slots.append(
+                                NO_INDEX if value is None else node_indices[id(value)]
+                            )
+                        case SlotType.NODE_LIST:
+                            slots.append(len(value))
+                            slots.extend(node_indices[id(child)] for child in value)
+                node_indices[id(node)] = len(kinds)
+                kinds.append(kind)
+                slot_starts.append(len(slots))
+            roots.append(node_indices[id(expression)])
+        return cls(token_stream, kinds, slot_starts, slots, roots)
+
+    def __len__(self) -> Int:
+        return len(self.kinds)
+
+    def get_node_type(self, node_index: Int) -> Type[Any]:
+        return AST_NODE_TYPES[self.kinds[node_index]]
+
+    def get_children(self, node_index: Int) -> List[Int]:
+        children: List[Int] = []
+        slot_index = self.slot_starts[node_index]
+        for _, slot_type in NODE_LAYOUTS[self.kinds[node_index]]:
+            match slot_type:
+                case SlotType.NODE:
+                    children.append(self.slots[slot_index])
+                case SlotType.OPTIONAL_NODE if self.slots[slot_index] != NO_INDEX:
+                    children.append(self.slots[slot_index])
+                case SlotType.NODE_LIST:
+                    count = self.slots[slot_index]
+                    children.extend(self.slots[slot_index + 1 : slot_index + 1 + count])
+                    slot_index += count
+                case SlotType.TOKEN_LIST:
+                    slot_index += self.slots[slot_index]
+                case _:
+                    pass
+            slot_index += 1
+        return children
+
+    def iter_preorder(self, root: Int) -> Iterator[Int]:
+        stack = [root]
+        while len(stack) > 0:
+            node_index = stack.pop()
+            yield node_index
+            stack.extend(reversed(self.get_children(node_index)))
+
+    def to_expressions(self, tokens: Optional[List[Token]] = None) -> List[Expression]:
+        # Reuse the original tokens if we have them, otherwise materialise them from the token stream
+        all_tokens = self.token_stream.to_tokens() if tokens is None else tokens
+
+        # Children come before their parents, so a single forward pass builds every node
+        nodes: List[Any] = []
+        for node_index, kind in enumerate(self.kinds):
+            slot_index = self.slot_starts[node_index]
+            arguments: Dict[Str, Any] = {}
+            for name, slot_type in NODE_LAYOUTS[kind]:
+                slot = self.slots[slot_index]
+                match slot_type:
+                    case SlotType.TOKEN:
+                        arguments[name] = all_tokens[slot]
+                    case SlotType.OPTIONAL_TOKEN:
+                        arguments[name] = None if slot == NO_INDEX else all_tokens[slot]
+                    case SlotType.TOKEN_LIST:
+                        arguments[name] = [
+                            all_tokens[i]
+                            for i in self.slots[slot_index + 1 : slot_index + 1 + slot]
+                        ]
+                        slot_index += slot
+                    case SlotType.NODE:
+                        arguments[name] = nodes[slot]
+                    case SlotType.OPTIONAL_NODE:
+                        arguments[name] = None if slot == NO_INDEX else nodes[slot]
+                    case SlotType.NODE_LIST:
+                        arguments[name] = [
+                            nodes[i]
+                            for i in self.slots[slot_index + 1 : slot_index + 1 + slot]
+                        ]
+                        slot_index += slot
+                slot_index += 1
+            nodes.append(AST_NODE_TYPES[kind](**arguments))
+        return [nodes[root] for root in self.roots]
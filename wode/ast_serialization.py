@@ -0,0 +1,191 @@
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from wode.ast import Expression
+from wode.ast_arena import AST_NODE_TYPES, AstArena
+from wode.source import Source
+from wode.symbol_table import SymbolTable
+from wode.token import Token
+from wode.token_stream import TOKEN_TYPES, TokenStream
+from wode.types import Int, List, Literal, Sequence, Str, Tuple, Union
+
+# Bump the version whenever the layout, `TOKEN_TYPES` or `AST_NODE_TYPES` change
+MAGIC = b"WAST"
+VERSION = 3
+HEADER = struct.Struct("<4sHHIIIIIIIIII")
+ALIGNMENT = 4
+
+FLAG_HAS_FILE_PATH = 1
+FLAG_HAS_SYMBOL_TABLE = 2
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+class AstFormatError(ValueError):
+    pass
+
+
+def _get_padding(length: Int) -> bytes:
+    return b"\0" * (-length % ALIGNMENT)
+
+
+def _to_little_endian_bytes(values: Sequence[Int], type_code: Str) -> bytes:
+    values_array = values if isinstance(values, array) else array(type_code, values)
+    if sys.byteorder == "big":
+        values_array = array(type_code, values_array)
+        values_array.byteswap()
+    return values_array.tobytes()
+
+
+def dump_ast(arena: AstArena) -> bytes:
+    """Serialise an AST arena, its token stream and its source code to bytes."""
+    token_stream = arena.token_stream
+    source = token_stream.source
+
+    file_path_bytes = (
+        b"" if source.file_path is None else Str(source.file_path).encode("utf-8")
+    )
+    code_bytes = source.code.encode("utf-8")
+    symbol_table = token_stream.symbol_table
+    symbol_bytes = (
+        b"" if symbol_table is None else "\n".join(symbol_table.names).encode("utf-8")
+    )
+    flags = (0 if source.file_path is None else FLAG_HAS_FILE_PATH) | (
+        0 if symbol_table is None else FLAG_HAS_SYMBOL_TABLE
+    )
+
+    sections = [
+        file_path_bytes,
+        code_bytes,
+        symbol_bytes,
+        _to_little_endian_bytes(token_stream.token_type_codes, "B"),
+        _to_little_endian_bytes(token_stream.starts, "i"),
+        _to_little_endian_bytes(token_stream.ends, "i"),
+        _to_little_endian_bytes(token_stream.symbol_ids, "i"),
+        _to_little_endian_bytes(arena.kinds, "B"),
+        _to_little_endian_bytes(arena.slot_starts, "i"),
+        _to_little_endian_bytes(arena.slots, "i"),
+        _to_little_endian_bytes(arena.roots, "i"),
+    ]
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        flags,
+        len(file_path_bytes),
+        len(code_bytes),
+        len(symbol_bytes),
+        len(token_stream),
+        len(arena),
+        len(arena.slots),
+        len(arena.roots),
+        len(TOKEN_TYPES),
+        len(AST_NODE_TYPES),
+        0,
+    )
+    # Every section starts on an aligned offset so the integer arrays can be cast without copying
+    return b"".join(
+        [header]
+        + [
+            section_with_padding
+            for section in sections
+            for section_with_padding in (section, _get_padding(len(section)))
+        ]
+    )
+
+
+def load_ast(buffer: Buffer) -> AstArena:
+    """Load an AST arena from bytes written by `dump_ast`.
+
+    The buffer can be anything that supports the buffer protocol, such as bytes or an `mmap`, and the integer arrays of the returned arena are views into it rather than copies.
+    """
+    view = memoryview(buffer).cast("B")
+    if len(view) < HEADER.size:
+        raise AstFormatError("The buffer is too short to contain an AST.")
+    (
+        magic,
+        version,
+        flags,
+        file_path_length,
+        code_length,
+        symbol_length,
+        token_count,
+        node_count,
+        slot_count,
+        root_count,
+        token_type_count,
+        node_type_count,
+        _,
+    ) = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise AstFormatError("The buffer doesn't contain a serialised AST.")
+    if version != VERSION:
+        raise AstFormatError(
+            f"Can't load an AST serialised with format version `{version}`, expected version `{VERSION}`."
+        )
+    if token_type_count != len(TOKEN_TYPES) or node_type_count != len(AST_NODE_TYPES):
+        raise AstFormatError("The AST was serialised by an incompatible version.")
+
+    offset = HEADER.size
+
+    def take(length: Int, type_code: Literal["B", "i"]) -> memoryview:
+        nonlocal offset
+        item_size = 1 if type_code == "B" else 4
+        end = offset + length * item_size
+        if end > len(view):
+            raise AstFormatError("The buffer ended unexpectedly.")
+        section = view[offset:end]
+        offset = end + (-end % ALIGNMENT)
+        if type_code == "B":
+            return section
+        if sys.byteorder == "big":
+            swapped = array(type_code, section.tobytes())
+            swapped.byteswap()
+            return memoryview(swapped)
+        return section.cast(type_code)
+
+    file_path_bytes = take(file_path_length, "B")
+    code_bytes = take(code_length, "B")
+    symbol_bytes = take(symbol_length, "B")
+    file_path = (
+        Path(Str(file_path_bytes, "utf-8")) if flags & FLAG_HAS_FILE_PATH else None
+    )
+    source = Source(file_path, Str(code_bytes, "utf-8"))
+    symbol_table = None
+    if flags & FLAG_HAS_SYMBOL_TABLE:
+        symbol_table = SymbolTable()
+        if symbol_length > 0:
+            for name in Str(symbol_bytes, "utf-8").split("\n"):
+                symbol_table.intern(name)
+
+    token_stream = TokenStream(
+        source,
+        take(token_count, "B"),
+        take(token_count, "i"),
+        take(token_count, "i"),
+        take(token_count, "i"),
+        symbol_table,
+    )
+    return AstArena(
+        token_stream,
+        take(node_count, "B"),
+        take(node_count + 1, "i"),
+        take(slot_count, "i"),
+        take(root_count, "i"),
+    )
+
+
+def dump_expressions(
+    source: Source, tokens: List[Token], expressions: List[Expression]
+) -> bytes:
+    return dump_ast(AstArena.from_expressions(source, tokens, expressions))
+
+
+def load_expressions(
+    buffer: Buffer,
+) -> Tuple[Source, List[Token], List[Expression]]:
+    arena = load_ast(buffer)
+    tokens = arena.token_stream.to_tokens()
+    return arena.token_stream.source, tokens, arena.to_expressions(tokens)
@@ -1,27 +1,119 @@
 from wode.ast import (
     BinaryExpression,
+    BlockExpression,
+    CallExpression,
     Expression,
+    ForExpression,
+    FunctionExpression,
     GroupingExpression,
+    HashConsed,
+    IfExpression,
+    LetStatement,
     LiteralExpression,
+    MatchExpression,
+    ReturnStatement,
+    StructStatement,
     UnaryExpression,
+    WhileExpression,
+    YieldStatement,
 )
+from wode.source import Source
 from wode.token_type import TokenType
-from wode.types import Any, List, Str
+from wode.tracing import Phase, end_phase, start_phase
+from wode.types import Any, Bool, Dict, Int, List, Optional, Str, Tuple
 from wode.utils import UnreachableError
 
 SExpression = Str | List[Any]
 
 
-def convert_to_s_expression(expression: Expression) -> SExpression:
+def convert_to_s_expression(
+    expression: Expression, memo: Optional[Dict[Expression, SExpression]] = None
+) -> SExpression:
+    # Nodes are converted after their children with an explicit stack, so deeply nested trees don't hit the recursion limit
+    s_expressions: List[SExpression] = []
+    # Each node is visited to push its children, and then again with the number of children to convert it from their S-expressions
+    stack: List[Tuple[Expression, Int]] = [(expression, -1)]
+    while len(stack) > 0:
+        node, child_count = stack.pop()
+        if child_count < 0:
+            # Hash-consed subtrees are only converted once, and share their S-expression
+            if memo is not None and isinstance(node, HashConsed):
+                s_expression = memo.get(node)
+                if s_expression is not None:
+                    s_expressions.append(s_expression)
+                    continue
+            # Literals are most of the nodes, and don't have children
+            children = (
+                [] if isinstance(node, LiteralExpression) else _get_children(node)
+            )
+            if len(children) > 0:
+                stack.append((node, len(children)))
+                for child in reversed(children):
+                    stack.append((child, -1))
+                continue
+            s_expression = _convert_to_s_expression(node, [])
+        else:
+            first_child = len(s_expressions) - child_count
+            s_expression = _convert_to_s_expression(node, s_expressions[first_child:])
+            del s_expressions[first_child:]
+        if memo is not None and isinstance(node, HashConsed):
+            memo[node] = s_expression
+        s_expressions.append(s_expression)
+    return s_expressions[0]
+
+
+def _get_children(expression: Expression) -> List[Expression]:
+    # The subexpressions that are converted to S-expressions, in the order they're written
     match expression:
         case BinaryExpression():
-            return [
-                expression.operator.lexeme,
-                convert_to_s_expression(expression.left),
-                convert_to_s_expression(expression.right),
-            ]
+            return [expression.left, expression.right]
+        case CallExpression():
+            return [expression.callee, *expression.arguments]
+        case GroupingExpression():
+            return [expression.expression]
+        case UnaryExpression():
+            return [expression.right]
+        case BlockExpression():
+            return expression.statements
+        case IfExpression():
+            children: List[Expression] = []
+            for condition, body in zip(expression.conditions, expression.bodies):
+                children.append(condition)
+                children.append(body)
+            if expression.else_body is not None:
+                children.append(expression.else_body)
+            return children
+        case WhileExpression():
+            return [expression.condition, expression.body]
+        case ForExpression():
+            return [expression.iterable, expression.body]
+        case MatchExpression():
+            children = [expression.subject]
+            for pattern, arm in zip(expression.patterns, expression.arms):
+                children.append(pattern)
+                children.append(arm)
+            return children
+        case FunctionExpression():
+            return [expression.body]
+        case LetStatement():
+            return [expression.value]
+        case ReturnStatement() | YieldStatement():
+            return [] if expression.value is None else [expression.value]
+        case _:
+            return []
+
+
+def _convert_to_s_expression(
+    expression: Expression, children: List[SExpression]
+) -> SExpression:
+    # Builds a node's S-expression from its children's ones
+    match expression:
+        case BinaryExpression():
+            return [expression.operator.lexeme, children[0], children[1]]
+        case CallExpression():
+            return ["call", *children]
         case GroupingExpression():
-            return ["group", convert_to_s_expression(expression.expression)]
+            return ["group", children[0]]
         case LiteralExpression():
             match expression.literal.token_type:
                 case TokenType.FALSE:
@@ -44,9 +136,76 @@ def convert_to_s_expression(expression: Expression) -> SExpression:
                         f"Unknown token type `{expression.literal.token_type}`."
                     )
         case UnaryExpression():
+            return [expression.operator.lexeme, children[0]]
+        case BlockExpression():
+            return ["block", *children]
+        case IfExpression():
+            branches: List[SExpression] = [
+                [children[2 * i], children[2 * i + 1]]
+                for i in range(len(expression.conditions))
+            ]
+            if expression.else_body is not None:
+                branches.append(["else", children[-1]])
+            return ["if", *branches]
+        case WhileExpression():
+            return ["while", children[0], children[1]]
+        case ForExpression():
+            return ["for", expression.variable.lexeme, children[0], children[1]]
+        case MatchExpression():
+            return [
+                "match",
+                children[0],
+                *[[children[i], children[i + 1]] for i in range(1, len(children), 2)],
+            ]
+        case FunctionExpression():
+            return [
+                "->",
+                [parameter.lexeme for parameter in expression.parameters],
+                children[0],
+            ]
+        case LetStatement():
+            return ["let", expression.name.lexeme, children[0]]
+        case ReturnStatement() | YieldStatement():
+            return [expression.keyword.lexeme, *children]
+        case StructStatement():
             return [
-                expression.operator.lexeme,
-                convert_to_s_expression(expression.right),
+                "struct",
+                expression.name.lexeme,
+                *[
+                    [field_name.lexeme, field_type.lexeme]
+                    for field_name, field_type in zip(
+                        expression.field_names, expression.field_types
+                    )
+                ],
             ]
         case _:  # pragma: no cover
             raise UnreachableError(f"Unknown expression type `{type(expression)}`.")
+
+
+def convert_all_to_s_expressions(
+    expressions: List[Expression], source: Optional[Source] = None
+) -> List[SExpression]:
+    start_time = start_phase(Phase.RENDER, source)
+    memo: Dict[Expression, SExpression] = {}
+    s_expressions = [convert_to_s_expression(e, memo) for e in expressions]
+    end_phase(Phase.RENDER, source, start_time, len(s_expressions), [])
+    return s_expressions
+
+
+def format_s_expression(s_expression: SExpression) -> Str:
+    """Format an S-expression the same way as `repr`, which recurses into nested lists and can't print deep ones."""
+    parts: List[Str] = []
+    # Each item is an S-expression to format, or a separator or closing bracket to write as it is
+    stack: List[Tuple[Bool, SExpression]] = [(False, s_expression)]
+    while len(stack) > 0:
+        is_text, item = stack.pop()
+        if isinstance(item, Str):
+            parts.append(item if is_text else repr(item))
+            continue
+        parts.append("[")
+        stack.append((True, "]"))
+        for index in range(len(item) - 1, -1, -1):
+            stack.append((False, item[index]))
+            if index > 0:
+                stack.append((True, ", "))
+    return "".join(parts)
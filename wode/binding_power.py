@@ -2,7 +2,7 @@ from abc import ABC as AbstractBaseClass
 from abc import abstractmethod
 
 from wode.token_type import TokenType
-from wode.types import Float, Int, Literal, Optional, Tuple
+from wode.types import Dict, Float, Int, Literal, Optional, Tuple
 from wode.utils import UnreachableError
 
 
@@ -61,6 +61,8 @@ class InfixBindingPower(BindingPower):
 
 
 OPERATOR_BINDING_POWERS = [
+    # Calls
+    PostfixBindingPower(TokenType.LEFT_BRACKET, 10),
     # Exponentiation
     InfixBindingPower(TokenType.CARET, 9, "right"),
     # Unary
@@ -74,6 +76,13 @@ OPERATOR_BINDING_POWERS = [
     InfixBindingPower(TokenType.MINUS, 6, "left"),
     # Pipe
     InfixBindingPower(TokenType.PIPE, 5, "left"),
+    # Comparison
+    InfixBindingPower(TokenType.EQUAL_EQUAL, 4, "left"),
+    InfixBindingPower(TokenType.BANG_EQUAL, 4, "left"),
+    InfixBindingPower(TokenType.LESS, 4, "left"),
+    InfixBindingPower(TokenType.LESS_EQUAL, 4, "left"),
+    InfixBindingPower(TokenType.GREATER, 4, "left"),
+    InfixBindingPower(TokenType.GREATER_EQUAL, 4, "left"),
     # Binary operators
     PrefixBindingPower(TokenType.BANG, 4),
     InfixBindingPower(TokenType.AMPERSAND_AMPERSAND, 3, "right"),
@@ -83,14 +92,28 @@ OPERATOR_BINDING_POWERS = [
 ]
 
 
+# The binding powers of each operator, looked up once instead of searching the list for every operator
+INFIX_BINDING_POWERS: Dict[TokenType, Tuple[Float, Float]] = {
+    obp.token_type: obp.left_right()
+    for obp in OPERATOR_BINDING_POWERS
+    if isinstance(obp, InfixBindingPower)
+}
+PREFIX_BINDING_POWERS: Dict[TokenType, Tuple[None, Float]] = {
+    obp.token_type: obp.left_right()
+    for obp in OPERATOR_BINDING_POWERS
+    if isinstance(obp, PrefixBindingPower)
+}
+POSTFIX_BINDING_POWERS: Dict[TokenType, Tuple[Float, None]] = {
+    obp.token_type: obp.left_right()
+    for obp in OPERATOR_BINDING_POWERS
+    if isinstance(obp, PostfixBindingPower)
+}
+
+
 def get_infix_binding_power(operator: TokenType) -> Tuple[Float, Float]:
     try:
-        return next(
-            obp
-            for obp in OPERATOR_BINDING_POWERS
-            if isinstance(obp, InfixBindingPower) and obp.token_type == operator
-        ).left_right()
-    except StopIteration:
+        return INFIX_BINDING_POWERS[operator]
+    except KeyError:
         raise ValueError(
             f"Couldn't find binding power for infix operator `{operator}`."
         )
@@ -98,12 +121,17 @@ def get_infix_binding_power(operator: TokenType) -> Tuple[Float, Float]:
 
 def get_prefix_binding_power(operator: TokenType) -> Tuple[None, Float]:
     try:
-        return next(
-            obp
-            for obp in OPERATOR_BINDING_POWERS
-            if isinstance(obp, PrefixBindingPower) and obp.token_type == operator
-        ).left_right()
-    except StopIteration:
+        return PREFIX_BINDING_POWERS[operator]
+    except KeyError:
         raise ValueError(
             f"Couldn't find binding power for prefix operator `{operator}`."
         )
+
+
+def get_postfix_binding_power(operator: TokenType) -> Tuple[Float, None]:
+    try:
+        return POSTFIX_BINDING_POWERS[operator]
+    except KeyError:
+        raise ValueError(
+            f"Couldn't find binding power for postfix operator `{operator}`."
+        )
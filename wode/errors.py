@@ -1,5 +1,5 @@
-from wode.source import SourcePosition, SourceRange
-from wode.types import Str
+from wode.source import LineNumber, Source, SourcePosition, SourceRange
+from wode.types import Int, Str, Type
 
 
 class WodeError:
@@ -20,10 +20,9 @@ class WodeError:
         self.source = source_range.source
 
     def _get_position_specifier(self) -> Str:
+        resolved_file_path = self.source.resolved_file_path
         file_specifier = (
-            ""
-            if self.source.file_path is None
-            else (Str(self.source.file_path.resolve()) + ":")
+            "" if resolved_file_path is None else (Str(resolved_file_path) + ":")
         )
         start_specifier = Str(self.source_range.start)
         end_specifier = Str(self.source_range.end)
@@ -35,14 +34,13 @@ class WodeError:
 
     def get_message(self) -> Str:
         arrow_length = len(self.source_range)
-        arrow_string = (self.source_range.start.column.value * " ") + (
-            arrow_length * "^"
-        )
+        line_index, column = self.source_range.start.line_index_and_column
+        arrow_string = (column * " ") + (arrow_length * "^")
         position_specifier = self._get_position_specifier()
         return "\n".join(
             [
                 f"An error occurred at {position_specifier}",
-                self.source.get_line(self.source_range.start.line_number).rstrip("\n"),
+                self.source.get_line(LineNumber(line_index + 1)).rstrip("\n"),
                 arrow_string,
                 self.message,
             ]
@@ -107,3 +105,70 @@ class TooManyDecimalPointsError(WodeError):
         float_with_too_many_decimal_points = location.lexeme
         message = f"The float `{float_with_too_many_decimal_points}` has too many decimal points."
         super().__init__(error_type, message, location)
+
+
+class UnresolvedNameError(WodeError):
+    def __init__(self, location: SourceRange) -> None:
+        error_type = "UnresolvedNameError"
+        name = location.lexeme
+        message = f"The name `{name}` isn't defined here."
+        super().__init__(error_type, message, location)
+
+
+class DuplicateParameterError(WodeError):
+    def __init__(self, location: SourceRange) -> None:
+        error_type = "DuplicateParameterError"
+        name = location.lexeme
+        message = f"The parameter `{name}` is already defined by this function."
+        super().__init__(error_type, message, location)
+
+
+class TypeMismatchError(WodeError):
+    def __init__(
+        self, location: SourceRange, expected_type: Str = "", actual_type: Str = ""
+    ) -> None:
+        error_type = "TypeMismatchError"
+        message = (
+            f"This has the type `{actual_type}`, but `{expected_type}` was expected."
+        )
+        super().__init__(error_type, message, location)
+
+
+class InfiniteTypeError(WodeError):
+    def __init__(
+        self, location: SourceRange, expected_type: Str = "", actual_type: Str = ""
+    ) -> None:
+        error_type = "InfiniteTypeError"
+        message = f"This has the type `{actual_type}`, which can't be `{expected_type}` because that would contain itself."
+        super().__init__(error_type, message, location)
+
+
+class OperandTypeError(WodeError):
+    def __init__(
+        self, location: SourceRange, operator: Str = "", operand_type: Str = ""
+    ) -> None:
+        error_type = "OperandTypeError"
+        message = (
+            f"The operator `{operator}` can't be used with the type `{operand_type}`."
+        )
+        super().__init__(error_type, message, location)
+
+
+class UnknownTypeError(WodeError):
+    def __init__(self, location: SourceRange) -> None:
+        error_type = "UnknownTypeError"
+        type_name = location.lexeme
+        message = f"The type `{type_name}` isn't defined."
+        super().__init__(error_type, message, location)
+
+
+def rebuild_error(
+    error_type: Type[WodeError], source: Source, start: Int, end: Int
+) -> WodeError:
+    """Create an error of the same type at a new location.
+
+    Errors that cover a single position are rebuilt from a `SourcePosition` and every other error from a `SourceRange`, which matches how the scanner and parser create them.
+    """
+    if start == end:
+        return error_type(SourcePosition(source, start))  # type: ignore
+    return error_type(SourceRange(source, start, end))  # type: ignore
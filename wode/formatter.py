@@ -0,0 +1,319 @@
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from wode.ast import Expression, UnaryExpression
+from wode.ast_arena import NODE_LAYOUTS, get_child_nodes, get_node_kind
+from wode.errors import WodeError
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.token import Token, TriviaType
+from wode.token_type import TokenType
+from wode.tracing import record_cache_lookup
+from wode.types import (
+    Bool,
+    Dict,
+    Int,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Str,
+    Tuple,
+)
+
+# Bump this whenever the formatting rules change, so cached results from older versions are ignored
+FORMATTER_VERSION = 3
+
+INDENT = "    "
+
+# The tokens that end an operand, so a bracket after one of them starts a call's arguments
+_OPERAND_END_TOKEN_TYPES = frozenset(
+    [
+        TokenType.INTEGER,
+        TokenType.FLOAT,
+        TokenType.STRING,
+        TokenType.IDENTIFIER,
+        TokenType.TRUE,
+        TokenType.FALSE,
+        TokenType.NOTHING,
+        TokenType.RIGHT_BRACKET,
+    ]
+)
+# The tokens that don't have a space before them
+_CLOSING_TOKEN_TYPES = frozenset(
+    [TokenType.SEMICOLON, TokenType.COMMA, TokenType.COLON, TokenType.RIGHT_BRACKET]
+)
+_OPENING_BRACKET_TOKEN_TYPES = frozenset(
+    [
+        TokenType.LEFT_BRACKET,
+        TokenType.LEFT_CURLY_BRACKET,
+        TokenType.LEFT_SQUARE_BRACKET,
+    ]
+)
+_CLOSING_BRACKET_TOKEN_TYPES = frozenset(
+    [
+        TokenType.RIGHT_BRACKET,
+        TokenType.RIGHT_CURLY_BRACKET,
+        TokenType.RIGHT_SQUARE_BRACKET,
+    ]
+)
+# The tokens that stay on the same line as the closing curly bracket before them
+_AFTER_BLOCK_TOKEN_TYPES = frozenset(
+    [
+        TokenType.SEMICOLON,
+        TokenType.COMMA,
+        TokenType.RIGHT_BRACKET,
+        TokenType.ELIF,
+        TokenType.ELSE,
+    ]
+)
+
+
+def _get_unary_operators(expressions: List[Expression]) -> Set[Int]:
+    # The IDs of the tokens that are prefix operators, which aren't followed by a space
+    unary_operators: Set[Int] = set()
+    stack = List(expressions)
+    while len(stack) > 0:
+        expression = stack.pop()
+        if isinstance(expression, UnaryExpression):
+            unary_operators.add(id(expression.operator))
+        stack.extend(
+            get_child_nodes(expression, NODE_LAYOUTS[get_node_kind(expression)])
+        )
+    return unary_operators
+
+
+def _is_attached(
+    token: Token, previous_token: Optional[Token], unary_operators: Set[Int]
+) -> Bool:
+    # Whether a token goes straight after the previous one on the same line, without a space
+    if token.token_type in _CLOSING_TOKEN_TYPES:
+        return True
+    if previous_token is None:
+        return False
+    if token.token_type == TokenType.RIGHT_CURLY_BRACKET:
+        # An empty block
+        return previous_token.token_type == TokenType.LEFT_CURLY_BRACKET
+    return (
+        id(previous_token) in unary_operators
+        or previous_token.token_type == TokenType.LEFT_BRACKET
+        or (
+            token.token_type == TokenType.LEFT_BRACKET
+            and previous_token.token_type in _OPERAND_END_TOKEN_TYPES
+        )
+    )
+
+
+def _get_token_text(source: Source, token: Token) -> Str:
+    start = token.source_range.start.position
+    end = token.source_range.end.position
+    # The range of a string token doesn't include its quotation marks
+    if token.token_type == TokenType.STRING:
+        return source.code[start - 1 : end + 1]
+    return source.code[start:end]
+
+
+def format_tokens(
+    source: Source, tokens: List[Token], expressions: List[Expression]
+) -> Str:
+    """Format tokens that were scanned with `keep_trivia`, using their AST to tell prefix and infix operators apart.
+
+    Each statement goes on its own line with a space around infix operators, comments are kept and single blank lines between statements are preserved.
+    The statements in a block and the arms of a match are indented on their own lines.
+    """
+    unary_operators = _get_unary_operators(expressions)
+    parts: List[Str] = []
+    # Whether the current line has any text on it
+    is_line_open = False
+    # Whether we're part way through a statement, so new lines should be indented
+    is_in_statement = False
+    # The number of line breaks in the source since the last token or comment
+    n_line_breaks = 0
+    previous_token: Optional[Token] = None
+    # Whether the previous token ended its line, like a semicolon or the start of a block
+    is_line_ended = False
+    # The types of the brackets that are open, innermost last
+    open_brackets: List[TokenType] = []
+
+    def end_line() -> None:
+        nonlocal is_line_open
+        if is_line_open:
+            parts.append("\n")
+            is_line_open = False
+
+    def start_line() -> None:
+        nonlocal is_line_open
+        if n_line_breaks >= 2 and len(parts) > 0 and not is_in_statement:
+            parts.append("\n")
+        n_indents = open_brackets.count(TokenType.LEFT_CURLY_BRACKET)
+        parts.append(INDENT * (n_indents + is_in_statement))
+        is_line_open = True
+
+    for token in tokens:
+        for trivia in token.leading_trivia:
+            text = trivia.get_text(source)
+            match trivia.trivia_type:
+                case TriviaType.WHITESPACE:
+                    n_line_breaks += text.count("\n")
+                case TriviaType.COMMENT:
+                    if is_line_open and n_line_breaks == 0:
+                        # Keep comments at the end of a line on that line
+                        parts.append(" ")
+                    else:
+                        end_line()
+                        start_line()
+                    parts.append(text.rstrip())
+                    is_line_open = True
+                    end_line()
+                    # The comment includes the line break at its end
+                    n_line_breaks = 1
+
+        if token.token_type == TokenType.EOF:
+            break
+
+        token_type = token.token_type
+        if token_type in _CLOSING_BRACKET_TOKEN_TYPES:
+            open_brackets.pop()
+        if token_type == TokenType.RIGHT_CURLY_BRACKET:
+            if (
+                previous_token is not None
+                and previous_token.token_type != TokenType.LEFT_CURLY_BRACKET
+            ):
+                end_line()
+            # The last match arm or struct field doesn't need a comma after it
+            is_in_statement = False
+        elif is_line_ended and not (
+            previous_token is not None
+            and previous_token.token_type == TokenType.RIGHT_CURLY_BRACKET
+            and token_type in _AFTER_BLOCK_TOKEN_TYPES
+        ):
+            end_line()
+        if not is_line_open:
+            start_line()
+        elif not _is_attached(token, previous_token, unary_operators):
+            parts.append(" ")
+        parts.append(_get_token_text(source, token))
+        is_line_open = True
+        if token_type in _OPENING_BRACKET_TOKEN_TYPES:
+            open_brackets.append(token_type)
+        is_line_ended = (
+            token_type == TokenType.SEMICOLON
+            or token_type == TokenType.LEFT_CURLY_BRACKET
+            or token_type == TokenType.RIGHT_CURLY_BRACKET
+            # Commas between match arms and struct fields
+            or (
+                token_type == TokenType.COMMA
+                and open_brackets[-1:] == [TokenType.LEFT_CURLY_BRACKET]
+            )
+        )
+        is_in_statement = not is_line_ended
+        n_line_breaks = 0
+        previous_token = token
+
+    end_line()
+    return "".join(parts)
+
+
+def format_source(source: Source) -> Tuple[Optional[Str], List[WodeError]]:
+    """Format some source code, or return the errors that stopped it from being formatted."""
+    tokens, errors = scan_all_tokens(source, keep_trivia=True)
+    if len(errors) > 0:
+        return None, errors
+    expressions, errors = parse_all(ParserState(tokens, source))
+    if len(errors) > 0:
+        return None, errors
+    return format_tokens(source, tokens, expressions), []
+
+
+def get_content_hash(content: bytes) -> Str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class FormatResult(NamedTuple):
+    file_path: Path
+    # Whether the file was, or in check mode would be, rewritten
+    is_changed: Bool
+    # The hash of the formatted file, or `None` if it couldn't be formatted
+    content_hash: Optional[Str]
+    error_messages: List[Str]
+
+
+def format_file(file_path: Path, check: Bool = False) -> FormatResult:
+    content = file_path.read_bytes()
+    source = Source(file_path, content.decode("utf-8"))
+    formatted_code, errors = format_source(source)
+    if formatted_code is None:
+        return FormatResult(file_path, False, None, [e.get_message() for e in errors])
+    formatted_content = formatted_code.encode("utf-8")
+    is_changed = formatted_content != content
+    if is_changed and not check:
+        file_path.write_bytes(formatted_content)
+    # In check mode an unformatted file isn't cached, since it's still unformatted
+    content_hash = None if is_changed and check else get_content_hash(formatted_content)
+    return FormatResult(file_path, is_changed, content_hash, [])
+
+
+class FormatCache:
+    """The content hashes of files that were already formatted, so they can be skipped next time."""
+
+    def __init__(self, cache_path: Optional[Path] = None) -> None:
+        self.cache_path = cache_path
+        self.hashes: Dict[Str, Str] = {}
+        if cache_path is not None and cache_path.exists():
+            try:
+                cache = json.loads(cache_path.read_text())
+                if cache.get("version") == FORMATTER_VERSION:
+                    self.hashes = cache["hashes"]
+            except (ValueError, KeyError):
+                # Start again from an empty cache if it can't be read
+                pass
+
+    def is_formatted(self, file_path: Path, content_hash: Str) -> Bool:
+        hit = self.hashes.get(Str(file_path.resolve())) == content_hash
+        record_cache_lookup("fmt", hit)
+        return hit
+
+    def update(self, result: FormatResult) -> None:
+        key = Str(result.file_path.resolve())
+        if result.content_hash is None:
+            self.hashes.pop(key, None)
+        else:
+            self.hashes[key] = result.content_hash
+
+    def save(self) -> None:
+        if self.cache_path is not None:
+            self.cache_path.write_text(
+                json.dumps({"version": FORMATTER_VERSION, "hashes": self.hashes})
+            )
+
+
+def format_files(
+    file_paths: List[Path], check: Bool, cache: FormatCache, workers: Int = 0
+) -> Iterator[FormatResult]:
+    """Format files in parallel, yielding each result as soon as it's ready.
+
+    Files whose content hasn't changed since they were last formatted are skipped, and with no workers every file is formatted in this process.
+    """
+    unformatted_file_paths = [
+        p
+        for p in file_paths
+        if not cache.is_formatted(p, get_content_hash(p.read_bytes()))
+    ]
+    if workers <= 1 or len(unformatted_file_paths) <= 1:
+        for file_path in unformatted_file_paths:
+            result = format_file(file_path, check)
+            cache.update(result)
+            yield result
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [
+            executor.submit(format_file, p, check) for p in unformatted_file_paths
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            cache.update(result)
+            yield result
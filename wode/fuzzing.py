@@ -0,0 +1,418 @@
+import random
+
+from wode.ast import Expression
+from wode.ast_arena import AstArena
+from wode.ast_serialization import dump_expressions, load_expressions
+from wode.ast_to_s_expression import SExpression, convert_to_s_expression
+from wode.binding_power import (
+    OPERATOR_BINDING_POWERS,
+    InfixBindingPower,
+    PrefixBindingPower,
+)
+from wode.errors import WodeError
+from wode.hash_consing import AstInterner
+from wode.incremental import IncrementalScanner
+from wode.parallel_parser import parse_all_in_chunks
+from wode.parser import ParserState, parse_all
+from wode.scanner import reserved_keywords, scan_all_tokens, token_mapping
+from wode.source import Source
+from wode.timing import ScalingMeasurement, measure_scaling
+from wode.token import Token
+from wode.token_stream import TokenStream
+from wode.token_type import TokenType
+from wode.types import (
+    Any,
+    Callable,
+    Dict,
+    Float,
+    Int,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Str,
+    Tuple,
+)
+
+ScannerBackend = Callable[[Source], Tuple[List[Token], List[WodeError]]]
+ParserBackend = Callable[
+    [Source, List[Token]], Tuple[List[Expression], List[WodeError]]
+]
+
+# The lexeme of each token type, built from the scanner's own tables so new tokens are fuzzed automatically
+LEXEMES: Dict[TokenType, Str] = {
+    **{token_type: lexeme for lexeme, token_type in token_mapping.items()},
+    **{token_type: lexeme for lexeme, token_type in reserved_keywords.items()},
+}
+PREFIX_OPERATORS = [
+    LEXEMES[obp.token_type]
+    for obp in OPERATOR_BINDING_POWERS
+    if isinstance(obp, PrefixBindingPower)
+]
+# The pipe and assignment have binding powers, but the parser doesn't accept them between any two expressions yet
+INFIX_OPERATORS = [
+    LEXEMES[obp.token_type]
+    for obp in OPERATOR_BINDING_POWERS
+    if isinstance(obp, InfixBindingPower)
+    and obp.token_type not in (TokenType.PIPE, TokenType.EQUAL)
+]
+LITERAL_KEYWORDS = [
+    LEXEMES[t] for t in [TokenType.TRUE, TokenType.FALSE, TokenType.NOTHING]
+]
+# How block-like expressions start, a statement that starts with one ends after its block
+BLOCK_LIKE_STARTS = ("{", "if ", "while ", "for ", "match ")
+# Whitespace and comments that can go between any two tokens
+SEPARATORS = [" ", " ", " ", "", "\n", "  ", "\t", " # Comment\n"]
+
+
+class ProgramGenerator:
+    """Generates random programs that follow the grammar, with occasional mistakes to exercise the error paths."""
+
+    def __init__(self, rng: random.Random, error_rate: Float = 0.05) -> None:
+        self.rng = rng
+        self.error_rate = error_rate
+
+    def get_separator(self) -> Str:
+        return self.rng.choice(SEPARATORS)
+
+    def get_identifier(self) -> Str:
+        # Avoid generating reserved keywords
+        name = self.rng.choice(["x", "foo", "bar_2", "_a", "Baz"])
+        return name + self.rng.choice(["", "", "1", "_b"])
+
+    def get_literal(self) -> Str:
+        match self.rng.randrange(5):
+            case 0:
+                return Str(self.rng.randrange(1000))
+            case 1:
+                return f"{self.rng.randrange(100)}.{self.rng.randrange(100)}"
+            case 2:
+                return '"' + self.rng.choice(["", "a", "hello world", "#", ";"]) + '"'
+            case 3:
+                return self.rng.choice(LITERAL_KEYWORDS)
+            case _:
+                return self.get_identifier()
+
+    def get_mistake(self) -> Str:
+        # Any token from the scanner's tables, or characters that the scanner rejects
+        return self.rng.choice(
+            List(token_mapping) + List(reserved_keywords) + ["$", "1.2.3", ".5", "1."]
+        )
+
+    def get_expression(self, max_depth: Int) -> Str:
+        if self.rng.random() < self.error_rate:
+            return self.get_mistake()
+        if max_depth <= 0:
+            return self.get_literal()
+        match self.rng.randrange(7):
+            case 0:
+                return self.get_literal()
+            case 5:
+                parameters = [
+                    self.get_identifier() for _ in range(self.rng.randrange(3))
+                ]
+                return (
+                    "("
+                    + ", ".join(parameters)
+                    + ") ->"
+                    + self.get_separator()
+                    + self.get_expression(max_depth - 1)
+                )
+            case 6:
+                return self.get_block_like(max_depth - 1)
+            case 1:
+                return (
+                    self.rng.choice(PREFIX_OPERATORS)
+                    + self.get_separator()
+                    + self.get_expression(max_depth - 1)
+                )
+            case 2:
+                return "(" + self.get_expression(max_depth - 1) + ")"
+            case 3:
+                arguments = [
+                    self.get_expression(max_depth - 1)
+                    for _ in range(self.rng.randrange(3))
+                ]
+                return (
+                    self.get_expression(max_depth - 1)
+                    + "("
+                    + ("," + self.get_separator()).join(arguments)
+                    + ")"
+                )
+            case _:
+                return (
+                    self.get_expression(max_depth - 1)
+                    + self.get_separator()
+                    + self.rng.choice(INFIX_OPERATORS)
+                    + self.get_separator()
+                    + self.get_expression(max_depth - 1)
+                )
+
+    def get_block(self, max_depth: Int) -> Str:
+        statements = [
+            self.get_statement(max_depth) for _ in range(self.rng.randrange(3))
+        ]
+        return "{" + self.get_separator() + self.get_separator().join(statements) + "}"
+
+    def get_block_like(self, max_depth: Int) -> Str:
+        # A block, or an expression that ends with one
+        separator = self.get_separator()
+        match self.rng.randrange(5):
+            case 0:
+                return self.get_block(max_depth)
+            case 1:
+                branches = [
+                    f"{keyword} {self.get_expression(max_depth)} {self.get_block(max_depth)}"
+                    for keyword in ["if"] + ["elif"] * self.rng.randrange(2)
+                ]
+                if self.rng.random() < 0.5:
+                    branches.append("else " + self.get_block(max_depth))
+                return separator.join(branches)
+            case 2:
+                return f"while {self.get_expression(max_depth)} {self.get_block(max_depth)}"
+            case 3:
+                return f"for {self.get_identifier()} in {self.get_expression(max_depth)}{separator}{self.get_block(max_depth)}"
+            case _:
+                arms = [
+                    f"{self.get_literal()} =>{separator}{self.get_expression(max_depth)}"
+                    for _ in range(self.rng.randrange(3))
+                ]
+                return f"match {self.get_expression(max_depth)} {{{', '.join(arms)}}}"
+
+    def get_statement(self, max_depth: Int) -> Str:
+        terminator = "" if self.rng.random() < self.error_rate else ";"
+        separator = self.get_separator()
+        match self.rng.randrange(10) if max_depth > 0 else 0:
+            case 1:
+                return f"let {self.get_identifier()} ={separator}{self.get_expression(max_depth)}{terminator}"
+            case 2:
+                keyword = self.rng.choice(["return", "yield"])
+                value = (
+                    self.get_expression(max_depth) if self.rng.random() < 0.7 else ""
+                )
+                return f"{keyword} {value}{terminator}"
+            case 3:
+                fields = [
+                    f"{self.get_identifier()}:{separator}{self.get_identifier()}"
+                    for _ in range(self.rng.randrange(3))
+                ]
+                return f"struct {self.get_identifier()} {{{', '.join(fields)}}}"
+            case 4:
+                return self.get_block_like(max_depth - 1)
+            case _:
+                expression = self.get_expression(max_depth)
+                # Keep any operators after a leading block in the statement
+                if expression.startswith(BLOCK_LIKE_STARTS):
+                    expression = f"({expression})"
+                return expression + separator + terminator
+
+    def get_program(self, n_statements: Int, max_depth: Int = 3) -> Str:
+        return "\n".join(self.get_statement(max_depth) for _ in range(n_statements))
+
+
+def _scan_incrementally(source: Source) -> Tuple[List[Token], List[WodeError]]:
+    scanner = IncrementalScanner(source.code, source.file_path)
+    return scanner.tokens, scanner.errors
+
+
+def _scan_via_token_stream(source: Source) -> Tuple[List[Token], List[WodeError]]:
+    tokens, errors = scan_all_tokens(source)
+    return TokenStream.from_tokens(source, tokens).to_tokens(), errors
+
+
+def _parse_via_arena(
+    source: Source, tokens: List[Token]
+) -> Tuple[List[Expression], List[WodeError]]:
+    expressions, errors = parse_all(ParserState(tokens, source))
+    arena = AstArena.from_expressions(source, tokens, expressions)
+    return arena.to_expressions(), errors
+
+
+def _parse_via_serialization(
+    source: Source, tokens: List[Token]
+) -> Tuple[List[Expression], List[WodeError]]:
+    expressions, errors = parse_all(ParserState(tokens, source))
+    _, _, loaded_expressions = load_expressions(
+        dump_expressions(source, tokens, expressions)
+    )
+    return loaded_expressions, errors
+
+
+def _parse_in_chunks(
+    source: Source, tokens: List[Token]
+) -> Tuple[List[Expression], List[WodeError]]:
+    # Split after every statement, in this process so each program doesn't start a pool
+    return parse_all_in_chunks(source, tokens, min_chunk_size=1)
+
+
+def _parse_with_hash_consing(
+    source: Source, tokens: List[Token]
+) -> Tuple[List[Expression], List[WodeError]]:
+    return parse_all(ParserState(tokens, source, interner=AstInterner()))
+
+
+def _parse_reference(
+    source: Source, tokens: List[Token]
+) -> Tuple[List[Expression], List[WodeError]]:
+    return parse_all(ParserState(tokens, source))
+
+
+# The engines that are compared against each other, the first one of each is the reference
+SCANNER_BACKENDS: Dict[Str, ScannerBackend] = {
+    "reference": scan_all_tokens,
+    "incremental": _scan_incrementally,
+    "token_stream": _scan_via_token_stream,
+}
+PARSER_BACKENDS: Dict[Str, ParserBackend] = {
+    "reference": _parse_reference,
+    "arena": _parse_via_arena,
+    "serialization": _parse_via_serialization,
+    "chunked": _parse_in_chunks,
+    "hash_consed": _parse_with_hash_consing,
+}
+
+
+def register_scanner_backend(name: Str, backend: ScannerBackend) -> None:
+    SCANNER_BACKENDS[name] = backend
+
+
+def register_parser_backend(name: Str, backend: ParserBackend) -> None:
+    PARSER_BACKENDS[name] = backend
+
+
+def _summarise_tokens(tokens: List[Token]) -> List[Tuple[Any, ...]]:
+    return [
+        (
+            t.token_type,
+            t.lexeme,
+            t.source_range.start.position,
+            t.source_range.end.position,
+        )
+        for t in tokens
+    ]
+
+
+def _summarise_errors(errors: List[WodeError]) -> List[Tuple[Any, ...]]:
+    return [
+        (e.error_type, e.source_range.start.position, e.source_range.end.position)
+        for e in errors
+    ]
+
+
+def _summarise_expressions(expressions: List[Expression]) -> List[SExpression]:
+    return [convert_to_s_expression(e) for e in expressions]
+
+
+class Divergence(NamedTuple):
+    code: Str
+    backend: Str
+    reference_result: Any
+    result: Any
+
+    def __str__(self) -> Str:
+        return "\n".join(
+            [
+                f"The `{self.backend}` backend disagrees with the reference on {self.code!r}",
+                f"Expected: {self.reference_result}",
+                f"Got:      {self.result}",
+            ]
+        )
+
+
+def compare_backends(code: Str) -> List[Divergence]:
+    """Scan and parse some code with every backend, returning every way they disagree with the reference backends."""
+    source = Source(None, code)
+    divergences: List[Divergence] = []
+
+    def compare(backend: Str, reference_result: Any, result: Any) -> None:
+        if result != reference_result:
+            divergences.append(Divergence(code, backend, reference_result, result))
+
+    (reference_scanner, *other_scanners) = SCANNER_BACKENDS.items()
+    reference_tokens, reference_scanner_errors = reference_scanner[1](source)
+    reference_scan = (
+        _summarise_tokens(reference_tokens),
+        _summarise_errors(reference_scanner_errors),
+    )
+    for name, scanner in other_scanners:
+        try:
+            tokens, errors = scanner(source)
+            result = (_summarise_tokens(tokens), _summarise_errors(errors))
+        except Exception as e:
+            result = e
+        compare(f"scanner:{name}", reference_scan, result)
+
+    # Parse with the reference tokens, so a scanner divergence isn't reported again by every parser
+    (reference_parser, *other_parsers) = PARSER_BACKENDS.items()
+    expressions, errors = reference_parser[1](source, reference_tokens)
+    reference_parse = (_summarise_expressions(expressions), _summarise_errors(errors))
+    for name, parser in other_parsers:
+        try:
+            expressions, errors = parser(source, reference_tokens)
+            result = (_summarise_expressions(expressions), _summarise_errors(errors))
+        except Exception as e:
+            result = e
+        compare(f"parser:{name}", reference_parse, result)
+    return divergences
+
+
+def run_differential_fuzzing(
+    seed: Int, n_programs: Int, n_statements: Int = 5
+) -> List[Divergence]:
+    generator = ProgramGenerator(random.Random(seed))
+    divergences: List[Divergence] = []
+    for _ in range(n_programs):
+        divergences.extend(compare_backends(generator.get_program(n_statements)))
+    return divergences
+
+
+def _scan_and_parse(source: Source) -> None:
+    tokens, _ = scan_all_tokens(source)
+    parse_all(ParserState(tokens, source))
+
+
+# Ways of growing an input, each of which should take time proportional to the size of the input
+INPUT_SHAPES: Dict[Str, Callable[[random.Random, Int], Str]] = {
+    "many statements": lambda rng, n: ProgramGenerator(rng, 0).get_program(n),
+    "one long line": lambda rng, n: " + ".join(
+        ProgramGenerator(rng, 0).get_literal() for _ in range(n)
+    )
+    + ";",
+    "long identifier": lambda rng, n: "x" * (10 * n) + ";",
+    "long string": lambda rng, n: '"' + "a" * (10 * n) + '";',
+    "long comment": lambda rng, n: "#" + "a" * (10 * n) + "\n1;",
+    "nested prefix operators": lambda rng, n: "-" * n + "1;",
+}
+
+
+def run_timing_fuzzing(
+    seed: Int,
+    sizes: Sequence[Int] = (50, 100, 200),
+    max_growth_exponent: Float = 1.5,
+    repeat: Int = 3,
+    shapes: Optional[List[Str]] = None,
+) -> Tuple[List[ScalingMeasurement], List[ScalingMeasurement]]:
+    """Time scanning and parsing on inputs of each shape at increasing sizes.
+
+    Returns every measurement and the ones whose time grew faster than `size ** max_growth_exponent`.
+    """
+    measurements: List[ScalingMeasurement] = []
+    for shape in INPUT_SHAPES if shapes is None else shapes:
+        make_code = INPUT_SHAPES[shape]
+
+        def make_source(size: Int) -> Source:
+            # Use the same seed for every size so only the size changes
+            return Source(None, make_code(random.Random(seed), size))
+
+        measurements.append(
+            measure_scaling(
+                f"scan {shape}", make_source, scan_all_tokens, sizes, repeat
+            )
+        )
+        measurements.append(
+            measure_scaling(
+                f"scan and parse {shape}", make_source, _scan_and_parse, sizes, repeat
+            )
+        )
+    flagged = [m for m in measurements if m.growth_exponent > max_growth_exponent]
+    return measurements, flagged
@@ -0,0 +1,81 @@
+from wode.ast import (
+    Expression,
+    HashConsed,
+    SharedBinaryExpression,
+    SharedLiteralExpression,
+    SharedUnaryExpression,
+)
+from wode.token import Token
+from wode.tracing import record_cache_lookup
+from wode.types import Any, Dict, Int, Tuple, cast
+
+# Tags that keep the keys of different kinds of node apart
+_LITERAL = 0
+_UNARY = 1
+_BINARY = 2
+
+
+def _get_structural_hash(expression: Expression) -> Int:
+    # Nodes that aren't hash-consed are only identical to themselves
+    if isinstance(expression, HashConsed):
+        return expression.structural_hash
+    return id(expression)
+
+
+class AstInterner:
+    """Builds hash-consed nodes, so every structurally identical subtree is a single shared object.
+
+    Two nodes are structurally identical if they're the same kind of node with the same token types, lexemes and children, wherever they are in the source.
+    A shared node keeps the tokens of the first subtree it was built for, so its positions only point at one of the places it appears.
+    """
+
+    def __init__(self) -> None:
+        self._nodes: Dict[Tuple[Any, ...], Expression] = {}
+
+    def __len__(self) -> Int:
+        return len(self._nodes)
+
+    def _lookup(self, key: Tuple[Any, ...]) -> Any:
+        shared_expression = self._nodes.get(key)
+        record_cache_lookup("hash_consing", shared_expression is not None)
+        return shared_expression
+
+    def literal(self, literal: Token) -> SharedLiteralExpression:
+        key = (_LITERAL, literal.token_type, literal.lexeme)
+        shared_expression = self._lookup(key)
+        if shared_expression is None:
+            shared_expression = SharedLiteralExpression(literal, hash(key))
+            self._nodes[key] = shared_expression
+        return cast(SharedLiteralExpression, shared_expression)
+
+    def unary(self, operator: Token, right: Expression) -> SharedUnaryExpression:
+        # The children are already shared, so identical children are the same object
+        key = (_UNARY, operator.token_type, id(right))
+        shared_expression = self._lookup(key)
+        if shared_expression is None:
+            structural_hash = hash(
+                (_UNARY, operator.token_type, _get_structural_hash(right))
+            )
+            shared_expression = SharedUnaryExpression(operator, right, structural_hash)
+            self._nodes[key] = shared_expression
+        return cast(SharedUnaryExpression, shared_expression)
+
+    def binary(
+        self, left: Expression, operator: Token, right: Expression
+    ) -> SharedBinaryExpression:
+        key = (_BINARY, operator.token_type, id(left), id(right))
+        shared_expression = self._lookup(key)
+        if shared_expression is None:
+            structural_hash = hash(
+                (
+                    _BINARY,
+                    operator.token_type,
+                    _get_structural_hash(left),
+                    _get_structural_hash(right),
+                )
+            )
+            shared_expression = SharedBinaryExpression(
+                left, operator, right, structural_hash
+            )
+            self._nodes[key] = shared_expression
+        return cast(SharedBinaryExpression, shared_expression)
@@ -0,0 +1,217 @@
+from array import array
+from pathlib import Path
+
+from wode.errors import WodeError, rebuild_error
+from wode.scanner import scan_token_at
+from wode.source import Source, SourceRange
+from wode.symbol_table import SymbolTable
+from wode.token import EOFToken, IdentifierToken, Token
+from wode.token_stream import NO_SYMBOL_ID, TOKEN_TYPE_CODES, TokenStream
+from wode.token_type import TokenType
+from wode.types import Int, List, NamedTuple, Optional, Str, Type, Union
+
+# The scanner looks at most this many characters past the start of a token when deciding what it is
+SCANNER_LOOKAHEAD = 3
+
+
+class ScanStep(NamedTuple):
+    """The result of one call to `scan_token_at`, stored as offsets so it can be reused after an edit."""
+
+    # The positions of the scanner before and after the step
+    start: Int
+    end: Int
+    # A token type, an error type, or nothing for whitespace and comments
+    kind: Union[TokenType, Type[WodeError], None]
+    # The range of the token or error, which can differ from the step's range
+    item_start: Int
+    item_end: Int
+
+    def get_lookahead_end(self) -> Int:
+        # The end of the characters the scanner read to produce this step
+        return max(self.end + 1, self.start + SCANNER_LOOKAHEAD)
+
+    def shift(self, offset: Int) -> "ScanStep":
+        return ScanStep(
+            self.start + offset,
+            self.end + offset,
+            self.kind,
+            self.item_start + offset,
+            self.item_end + offset,
+        )
+
+
+class IncrementalScanner:
+    """Keeps the scanned tokens of a document up to date as it is edited.
+
+    After an edit, only the steps from just before the edit up to the first step that lines up with a step from before the edit are scanned again, and the rest are reused.
+    """
+
+    def __init__(
+        self,
+        code: Str,
+        file_path: Optional[Path] = None,
+        symbol_table: Optional[SymbolTable] = None,
+    ) -> None:
+        self.file_path = file_path
+        self.symbol_table = SymbolTable() if symbol_table is None else symbol_table
+        self.source = Source(file_path, code)
+        self.steps: List[ScanStep] = []
+        self._scan_from(0, self.steps, [], 0, 0)
+        self._tokens: Optional[List[Token]] = None
+        self._errors: Optional[List[WodeError]] = None
+        self._token_stream: Optional[TokenStream] = None
+
+    def _scan_from(
+        self,
+        position: Int,
+        new_steps: List[ScanStep],
+        old_steps: List[ScanStep],
+        resync_position: Int,
+        offset: Int,
+    ) -> Int:
+        """Scan from a position, stopping early if the scanner reaches the start of one of the old steps.
+
+        Returns the number of steps that were scanned.
+        """
+        # The old steps that start after the edit, indexed by where they would start in the new code
+        old_step_indices = {
+            step.start + offset: i
+            for i, step in enumerate(old_steps)
+            if step.start + offset >= resync_position
+        }
+        n_scanned_steps = 0
+        while True:
+            old_step_index = old_step_indices.get(position)
+            if old_step_index is not None:
+                # The scanner's state is just its position, so from here on the old steps are still valid
+                new_steps.extend(s.shift(offset) for s in old_steps[old_step_index:])
+                return n_scanned_steps
+
+            token, error, new_position = scan_token_at(
+                self.source, position, self.symbol_table
+            )
+            n_scanned_steps += 1
+            if token is not None:
+                new_steps.append(
+                    ScanStep(
+                        position,
+                        new_position,
+                        token.token_type,
+                        token.source_range.start.position,
+                        token.source_range.end.position,
+                    )
+                )
+                if token.token_type == TokenType.EOF:
+                    return n_scanned_steps
+            elif error is not None:
+                new_steps.append(
+                    ScanStep(
+                        position,
+                        new_position,
+                        type(error),
+                        error.source_range.start.position,
+                        error.source_range.end.position,
+                    )
+                )
+            else:
+                new_steps.append(ScanStep(position, new_position, None, 0, 0))
+            position = new_position
+
+    def apply_edit(self, start: Int, end: Int, new_text: Str) -> Int:
+        """Replace the code between two positions and rescan the affected steps.
+
+        Returns the number of steps that were scanned again.
+        """
+        code = self.source.code
+        if not 0 <= start <= end <= len(code):
+            raise IndexError(f"The edit from `{start}` to `{end}` is out of bounds.")
+        self.source = Source(self.file_path, code[:start] + new_text + code[end:])
+        offset = len(new_text) - (end - start)
+
+        # Keep every step that didn't read any of the edited characters
+        n_kept_steps = 0
+        while (
+            n_kept_steps < len(self.steps)
+            and self.steps[n_kept_steps].get_lookahead_end() <= start
+        ):
+            n_kept_steps += 1
+        old_steps = self.steps[n_kept_steps:]
+        new_steps = self.steps[:n_kept_steps]
+        restart_position = new_steps[-1].end if n_kept_steps > 0 else 0
+
+        n_scanned_steps = self._scan_from(
+            restart_position, new_steps, old_steps, start + len(new_text), offset
+        )
+        self.steps = new_steps
+        self._tokens = None
+        self._errors = None
+        self._token_stream = None
+        return n_scanned_steps
+
+    def _make_token(self, step: ScanStep) -> Token:
+        match step.kind:
+            case TokenType.EOF:
+                return EOFToken(self.source)
+            case TokenType.IDENTIFIER:
+                name = self.source.code[step.item_start : step.item_end]
+                return IdentifierToken(
+                    SourceRange(self.source, step.item_start, step.item_end),
+                    self.symbol_table,
+                    self.symbol_table.intern(name),
+                )
+            case TokenType():
+                return Token(
+                    step.kind, SourceRange(self.source, step.item_start, step.item_end)
+                )
+            case _:  # pragma: no cover
+                raise ValueError("The scan step isn't a token.")
+
+    @property
+    def tokens(self) -> List[Token]:
+        if self._tokens is None:
+            self._tokens = [
+                self._make_token(step)
+                for step in self.steps
+                if isinstance(step.kind, TokenType)
+            ]
+        return self._tokens
+
+    @property
+    def token_stream(self) -> TokenStream:
+        # Built straight from the scan steps, without creating any `Token` objects
+        if self._token_stream is None:
+            token_type_codes = array("B")
+            starts = array("i")
+            ends = array("i")
+            symbol_ids = array("i")
+            for step in self.steps:
+                if isinstance(step.kind, TokenType):
+                    token_type_codes.append(TOKEN_TYPE_CODES[step.kind])
+                    starts.append(step.item_start)
+                    ends.append(step.item_end)
+                    symbol_ids.append(
+                        self.symbol_table.intern(
+                            self.source.code[step.item_start : step.item_end]
+                        )
+                        if step.kind == TokenType.IDENTIFIER
+                        else NO_SYMBOL_ID
+                    )
+            self._token_stream = TokenStream(
+                self.source,
+                token_type_codes,
+                starts,
+                ends,
+                symbol_ids,
+                self.symbol_table,
+            )
+        return self._token_stream
+
+    @property
+    def errors(self) -> List[WodeError]:
+        if self._errors is None:
+            self._errors = [
+                rebuild_error(step.kind, self.source, step.item_start, step.item_end)
+                for step in self.steps
+                if isinstance(step.kind, type)
+            ]
+        return self._errors
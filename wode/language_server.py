@@ -0,0 +1,447 @@
+import json
+import queue
+import threading
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from wode.ast import Expression
+from wode.errors import WodeError
+from wode.incremental import IncrementalScanner
+from wode.parser import ParserState, parse_all
+from wode.semantic_tokens import (
+    SEMANTIC_TOKEN_TYPES,
+    encode_token_stream,
+    get_encoded_length,
+)
+from wode.source import Source
+from wode.types import (
+    Any,
+    BinaryIO,
+    Dict,
+    Int,
+    List,
+    Optional,
+    Set,
+    Str,
+    Tuple,
+    Union,
+    cast,
+)
+
+# JSON-RPC and LSP error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+REQUEST_CANCELLED = -32800
+CONTENT_MODIFIED = -32801
+
+# The LSP type of error messages in `window/logMessage`
+LOG_MESSAGE_ERROR = 1
+
+Message = Dict[Str, Any]
+
+
+class InvalidMessageError(Exception):
+    """A message whose headers or content couldn't be read, or whose content isn't a JSON object."""
+
+    def __init__(self, message: Str, code: Int = PARSE_ERROR) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+def read_message(stream: BinaryIO) -> Optional[Message]:
+    """Read one message in the LSP base protocol, returning `None` when the stream is closed.
+
+    Raises `InvalidMessageError` if the message doesn't have a valid `Content-Length` header or its content isn't a JSON object, the next message can be read after it.
+    """
+    content_length: Optional[Int] = None
+    has_headers = False
+    while True:
+        line = stream.readline()
+        if line == b"":
+            return None
+        line = line.strip()
+        if line == b"":
+            # The headers end with an empty line, any empty lines before them are skipped
+            if not has_headers:
+                continue
+            break
+        has_headers = True
+        name, _, value = line.decode("ascii", errors="replace").partition(":")
+        if name.strip().lower() == "content-length":
+            value = value.strip()
+            if not value.isdigit():
+                raise InvalidMessageError(
+                    f"The Content-Length `{value}` isn't a number of bytes."
+                )
+            content_length = Int(value)
+    if content_length is None:
+        raise InvalidMessageError("The message doesn't have a Content-Length header.")
+    try:
+        message = json.loads(stream.read(content_length))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise InvalidMessageError(f"The message isn't valid JSON: {e}") from e
+    if not isinstance(message, dict):
+        raise InvalidMessageError(
+            f"The message `{json.dumps(message)}` isn't a JSON object.",
+            INVALID_REQUEST,
+        )
+    return cast(Message, message)
+
+
+def write_message(stream: BinaryIO, message: Message) -> None:
+    content = json.dumps(message).encode("utf-8")
+    stream.write(f"Content-Length: {len(content)}\r\n\r\n".encode("ascii") + content)
+    stream.flush()
+
+
+def uri_to_path(uri: Str) -> Optional[Path]:
+    parsed_uri = urlparse(uri)
+    return Path(unquote(parsed_uri.path)) if parsed_uri.scheme == "file" else None
+
+
+def _get_params(message: Message) -> Message:
+    # Params that aren't an object are treated like missing ones, so the handlers report the fields they need
+    params = message.get("params")
+    return cast(Message, params) if isinstance(params, dict) else {}
+
+
+def _get_uri(message: Message) -> Optional[Str]:
+    # The document a message is about, if it has one
+    text_document = _get_params(message).get("textDocument")
+    if not isinstance(text_document, dict):
+        return None
+    uri = cast(Message, text_document).get("uri")
+    return uri if isinstance(uri, Str) else None
+
+
+class Document:
+    """An open document, whose tokens are updated incrementally and whose AST is only parsed when it's needed."""
+
+    def __init__(
+        self, uri: Str, version: Int, text: Str, position_encoding: Str
+    ) -> None:
+        self.uri = uri
+        self.version = version
+        self.position_encoding = position_encoding
+        self.scanner = IncrementalScanner(text, uri_to_path(uri))
+        self._parse_result: Optional[Tuple[List[Expression], List[WodeError]]] = None
+
+    @property
+    def source(self) -> Source:
+        return self.scanner.source
+
+    def get_position(self, lsp_position: Message) -> Int:
+        """Convert an LSP line and character to a position in the code."""
+        line_start_positions = self.source.line_start_positions
+        line_index: Int = lsp_position["line"]
+        character: Int = lsp_position["character"]
+        if line_index >= len(line_start_positions):
+            return len(self.source.code)
+        position = line_start_positions[line_index]
+        line_end = (
+            line_start_positions[line_index + 1]
+            if line_index + 1 < len(line_start_positions)
+            else len(self.source.code)
+        )
+        # Step through the line until we've passed the requested number of units
+        n_units = 0
+        while position < line_end and n_units < character:
+            n_units += get_encoded_length(
+                self.source.code[position], self.position_encoding
+            )
+            position += 1
+        return position
+
+    def get_lsp_position(self, position: Int) -> Message:
+        line_index, _ = self.source.get_line_index_and_column(position)
+        line_start = self.source.line_start_positions[line_index]
+        character = get_encoded_length(
+            self.source.code[line_start:position], self.position_encoding
+        )
+        return {"line": line_index, "character": character}
+
+    def apply_change(self, change: Message) -> None:
+        if "range" in change:
+            start = self.get_position(change["range"]["start"])
+            end = self.get_position(change["range"]["end"])
+            self.scanner.apply_edit(start, end, change["text"])
+        else:
+            # A change without a range replaces the whole document
+            self.scanner = IncrementalScanner(change["text"], self.scanner.file_path)
+        self._parse_result = None
+
+    def get_errors(self) -> List[WodeError]:
+        # Like `wode run`, only parse the tokens if there weren't any scanning errors
+        if len(self.scanner.errors) > 0:
+            return self.scanner.errors
+        if self._parse_result is None:
+            self._parse_result = parse_all(
+                ParserState(self.scanner.tokens, self.source)
+            )
+        return self._parse_result[1]
+
+    @property
+    def expressions(self) -> List[Expression]:
+        self.get_errors()
+        return [] if self._parse_result is None else self._parse_result[0]
+
+    def get_diagnostics(self) -> List[Message]:
+        return [
+            {
+                "range": {
+                    "start": self.get_lsp_position(error.source_range.start.position),
+                    "end": self.get_lsp_position(error.source_range.end.position),
+                },
+                "severity": 1,
+                "code": error.error_type,
+                "source": "wode",
+                "message": error.message,
+            }
+            for error in self.get_errors()
+        ]
+
+
+class LanguageServer:
+    """A language server that talks to an editor over stdin and stdout.
+
+    Messages are read on a separate thread and handled in batches of everything that arrived while the previous batch was being handled.
+    Requests that were cancelled or made stale by a later edit in the same batch are answered with an error instead of being computed, and diagnostics are only published once per batch for each edited document.
+    """
+
+    def __init__(self, input_stream: BinaryIO, output_stream: BinaryIO) -> None:
+        self.input_stream = input_stream
+        self.output_stream = output_stream
+        self.documents: Dict[Str, Document] = {}
+        self.position_encoding = "utf-16"
+        self.is_shut_down = False
+        self.has_exited = False
+        # Messages that were read, or errors for the ones that couldn't be, and `None` when the input is closed
+        self._messages: "queue.Queue[Optional[Union[Message, InvalidMessageError]]]" = (
+            queue.Queue()
+        )
+
+    def _read_messages(self) -> None:
+        while True:
+            try:
+                message = read_message(self.input_stream)
+            except InvalidMessageError as e:
+                # Keep reading, the error is answered when the batch it's in is handled
+                self._messages.put(e)
+                continue
+            self._messages.put(message)
+            if message is None:
+                return
+
+    def run(self) -> None:
+        reader_thread = threading.Thread(target=self._read_messages, daemon=True)
+        reader_thread.start()
+        while not self.has_exited:
+            # Wait for the next message, then take every other message that has already arrived
+            batch = [self._messages.get()]
+            while not self._messages.empty():
+                batch.append(self._messages.get_nowait())
+            is_closed = None in batch
+            messages: List[Message] = []
+            for message in batch:
+                if isinstance(message, InvalidMessageError):
+                    # The ID of a message that couldn't be read isn't known
+                    self.send_error(None, message.code, Str(message))
+                elif message is not None:
+                    messages.append(message)
+            self.handle_batch(messages)
+            if is_closed:
+                return
+
+    def send(self, message: Message) -> None:
+        write_message(self.output_stream, {"jsonrpc": "2.0", **message})
+
+    def send_error(self, request_id: Any, code: Int, message: Str) -> None:
+        self.send({"id": request_id, "error": {"code": code, "message": message}})
+
+    def log_error(self, message: Str) -> None:
+        self.send(
+            {
+                "method": "window/logMessage",
+                "params": {"type": LOG_MESSAGE_ERROR, "message": message},
+            }
+        )
+
+    def report_failure(self, message: Message, code: Int, error: Str) -> None:
+        # Notifications mustn't be answered, so their failures are logged instead
+        if "id" in message:
+            self.send_error(message["id"], code, error)
+        else:
+            self.log_error(error)
+
+    def handle_batch(self, batch: List[Message]) -> None:
+        cancelled_ids: Set[Any] = set()
+        for m in batch:
+            request_id = _get_params(m).get("id")
+            # Request IDs are numbers or strings
+            if m.get("method") == "$/cancelRequest" and isinstance(
+                request_id, (Int, Str)
+            ):
+                cancelled_ids.add(request_id)
+        # The index of the last edit to each document, requests about a document before then are stale
+        last_change_indices: Dict[Optional[Str], Int] = {
+            _get_uri(m): i
+            for i, m in enumerate(batch)
+            if m.get("method") == "textDocument/didChange"
+        }
+        changed_uris: List[Str] = []
+        for i, message in enumerate(batch):
+            method = message.get("method")
+            # A message that can't be handled is reported, so it doesn't stop the server
+            try:
+                if "id" in message and method is not None:
+                    if message["id"] in cancelled_ids:
+                        self.send_error(
+                            message["id"],
+                            REQUEST_CANCELLED,
+                            "The request was cancelled.",
+                        )
+                    elif last_change_indices.get(_get_uri(message), -1) > i:
+                        self.send_error(
+                            message["id"],
+                            CONTENT_MODIFIED,
+                            "The document was changed before the request was handled.",
+                        )
+                    else:
+                        self.handle_request(message)
+                elif method is not None:
+                    uri = self.handle_notification(message)
+                    if uri is not None and uri not in changed_uris:
+                        changed_uris.append(uri)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                self.report_failure(
+                    message, INVALID_PARAMS, f"Invalid params for `{method}`: {e!r}"
+                )
+            except Exception as e:
+                self.report_failure(
+                    message, INTERNAL_ERROR, f"Handling `{method}` failed: {e!r}"
+                )
+        for uri in changed_uris:
+            self.publish_diagnostics(uri)
+
+    def handle_request(self, message: Message) -> None:
+        request_id = message["id"]
+        params = _get_params(message)
+        match message["method"]:
+            case "initialize":
+                self.initialize(params)
+                self.send({"id": request_id, "result": self.get_capabilities()})
+            case "shutdown":
+                self.is_shut_down = True
+                self.send({"id": request_id, "result": None})
+            case "textDocument/semanticTokens/full":
+                self.send_semantic_tokens(request_id, params)
+            case "textDocument/semanticTokens/range":
+                line_range = (
+                    params["range"]["start"]["line"],
+                    params["range"]["end"]["line"] + 1,
+                )
+                self.send_semantic_tokens(request_id, params, line_range)
+            case method:
+                self.send_error(
+                    request_id, METHOD_NOT_FOUND, f"Unknown method `{method}`."
+                )
+
+    def handle_notification(self, message: Message) -> Optional[Str]:
+        """Handle a notification, returning the URI of the document if it was opened or changed."""
+        params = _get_params(message)
+        match message["method"]:
+            case "textDocument/didOpen":
+                text_document = params["textDocument"]
+                self.documents[text_document["uri"]] = Document(
+                    text_document["uri"],
+                    text_document["version"],
+                    text_document["text"],
+                    self.position_encoding,
+                )
+                return text_document["uri"]
+            case "textDocument/didChange":
+                document = self.documents.get(params["textDocument"]["uri"])
+                if document is None:
+                    return None
+                for change in params["contentChanges"]:
+                    document.apply_change(change)
+                document.version = params["textDocument"]["version"]
+                return document.uri
+            case "textDocument/didClose":
+                uri = params["textDocument"]["uri"]
+                self.documents.pop(uri, None)
+                self.send(
+                    {
+                        "method": "textDocument/publishDiagnostics",
+                        "params": {"uri": uri, "diagnostics": []},
+                    }
+                )
+            case "exit":
+                self.has_exited = True
+            case _:
+                # Other notifications, like `initialized` and `$/cancelRequest`, need no handling here
+                pass
+        return None
+
+    def initialize(self, params: Message) -> None:
+        # Positions are offsets into Python strings, so prefer counting code points if the editor supports it
+        position_encodings: List[Str] = (
+            params.get("capabilities", {})
+            .get("general", {})
+            .get("positionEncodings", [])
+        )
+        for position_encoding in ["utf-32", "utf-16"]:
+            if position_encoding in position_encodings:
+                self.position_encoding = position_encoding
+                break
+
+    def get_capabilities(self) -> Message:
+        return {
+            "capabilities": {
+                "positionEncoding": self.position_encoding,
+                # Incremental text document sync
+                "textDocumentSync": {"openClose": True, "change": 2},
+                "semanticTokensProvider": {
+                    "legend": {
+                        "tokenTypes": SEMANTIC_TOKEN_TYPES,
+                        "tokenModifiers": [],
+                    },
+                    "full": True,
+                    "range": True,
+                },
+            },
+            "serverInfo": {"name": "wode"},
+        }
+
+    def send_semantic_tokens(
+        self,
+        request_id: Any,
+        params: Message,
+        line_range: Optional[Tuple[Int, Int]] = None,
+    ) -> None:
+        document = self.documents.get(params["textDocument"]["uri"])
+        if document is None:
+            self.send_error(request_id, INVALID_PARAMS, "The document isn't open.")
+            return
+        data = encode_token_stream(
+            document.scanner.token_stream, line_range, self.position_encoding
+        )
+        self.send({"id": request_id, "result": {"data": data}})
+
+    def publish_diagnostics(self, uri: Str) -> None:
+        document = self.documents.get(uri)
+        if document is None:
+            return
+        self.send(
+            {
+                "method": "textDocument/publishDiagnostics",
+                "params": {
+                    "uri": uri,
+                    "version": document.version,
+                    "diagnostics": document.get_diagnostics(),
+                },
+            }
+        )
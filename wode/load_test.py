@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from wode.server import STREAM_LIMIT
+from wode.types import Float, Int, List, NamedTuple, Str
+
+
+class LoadTestResult(NamedTuple):
+    n_requests: Int
+    n_errors: Int
+    elapsed: Float
+    latencies: List[Float]
+
+    @property
+    def requests_per_second(self) -> Float:
+        return self.n_requests / self.elapsed
+
+    def get_percentile(self, percentile: Float) -> Float:
+        # Use the nearest-rank method
+        sorted_latencies = sorted(self.latencies)
+        rank = max(
+            0,
+            min(
+                len(sorted_latencies) - 1,
+                round(percentile / 100 * len(sorted_latencies)) - 1,
+            ),
+        )
+        return sorted_latencies[rank]
+
+    def get_report(self) -> Str:
+        return "\n".join(
+            [
+                f"Requests:            {self.n_requests}",
+                f"Errors:              {self.n_errors}",
+                f"Requests per second: {self.requests_per_second:.1f}",
+                f"p50 latency:         {self.get_percentile(50) * 1000:.3f} ms",
+                f"p99 latency:         {self.get_percentile(99) * 1000:.3f} ms",
+            ]
+        )
+
+
+async def run_load_test(
+    socket_path: Path, code: Str, n_requests: Int, concurrency: Int
+) -> LoadTestResult:
+    """Send compile requests to a server over a Unix socket and measure their latency.
+
+    Each of the `concurrency` clients has its own connection and sends its share of the requests one after another.
+    """
+    request = (
+        json.dumps({"source": code, "outputs": ["diagnostics"]}).encode("utf-8") + b"\n"
+    )
+    latencies: List[Float] = []
+    n_errors = 0
+
+    async def client(n_client_requests: Int) -> None:
+        nonlocal n_errors
+        reader, writer = await asyncio.open_unix_connection(
+            Str(socket_path), limit=STREAM_LIMIT
+        )
+        try:
+            for i in range(n_client_requests):
+                start_time = time.perf_counter()
+                writer.write(request)
+                await writer.drain()
+                line = await reader.readline()
+                latencies.append(time.perf_counter() - start_time)
+                if not line:
+                    # The server closed the connection, so this request and the rest of this client's fail
+                    n_errors += n_client_requests - i
+                    break
+                try:
+                    response = json.loads(line)
+                except json.JSONDecodeError:
+                    response = None
+                if not isinstance(response, dict) or "error" in response:
+                    n_errors += 1
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    # Split the requests as evenly as possible between the clients
+    requests_per_client = [
+        n_requests // concurrency + (1 if i < n_requests % concurrency else 0)
+        for i in range(concurrency)
+    ]
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in requests_per_client if n > 0))
+    elapsed = time.perf_counter() - start_time
+    return LoadTestResult(n_requests, n_errors, elapsed, latencies)
@@ -0,0 +1,215 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from wode.ast import Expression
+from wode.ast_arena import AstArena
+from wode.errors import WodeError, rebuild_error
+from wode.parser import ParserState, parse_all, parse_statements
+from wode.source import Source
+from wode.token import Token
+from wode.token_stream import NO_SYMBOL_ID, TOKEN_TYPE_CODES, TokenStream
+from wode.token_type import TokenType
+from wode.tracing import Phase, end_phase, start_phase
+from wode.types import Any, Bool, Int, List, Optional, Sequence, Str, Tuple, Type
+
+_SEMICOLON_CODE = TOKEN_TYPE_CODES[TokenType.SEMICOLON]
+_OPENING_BRACKET_CODES = {
+    TOKEN_TYPE_CODES[t]
+    for t in [
+        TokenType.LEFT_BRACKET,
+        TokenType.LEFT_CURLY_BRACKET,
+        TokenType.LEFT_SQUARE_BRACKET,
+    ]
+}
+_CLOSING_BRACKET_CODES = {
+    TOKEN_TYPE_CODES[t]
+    for t in [
+        TokenType.RIGHT_BRACKET,
+        TokenType.RIGHT_CURLY_BRACKET,
+        TokenType.RIGHT_SQUARE_BRACKET,
+    ]
+}
+
+# A parsed chunk is its arena's kinds, slot starts, slots and roots, and each error's type, start and end
+ChunkResult = Tuple[
+    Sequence[Int],
+    Sequence[Int],
+    Sequence[Int],
+    Sequence[Int],
+    List[Tuple[Type[WodeError], Int, Int]],
+]
+
+
+def split_statements(
+    token_type_codes: Sequence[Int], min_chunk_size: Int
+) -> List[Tuple[Int, Int]]:
+    """Split tokens into chunks of whole statements, returning the start and end index of each chunk.
+
+    Chunks only end after a semicolon outside of any brackets, which is always where the parser starts its next statement, even after an error.
+    Every chunk except the last has at least `min_chunk_size` tokens.
+    """
+    chunks: List[Tuple[Int, Int]] = []
+    chunk_start = 0
+    depth = 0
+    for index, code in enumerate(token_type_codes):
+        if code in _OPENING_BRACKET_CODES:
+            depth += 1
+        elif code in _CLOSING_BRACKET_CODES:
+            depth = max(depth - 1, 0)
+        elif (
+            code == _SEMICOLON_CODE
+            and depth == 0
+            and index + 1 - chunk_start >= min_chunk_size
+        ):
+            chunks.append((chunk_start, index + 1))
+            chunk_start = index + 1
+    if chunk_start < len(token_type_codes) or len(chunks) == 0:
+        chunks.append((chunk_start, len(token_type_codes)))
+    return chunks
+
+
+def parse_chunk(
+    source: Source,
+    token_type_codes: Sequence[Int],
+    starts: Sequence[Int],
+    ends: Sequence[Int],
+    include_expressions: Bool = True,
+) -> ChunkResult:
+    """Parse a chunk of tokens, returning its AST as arena arrays whose token indices are relative to the chunk."""
+    symbol_ids = array("i", [NO_SYMBOL_ID]) * len(token_type_codes)
+    tokens = TokenStream(source, token_type_codes, starts, ends, symbol_ids).to_tokens()
+    expressions, errors = parse_statements(ParserState(tokens, source))
+    # Storing the AST is as slow as parsing it, so skip it if only the errors are wanted
+    arena = AstArena.from_expressions(
+        source, tokens, expressions if include_expressions else []
+    )
+    return (
+        arena.kinds,
+        arena.slot_starts,
+        arena.slots,
+        arena.roots,
+        [
+            (type(e), e.source_range.start.position, e.source_range.end.position)
+            for e in errors
+        ],
+    )
+
+
+# Each worker process gets the source once when it starts, instead of with every chunk
+_worker_source: Optional[Source] = None
+
+
+def _initialise_worker(file_path: Optional[Path], code: Str) -> None:
+    global _worker_source
+    _worker_source = Source(file_path, code)
+
+
+def _parse_chunk_in_worker(
+    token_type_codes: Sequence[Int],
+    starts: Sequence[Int],
+    ends: Sequence[Int],
+    include_expressions: Bool,
+) -> ChunkResult:
+    assert _worker_source is not None
+    return parse_chunk(
+        _worker_source, token_type_codes, starts, ends, include_expressions
+    )
+
+
+def parse_all_in_parallel(
+    source: Source,
+    tokens: List[Token],
+    workers: Int,
+    min_chunk_size: Int = 4096,
+    include_expressions: Bool = True,
+) -> Tuple[List[Expression], List[WodeError]]:
+    """Parse the statements of a file in chunks on a pool of worker processes.
+
+    Sending chunks to other processes only pays off for big files, so with at most one worker, or when the file is a single chunk, it's parsed by `parse_all` in this process.
+    Rebuilding the expressions takes about as long as parsing them, so when only the errors are needed, pass `include_expressions=False` and an empty list of expressions is returned.
+    """
+    if workers > 1:
+        token_stream = TokenStream.from_tokens(source, tokens)
+        chunks = split_statements(token_stream.token_type_codes, min_chunk_size)
+        if len(chunks) > 1:
+            return _parse_chunks(
+                source, tokens, token_stream, chunks, workers, include_expressions
+            )
+    expressions, errors = parse_all(ParserState(tokens, source))
+    return (expressions if include_expressions else []), errors
+
+
+def parse_all_in_chunks(
+    source: Source,
+    tokens: List[Token],
+    workers: Int = 0,
+    min_chunk_size: Int = 4096,
+    include_expressions: Bool = True,
+) -> Tuple[List[Expression], List[WodeError]]:
+    """Like `parse_all_in_parallel`, but always splits the file into chunks, which are parsed in this process when there are no workers.
+
+    The chunks are sent to the workers as arrays of token types and offsets, and come back as AST arenas, which are rebuilt with the original tokens and merged in source order.
+    The result is always the same as `parse_all`'s, which the tests and fuzzer check without having to start a pool.
+    """
+    token_stream = TokenStream.from_tokens(source, tokens)
+    chunks = split_statements(token_stream.token_type_codes, min_chunk_size)
+    return _parse_chunks(
+        source, tokens, token_stream, chunks, workers, include_expressions
+    )
+
+
+def _parse_chunks(
+    source: Source,
+    tokens: List[Token],
+    token_stream: TokenStream,
+    chunks: List[Tuple[Int, Int]],
+    workers: Int,
+    include_expressions: Bool,
+) -> Tuple[List[Expression], List[WodeError]]:
+    start_time = start_phase(Phase.PARSE, source)
+    chunk_arrays = [
+        (
+            token_stream.token_type_codes[start:end],
+            token_stream.starts[start:end],
+            token_stream.ends[start:end],
+        )
+        for start, end in chunks
+    ]
+    results: List[Any]
+    if workers <= 1:
+        results = [
+            parse_chunk(source, *arrays, include_expressions) for arrays in chunk_arrays
+        ]
+    else:
+        with ProcessPoolExecutor(
+            workers,
+            initializer=_initialise_worker,
+            initargs=(source.file_path, source.code),
+        ) as executor:
+            results = List(
+                executor.map(
+                    _parse_chunk_in_worker,
+                    *zip(*chunk_arrays),
+                    [include_expressions] * len(chunks),
+                    # Send a few chunks at a time to cut down on round trips
+                    chunksize=max(len(chunks) // (4 * workers), 1),
+                )
+            )
+
+    expressions: List[Expression] = []
+    errors: List[WodeError] = []
+    for (start, end), arrays, (kinds, slot_starts, slots, roots, chunk_errors) in zip(
+        chunks, chunk_arrays, results
+    ):
+        chunk_token_stream = TokenStream(
+            source, *arrays, token_stream.symbol_ids[start:end]
+        )
+        arena = AstArena(chunk_token_stream, kinds, slot_starts, slots, roots)
+        expressions.extend(arena.to_expressions(tokens[start:end]))
+        errors.extend(
+            rebuild_error(error_type, source, error_start, error_end)
+            for error_type, error_start, error_end in chunk_errors
+        )
+    end_phase(Phase.PARSE, source, start_time, len(expressions), errors)
+    return expressions, errors
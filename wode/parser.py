@@ -1,37 +1,66 @@
 from koda import Err, Ok, Result
 
-from wode.ast import BinaryExpression, Expression, LiteralExpression, UnaryExpression
-from wode.binding_power import get_infix_binding_power, get_prefix_binding_power
+from wode.ast import (
+    BinaryExpression,
+    BlockExpression,
+    CallExpression,
+    Expression,
+    ForExpression,
+    FunctionExpression,
+    GroupingExpression,
+    IfExpression,
+    LetStatement,
+    LiteralExpression,
+    MatchExpression,
+    ReturnStatement,
+    StructStatement,
+    UnaryExpression,
+    WhileExpression,
+    YieldStatement,
+)
+from wode.binding_power import (
+    get_infix_binding_power,
+    get_postfix_binding_power,
+    get_prefix_binding_power,
+)
 from wode.errors import (
     ExpectedSemicolonError,
     UnexpectedEndOfExpressionError,
+    UnexpectedEndOfFileError,
     UnexpectedTokenTypeError,
     WodeError,
 )
+from wode.hash_consing import AstInterner
 from wode.source import Source, SourcePosition
 from wode.token import EOFToken, Token
 from wode.token_type import TokenType
-from wode.types import Float, Int, List, Tuple
+from wode.tracing import Phase, end_phase, start_phase
+from wode.types import Any, Bool, Float, FrozenSet, Int, List, Optional, Tuple, cast
 from wode.utils import UnreachableError
 
 
 class ParserState:
     def __init__(
-        self, all_tokens: List[Token], source: Source, position: Int = 0
+        self,
+        all_tokens: List[Token],
+        source: Source,
+        position: Int = 0,
+        interner: Optional[AstInterner] = None,
     ) -> None:
         self._all_tokens = all_tokens
         self.position = position
         self.source = source
+        # Builds hash-consed nodes when given, instead of a new node for every subtree
+        self.interner = interner
+
+    @property
+    def all_tokens(self) -> List[Token]:
+        return self._all_tokens
 
     def chomp(self) -> Tuple[Token, "ParserState"]:
-        try:
-            return self._all_tokens[self.position], ParserState(
-                self._all_tokens, self.source, self.position + 1
-            )
-        except IndexError:
-            return EOFToken(self.source), ParserState(
-                self._all_tokens, self.source, self.position + 1
-            )
+        return _get_token(self._all_tokens, self.source, self.position), ParserState(
+            self._all_tokens, self.source, self.position + 1, self.interner
+        )
 
     def _debug_dump(self) -> None:  # pragma: no cover
         for i, token in enumerate(self._all_tokens):
@@ -40,117 +69,619 @@ class ParserState:
             )
 
 
-def parse_expression(
-    state: ParserState, minimum_binding_power: Float
-) -> Tuple[Result[Expression, WodeError], ParserState]:
-    token, state = state.chomp()
-    match token.token_type:
-        case (
-            TokenType.INTEGER
-            | TokenType.FLOAT
-            | TokenType.STRING
-            | TokenType.IDENTIFIER
-            | TokenType.TRUE
-            | TokenType.FALSE
-            | TokenType.NOTHING
-        ):
-            lhs = LiteralExpression(token)
-        case TokenType.PLUS | TokenType.MINUS:
-            # Prefix plus or minus
-            binding_power_left, binding_power_right = get_prefix_binding_power(
-                token.token_type
-            )
-            rhs_result = parse_expression(state, binding_power_right)
-            match rhs_result:
-                case Ok(rhs), new_state:
-                    lhs = UnaryExpression(token, rhs)
-                    state = new_state
-                case Err(err), new_state:
-                    return Err(err), new_state
-                case _:  # pragma: no cover
-                    raise UnreachableError(
-                        "Parser can only return a tuple of a Result and a ParserState."
-                    )
-        case TokenType.SEMICOLON:
-            unexpected_end_of_expression_error = UnexpectedEndOfExpressionError(
-                token.source_range.start
-            )
-            return Err(unexpected_end_of_expression_error), state
-        case _:
-            unexpected_token_type_error = UnexpectedTokenTypeError(token.source_range)
-            return Err(unexpected_token_type_error), state
+# The result of parsing an expression: the expression or an error, and the position of the next token
+ParseResult = Tuple[Optional[Expression], Optional[WodeError], Int]
+
+
+def _get_token(tokens: List[Token], source: Source, position: Int) -> Token:
+    # Reading past the end of the tokens gives an EOF token, like reading past the end of the source
+    return tokens[position] if position < len(tokens) else EOFToken(source)
+
+
+# The kinds of frame on the parser's stack, each one is waiting for an operand, a statement or a block to finish
+_UNARY_FRAME = 0
+_BINARY_FRAME = 1
+_GROUPING_FRAME = 2
+_CALL_FRAME = 3
+_FUNCTION_FRAME = 4
+# A block, and the expressions that end with one, which wait for their conditions and bodies in turn
+_BLOCK_FRAME = 5
+_IF_FRAME = 6
+_WHILE_FRAME = 7
+_FOR_FRAME = 8
+_MATCH_FRAME = 9
+# Statements with a value, which ends at a semicolon
+_LET_FRAME = 10
+_RETURN_FRAME = 11
+# A statement that's an expression, which only needs a semicolon after it if it doesn't end with a block
+_STATEMENT_FRAME = 12
+# A block or an expression ending with one that's an operand, so the expression around it can carry on when it's finished
+_OPERAND_FRAME = 13
+
+# A frame's kind, its operator, keyword, opening bracket or arrow, its left operand, callee or other part, the items in its brackets or block or its other parts so far, and the minimum binding power to go back to when it's finished
+_Frame = Tuple[Int, Token, Any, Any, Float]
+
+_LITERAL_TOKEN_TYPES = frozenset(
+    [
+        TokenType.INTEGER,
+        TokenType.FLOAT,
+        TokenType.STRING,
+        TokenType.IDENTIFIER,
+        TokenType.TRUE,
+        TokenType.FALSE,
+        TokenType.NOTHING,
+    ]
+)
+_PREFIX_OPERATORS = frozenset([TokenType.PLUS, TokenType.MINUS, TokenType.BANG])
+_INFIX_OPERATORS = frozenset(
+    [
+        TokenType.PLUS,
+        TokenType.MINUS,
+        TokenType.STAR,
+        TokenType.SLASH,
+        TokenType.CARET,
+        TokenType.AMPERSAND_AMPERSAND,
+        TokenType.BAR_BAR,
+        TokenType.EQUAL_EQUAL,
+        TokenType.BANG_EQUAL,
+        TokenType.LESS,
+        TokenType.LESS_EQUAL,
+        TokenType.GREATER,
+        TokenType.GREATER_EQUAL,
+    ]
+)
+# The tokens that start a block, or an expression that ends with a block
+_BLOCK_STARTERS = frozenset(
+    [
+        TokenType.LEFT_CURLY_BRACKET,
+        TokenType.IF,
+        TokenType.WHILE,
+        TokenType.FOR,
+        TokenType.MATCH,
+    ]
+)
+# The frame for each keyword that starts an expression ending with a block
+_KEYWORD_FRAMES = {
+    TokenType.IF: _IF_FRAME,
+    TokenType.WHILE: _WHILE_FRAME,
+    TokenType.FOR: _FOR_FRAME,
+    TokenType.MATCH: _MATCH_FRAME,
+}
+# The tokens that can end an expression outside of brackets, depending on where it is
+_STATEMENT_TERMINATORS = frozenset([TokenType.SEMICOLON])
+_BLOCK_TERMINATORS = frozenset([TokenType.LEFT_CURLY_BRACKET])
+_MATCH_ARM_TERMINATORS = frozenset([TokenType.COMMA, TokenType.RIGHT_CURLY_BRACKET])
 
+
+def _get_unexpected_token_error(token: Token) -> WodeError:
+    if token.token_type == TokenType.EOF:
+        return UnexpectedEndOfFileError(token.source_range.start)
+    return UnexpectedTokenTypeError(token.source_range)
+
+
+def _is_parameter(expression: Expression) -> Bool:
+    return (
+        isinstance(expression, LiteralExpression)
+        and expression.literal.token_type == TokenType.IDENTIFIER
+    )
+
+
+def _parse_at(
+    tokens: List[Token],
+    source: Source,
+    position: Int,
+    minimum_binding_power: Float,
+    interner: Optional[AstInterner],
+    terminators: FrozenSet[TokenType],
+    expect_statement: Bool,
+) -> ParseResult:
+    # Operators, brackets, statements and blocks whose parts haven't been parsed yet are kept on an explicit stack instead of the call stack, so deeply nested code doesn't recurse
+    stack: List[_Frame] = []
+    # The number of grouping and call frames on the stack since the innermost statement, condition or match arm started
+    depth: Int = 0
+    # The operand, statement or block that was parsed last, it's always set before it's used
+    lhs = cast(Expression, None)
+    # The token that was looked at last, which ends the operand of the innermost frame when it's finished
+    token = _get_token(tokens, source, position)
+    token_type = token.token_type
     while True:
-        token, new_state = state.chomp()
-        match token.token_type:
-            case TokenType.EOF:
-                expected_semicolon_error = ExpectedSemicolonError(
-                    SourcePosition(state.source, token.source_range.start.position - 1)
+        # Whether `lhs` is a finished statement, block or expression ending with a block, which goes to the frame under it without looking for operators after it
+        finished = False
+        # Whether the operand starts a statement, where a block-like expression is a statement on its own
+        starts_statement = False
+        if expect_statement:
+            expect_statement = False
+            minimum_binding_power = 0
+            depth = 0
+            terminators = _STATEMENT_TERMINATORS
+            keyword = _get_token(tokens, source, position)
+            keyword_type = keyword.token_type
+            # Statements are only parsed at the top level and in blocks
+            in_block = len(stack) > 0
+            if keyword_type == TokenType.LET:
+                name = _get_token(tokens, source, position + 1)
+                if name.token_type != TokenType.IDENTIFIER:
+                    return None, _get_unexpected_token_error(name), position + 2
+                equal = _get_token(tokens, source, position + 2)
+                if equal.token_type != TokenType.EQUAL:
+                    return None, _get_unexpected_token_error(equal), position + 3
+                stack.append((_LET_FRAME, keyword, name, None, 0))
+                position += 3
+            elif keyword_type == TokenType.RETURN or keyword_type == TokenType.YIELD:
+                position += 1
+                if (
+                    _get_token(tokens, source, position).token_type
+                    == TokenType.SEMICOLON
+                ):
+                    lhs = (
+                        ReturnStatement(keyword, None)
+                        if keyword_type == TokenType.RETURN
+                        else YieldStatement(keyword, None)
+                    )
+                    position += 1
+                    finished = True
+                else:
+                    stack.append((_RETURN_FRAME, keyword, None, None, 0))
+            elif keyword_type == TokenType.STRUCT:
+                struct_statement, error, position = _parse_struct_at(
+                    tokens, source, position
                 )
-                return Err(expected_semicolon_error), new_state
-            case TokenType.SEMICOLON:
-                # Finish parsing this expression
-                break
-            case (
-                TokenType.PLUS
-                | TokenType.MINUS
-                | TokenType.STAR
-                | TokenType.SLASH
-                | TokenType.CARET
-                | TokenType.AMPERSAND_AMPERSAND
-                | TokenType.BAR_BAR
-            ):
-                # Don't consume the token yet, we don't know its binding power yet
-                operator = token
-                binding_power_left, binding_power_right = get_infix_binding_power(
-                    operator.token_type
+                if struct_statement is None:
+                    return None, error, position
+                lhs = struct_statement
+                # The semicolon after a struct is optional
+                if (
+                    _get_token(tokens, source, position).token_type
+                    == TokenType.SEMICOLON
+                ):
+                    position += 1
+                finished = True
+            elif in_block and keyword_type == TokenType.RIGHT_CURLY_BRACKET:
+                _, left_curly_bracket, _, statements, _ = stack.pop()
+                lhs = BlockExpression(left_curly_bracket, statements, keyword)
+                position += 1
+                finished = True
+            elif in_block and keyword_type == TokenType.EOF:
+                unexpected_end_of_file_error = UnexpectedEndOfFileError(
+                    keyword.source_range.start
                 )
-                if binding_power_left < minimum_binding_power:
-                    # Stop iterating if we have found an operator with lower binding power than the minimum
-                    # We didn't consume the token yet in case this happened
-                    break
-                # Now we can consume the token
-                state = new_state
-                # If we found an infix operator, try to parse the right hand side
-                rhs_result, state = parse_expression(state, binding_power_right)
-                match rhs_result:
-                    case Ok(rhs):
-                        lhs = BinaryExpression(lhs, operator, rhs)
-                    case Err(err):
-                        return Err(err), state
-            case _:
-                state = new_state
+                return None, unexpected_end_of_file_error, position + 1
+            else:
+                # An expression, which doesn't need a semicolon after it if it ends with a block
+                stack.append((_STATEMENT_FRAME, keyword, None, None, 0))
+                starts_statement = True
+
+        if not finished:
+            # Parse an operand, pushing the prefix operators, opening brackets and blocks in front of it
+            token = _get_token(tokens, source, position)
+            position += 1
+            token_type = token.token_type
+            if token_type in _LITERAL_TOKEN_TYPES:
+                lhs = (
+                    LiteralExpression(token)
+                    if interner is None
+                    else interner.literal(token)
+                )
+            elif token_type in _PREFIX_OPERATORS:
+                _, binding_power_right = get_prefix_binding_power(token_type)
+                stack.append((_UNARY_FRAME, token, None, None, minimum_binding_power))
+                minimum_binding_power = binding_power_right
+                continue
+            elif token_type == TokenType.LEFT_BRACKET:
+                arrow = _get_token(tokens, source, position + 1)
+                if (
+                    _get_token(tokens, source, position).token_type
+                    == TokenType.RIGHT_BRACKET
+                    and arrow.token_type == TokenType.SINGLE_ARROW
+                ):
+                    # A function without parameters
+                    stack.append(
+                        (_FUNCTION_FRAME, arrow, None, [], minimum_binding_power)
+                    )
+                    minimum_binding_power = 0
+                    position += 2
+                    continue
+                # This might turn out to be a function's parameters if there's an arrow after the closing bracket
+                stack.append((_GROUPING_FRAME, token, None, [], minimum_binding_power))
+                minimum_binding_power = 0
+                depth += 1
+                continue
+            elif token_type in _BLOCK_STARTERS:
+                if not starts_statement:
+                    # Carry on with this expression when the block-like one is finished
+                    stack.append(
+                        (
+                            _OPERAND_FRAME,
+                            token,
+                            (depth, terminators),
+                            None,
+                            minimum_binding_power,
+                        )
+                    )
+                if token_type == TokenType.LEFT_CURLY_BRACKET:
+                    stack.append((_BLOCK_FRAME, token, None, [], 0))
+                    expect_statement = True
+                    continue
+                variable: Optional[Token] = None
+                if token_type == TokenType.FOR:
+                    variable = _get_token(tokens, source, position)
+                    if variable.token_type != TokenType.IDENTIFIER:
+                        return None, _get_unexpected_token_error(variable), position + 1
+                    in_keyword = _get_token(tokens, source, position + 1)
+                    if in_keyword.token_type != TokenType.IN:
+                        return (
+                            None,
+                            _get_unexpected_token_error(in_keyword),
+                            position + 2,
+                        )
+                    position += 2
+                stack.append((_KEYWORD_FRAMES[token_type], token, variable, [], 0))
+                # Parse the condition, iterable or subject, which ends before a block
+                minimum_binding_power = 0
+                depth = 0
+                terminators = _BLOCK_TERMINATORS
+                continue
+            elif token_type == TokenType.SEMICOLON:
+                unexpected_end_of_expression_error = UnexpectedEndOfExpressionError(
+                    token.source_range.start
+                )
+                return None, unexpected_end_of_expression_error, position
+            else:
                 unexpected_token_type_error = UnexpectedTokenTypeError(
                     token.source_range
                 )
-                return Err(unexpected_token_type_error), state
+                return None, unexpected_token_type_error, position
+
+        # Apply the postfix and infix operators after the operand, and finish the frames that it ends
+        while True:
+            if not finished:
+                token = _get_token(tokens, source, position)
+                token_type = token.token_type
+                if token_type in _INFIX_OPERATORS:
+                    binding_power_left, binding_power_right = get_infix_binding_power(
+                        token_type
+                    )
+                    # Operators with a lower binding power than the minimum finish the frame instead
+                    if binding_power_left >= minimum_binding_power:
+                        stack.append(
+                            (_BINARY_FRAME, token, lhs, None, minimum_binding_power)
+                        )
+                        minimum_binding_power = binding_power_right
+                        position += 1
+                        break
+                elif token_type == TokenType.LEFT_BRACKET:
+                    binding_power_left, _ = get_postfix_binding_power(token_type)
+                    if binding_power_left >= minimum_binding_power:
+                        position += 1
+                        right_bracket = _get_token(tokens, source, position)
+                        if right_bracket.token_type == TokenType.RIGHT_BRACKET:
+                            # A call without arguments
+                            lhs = CallExpression(lhs, [], right_bracket)
+                            position += 1
+                            continue
+                        stack.append(
+                            (_CALL_FRAME, token, lhs, [], minimum_binding_power)
+                        )
+                        minimum_binding_power = 0
+                        depth += 1
+                        break
+                elif depth == 0 and token_type not in terminators:
+                    # Outside of brackets, only a terminator can end an expression
+                    if (
+                        token_type == TokenType.EOF
+                        and TokenType.SEMICOLON in terminators
+                    ):
+                        expected_semicolon_error = ExpectedSemicolonError(
+                            SourcePosition(
+                                source, token.source_range.start.position - 1
+                            )
+                        )
+                        return None, expected_semicolon_error, position + 1
+                    return None, _get_unexpected_token_error(token), position + 1
+                elif depth > 0 and (
+                    token_type != TokenType.RIGHT_BRACKET
+                    and token_type != TokenType.COMMA
+                ):
+                    # Inside brackets, only a closing bracket or a comma can end an expression
+                    return None, _get_unexpected_token_error(token), position + 1
+
+            # The token, or a finished block or statement, ends the operand of the innermost frame
+            if len(stack) == 0:
+                return lhs, None, position
+            kind, operator, left, items, minimum_binding_power = stack.pop()
+            if kind == _UNARY_FRAME:
+                lhs = (
+                    UnaryExpression(operator, lhs)
+                    if interner is None
+                    else interner.unary(operator, lhs)
+                )
+            elif kind == _BINARY_FRAME:
+                lhs = (
+                    BinaryExpression(left, operator, lhs)
+                    if interner is None
+                    else interner.binary(left, operator, lhs)
+                )
+            elif kind == _GROUPING_FRAME:
+                items.append(lhs)
+                position += 1
+                if token_type == TokenType.COMMA:
+                    # Only the parameters of a function can be separated by commas
+                    if not _is_parameter(lhs):
+                        unexpected_token_type_error = UnexpectedTokenTypeError(
+                            token.source_range
+                        )
+                        return None, unexpected_token_type_error, position
+                    stack.append((kind, operator, left, items, minimum_binding_power))
+                    minimum_binding_power = 0
+                    break
+                depth -= 1
+                arrow = _get_token(tokens, source, position)
+                if arrow.token_type == TokenType.SINGLE_ARROW:
+                    if not all(_is_parameter(item) for item in items):
+                        unexpected_token_type_error = UnexpectedTokenTypeError(
+                            arrow.source_range
+                        )
+                        return None, unexpected_token_type_error, position + 1
+                    # Parse the function's body
+                    stack.append(
+                        (_FUNCTION_FRAME, arrow, None, items, minimum_binding_power)
+                    )
+                    minimum_binding_power = 0
+                    position += 1
+                    break
+                if len(items) > 1:
+                    # A list of parameters without an arrow after it
+                    return None, _get_unexpected_token_error(arrow), position + 1
+                lhs = GroupingExpression(lhs)
+            elif kind == _CALL_FRAME:
+                items.append(lhs)
+                position += 1
+                if token_type == TokenType.COMMA:
+                    # Parse the next argument
+                    stack.append((kind, operator, left, items, minimum_binding_power))
+                    minimum_binding_power = 0
+                    break
+                lhs = CallExpression(left, items, token)
+                depth -= 1
+            elif kind == _FUNCTION_FRAME:
+                parameters = [
+                    cast(LiteralExpression, item).literal
+                    for item in cast(List[Expression], items)
+                ]
+                lhs = FunctionExpression(parameters, operator, lhs)
+            elif kind == _OPERAND_FRAME:
+                depth, terminators = cast(Tuple[Int, FrozenSet[TokenType]], left)
+                finished = False
+            elif kind == _STATEMENT_FRAME:
+                # The semicolon after a statement that ends with a block is optional
+                if (
+                    _get_token(tokens, source, position).token_type
+                    == TokenType.SEMICOLON
+                ):
+                    position += 1
+                finished = True
+            elif kind == _LET_FRAME:
+                lhs = LetStatement(operator, left, lhs)
+                # Skip the semicolon that ended the value
+                position += 1
+                finished = True
+            elif kind == _RETURN_FRAME:
+                lhs = (
+                    ReturnStatement(operator, lhs)
+                    if operator.token_type == TokenType.RETURN
+                    else YieldStatement(operator, lhs)
+                )
+                position += 1
+                finished = True
+            elif kind == _BLOCK_FRAME:
+                # Parse the next statement in the block
+                items.append(lhs)
+                stack.append((kind, operator, left, items, minimum_binding_power))
+                expect_statement = True
+                break
+            elif kind == _MATCH_FRAME:
+                if len(items) == 0:
+                    # Skip the curly bracket that ended the subject
+                    position += 1
+                # Arms are separated by commas, and the last arm can have one too
+                elif token_type == TokenType.COMMA:
+                    position += 1
+                # The subject, and then each arm after its pattern
+                items.append(lhs)
+                pattern = _get_token(tokens, source, position)
+                if pattern.token_type == TokenType.RIGHT_CURLY_BRACKET:
+                    lhs = MatchExpression(
+                        operator, items[0], items[1::2], items[2::2], pattern
+                    )
+                    position += 1
+                    finished = True
+                    continue
+                # Each arm starts with a literal or a name, so its pattern is always a single token
+                if pattern.token_type not in _LITERAL_TOKEN_TYPES:
+                    return None, _get_unexpected_token_error(pattern), position + 1
+                double_arrow = _get_token(tokens, source, position + 1)
+                if double_arrow.token_type != TokenType.DOUBLE_ARROW:
+                    return None, _get_unexpected_token_error(double_arrow), position + 2
+                items.append(
+                    LiteralExpression(pattern)
+                    if interner is None
+                    else interner.literal(pattern)
+                )
+                stack.append((kind, operator, left, items, minimum_binding_power))
+                position += 2
+                minimum_binding_power = 0
+                depth = 0
+                terminators = _MATCH_ARM_TERMINATORS
+                break
+            elif not finished:
+                # The condition or iterable of an `if`, `elif`, `while` or `for` ends before the block of its body
+                items.append(lhs)
+                stack.append((kind, operator, left, items, minimum_binding_power))
+                stack.append((_BLOCK_FRAME, token, None, [], 0))
+                position += 1
+                expect_statement = True
+                break
+            elif kind == _WHILE_FRAME:
+                lhs = WhileExpression(operator, items[0], cast(BlockExpression, lhs))
+            elif kind == _FOR_FRAME:
+                lhs = ForExpression(
+                    operator, left, items[0], cast(BlockExpression, lhs)
+                )
+            else:
+                # The conditions and their bodies take turns in the items, with the `else` body last
+                else_body: Optional[BlockExpression] = None
+                if len(items) % 2 == 0:
+                    else_body = cast(BlockExpression, lhs)
+                else:
+                    items.append(lhs)
+                    next_keyword = _get_token(tokens, source, position)
+                    if next_keyword.token_type == TokenType.ELIF:
+                        stack.append(
+                            (kind, operator, left, items, minimum_binding_power)
+                        )
+                        position += 1
+                        minimum_binding_power = 0
+                        depth = 0
+                        terminators = _BLOCK_TERMINATORS
+                        break
+                    if next_keyword.token_type == TokenType.ELSE:
+                        left_curly_bracket = _get_token(tokens, source, position + 1)
+                        if left_curly_bracket.token_type != (
+                            TokenType.LEFT_CURLY_BRACKET
+                        ):
+                            return (
+                                None,
+                                _get_unexpected_token_error(left_curly_bracket),
+                                position + 2,
+                            )
+                        stack.append(
+                            (kind, operator, left, items, minimum_binding_power)
+                        )
+                        stack.append((_BLOCK_FRAME, left_curly_bracket, None, [], 0))
+                        position += 2
+                        expect_statement = True
+                        break
+                lhs = IfExpression(operator, items[0::2], items[1::2], else_body)
+
+
+def _parse_struct_at(tokens: List[Token], source: Source, position: Int) -> ParseResult:
+    keyword = _get_token(tokens, source, position)
+    name = _get_token(tokens, source, position + 1)
+    if name.token_type != TokenType.IDENTIFIER:
+        return None, _get_unexpected_token_error(name), position + 2
+    left_curly_bracket = _get_token(tokens, source, position + 2)
+    if left_curly_bracket.token_type != TokenType.LEFT_CURLY_BRACKET:
+        return None, _get_unexpected_token_error(left_curly_bracket), position + 3
+    position += 3
+    field_names: List[Token] = []
+    field_types: List[Token] = []
+    # Each field is a name, a colon and the name of a type, separated by commas
+    while _get_token(tokens, source, position).token_type != (
+        TokenType.RIGHT_CURLY_BRACKET
+    ):
+        field_name = _get_token(tokens, source, position)
+        if field_name.token_type != TokenType.IDENTIFIER:
+            return None, _get_unexpected_token_error(field_name), position + 1
+        colon = _get_token(tokens, source, position + 1)
+        if colon.token_type != TokenType.COLON:
+            return None, _get_unexpected_token_error(colon), position + 2
+        field_type = _get_token(tokens, source, position + 2)
+        if field_type.token_type != TokenType.IDENTIFIER:
+            return None, _get_unexpected_token_error(field_type), position + 3
+        field_names.append(field_name)
+        field_types.append(field_type)
+        position += 3
+        separator = _get_token(tokens, source, position)
+        if separator.token_type == TokenType.COMMA:
+            position += 1
+        elif separator.token_type != TokenType.RIGHT_CURLY_BRACKET:
+            return None, _get_unexpected_token_error(separator), position + 1
+    struct_statement = StructStatement(keyword, name, field_names, field_types)
+    return struct_statement, None, position + 1
+
+
+def parse_expression_at(
+    tokens: List[Token],
+    source: Source,
+    position: Int,
+    minimum_binding_power: Float,
+    interner: Optional[AstInterner] = None,
+    terminators: FrozenSet[TokenType] = _STATEMENT_TERMINATORS,
+) -> ParseResult:
+    """Parse an expression starting at a token position, which ends before one of the terminators.
 
-    return Ok(lhs), state
+    This is the allocation-light core of `parse_expression`, which works on positions and returns plain tuples instead of parser states and `Result`s.
+    Operators, brackets and blocks whose parts haven't been parsed yet are kept on an explicit stack instead of the call stack, so deeply nested expressions don't recurse.
+    """
+    return _parse_at(
+        tokens, source, position, minimum_binding_power, interner, terminators, False
+    )
+
+
+def parse_statement_at(
+    tokens: List[Token],
+    source: Source,
+    position: Int,
+    interner: Optional[AstInterner] = None,
+) -> ParseResult:
+    """Parse a statement starting at a token position, including the semicolon at its end.
+
+    Each kind of statement is chosen by its first token and every part of it by at most the next few tokens, so the parser never backtracks.
+    Statements that end with a block, like `if` and `struct`, don't need a semicolon after them.
+    The statements in nested blocks are parsed on the same explicit stack as the expressions in them, so deeply nested blocks don't recurse either.
+    """
+    return _parse_at(
+        tokens, source, position, 0, interner, _STATEMENT_TERMINATORS, True
+    )
+
+
+def parse_expression(
+    state: ParserState, minimum_binding_power: Float
+) -> Tuple[Result[Expression, WodeError], ParserState]:
+    expression, error, position = parse_expression_at(
+        state.all_tokens,
+        state.source,
+        state.position,
+        minimum_binding_power,
+        state.interner,
+    )
+    new_state = ParserState(state.all_tokens, state.source, position, state.interner)
+    match expression, error:
+        case (Expression(), _):
+            return Ok(expression), new_state
+        case (None, WodeError()):
+            return Err(error), new_state
+        case _:  # pragma: no cover
+            raise UnreachableError(
+                "Parsing an expression returns either an expression or an error."
+            )
 
 
 def parse_all(state: ParserState) -> Tuple[List[Expression], List[WodeError]]:
+    start_time = start_phase(Phase.PARSE, state.source)
+    expressions, errors = parse_statements(state)
+    end_phase(Phase.PARSE, state.source, start_time, len(expressions), errors)
+    return expressions, errors
+
+
+# Like `parse_all` without tracing, so parts of a file can be parsed separately
+def parse_statements(state: ParserState) -> Tuple[List[Expression], List[WodeError]]:
+    tokens = state.all_tokens
+    source = state.source
+    position = state.position
+    interner = state.interner
     expressions: List[Expression] = []
     errors: List[WodeError] = []
 
     while True:
         # If we see an EOF, stop parsing
-        if state.chomp()[0].token_type == TokenType.EOF:
+        if _get_token(tokens, source, position).token_type == TokenType.EOF:
             return expressions, errors
 
-        expression_result, state = parse_expression(state, minimum_binding_power=0)
-        match expression_result:
-            case Ok(expression):
-                token, new_state = state.chomp()
-                if token.token_type == TokenType.SEMICOLON:
-                    state = new_state
-                    expressions.append(expression)
-                else:
-                    # If we don't see a semicolon, raise an error
-                    expected_semicolon_error = ExpectedSemicolonError(
-                        SourcePosition(
-                            state.source, token.source_range.start.position - 1
-                        )
-                    )
-                    errors.append(expected_semicolon_error)
-            case Err(err):
-                errors.append(err)
+        statement, error, position = parse_statement_at(
+            tokens, source, position, interner
+        )
+        if statement is not None:
+            expressions.append(statement)
+        elif error is not None:
+            errors.append(error)
@@ -0,0 +1,160 @@
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from enum import Enum
+from pathlib import Path
+from types import CodeType
+
+from wode.parser import parse_statement_at
+from wode.scanner import scan_token_at
+from wode.types import (
+    Any,
+    Bool,
+    ContextManager,
+    Dict,
+    Float,
+    Generator,
+    Int,
+    List,
+    NamedTuple,
+    Optional,
+    Str,
+    Tuple,
+)
+
+
+class ProfileFormat(Enum):
+    JSON = "json"
+    CPROFILE = "cprofile"
+
+
+class PhaseMeasurement(NamedTuple):
+    name: Str
+    wall_time: Float
+    cpu_time: Float
+    peak_memory: Optional[Int]
+
+
+# Functions whose call counts are reported as counters when running under cProfile
+COUNTED_FUNCTIONS: Dict[Str, CodeType] = {
+    "scanner_steps": scan_token_at.__code__,
+    "parser_statement_calls": parse_statement_at.__code__,
+}
+
+
+class NullProfiler:
+    """A profiler that measures nothing, used when profiling is disabled."""
+
+    def phase(self, name: Str) -> ContextManager[None]:
+        return nullcontext()
+
+    def add_counter(self, name: Str, value: Int) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class Profiler(NullProfiler):
+    def __init__(
+        self, *, track_memory: Bool = True, use_cprofile: Bool = False
+    ) -> None:
+        self.phases: List[PhaseMeasurement] = []
+        self.counters: Dict[Str, Int] = {}
+        self.track_memory = track_memory
+        if self.track_memory:
+            tracemalloc.start()
+        self._cprofile = cProfile.Profile() if use_cprofile else None
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    @contextmanager
+    def phase(self, name: Str) -> Generator[None, None, None]:
+        if self.track_memory:
+            tracemalloc.reset_peak()
+        start_wall_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start_wall_time
+            cpu_time = time.process_time() - start_cpu_time
+            peak_memory = (
+                tracemalloc.get_traced_memory()[1] if self.track_memory else None
+            )
+            self.phases.append(PhaseMeasurement(name, wall_time, cpu_time, peak_memory))
+
+    def add_counter(self, name: Str, value: Int) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def stop(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            # The stats aren't part of the typed interface of `pstats.Stats`
+            stats: Dict[Tuple[Str, Int, Str], Tuple[Int, Int, Any, Any, Any]] = getattr(
+                pstats.Stats(self._cprofile), "stats"
+            )
+            for counter_name, code in COUNTED_FUNCTIONS.items():
+                key = (code.co_filename, code.co_firstlineno, code.co_name)
+                if key in stats:
+                    # The second item of each entry is the total number of calls
+                    self.add_counter(counter_name, stats[key][1])
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def get_phase(self, name: Str) -> Optional[PhaseMeasurement]:
+        return next((p for p in self.phases if p.name == name), None)
+
+    def get_rates(self) -> Dict[Str, Float]:
+        # Throughput of each phase, for the counters that belong to a phase
+        rates: Dict[Str, Float] = {}
+        for counter_name, phase_name in [("tokens", "scan"), ("expressions", "parse")]:
+            phase = self.get_phase(phase_name)
+            if counter_name in self.counters and phase is not None:
+                if phase.wall_time > 0:
+                    rates[f"{counter_name}_per_second"] = (
+                        self.counters[counter_name] / phase.wall_time
+                    )
+        return rates
+
+    def get_report(self) -> Str:
+        lines = [f"{'Phase':<10}{'Wall (ms)':>12}{'CPU (ms)':>12}{'Peak memory':>14}"]
+        for phase in self.phases:
+            peak_memory = (
+                "-"
+                if phase.peak_memory is None
+                else f"{phase.peak_memory / 1024:.1f} KiB"
+            )
+            lines.append(
+                f"{phase.name:<10}{phase.wall_time * 1000:>12.3f}{phase.cpu_time * 1000:>12.3f}{peak_memory:>14}"
+            )
+        total_wall_time = sum(p.wall_time for p in self.phases)
+        total_cpu_time = sum(p.cpu_time for p in self.phases)
+        lines.append(
+            f"{'total':<10}{total_wall_time * 1000:>12.3f}{total_cpu_time * 1000:>12.3f}"
+        )
+        for name, value in self.counters.items():
+            lines.append(f"{name}: {value}")
+        for name, rate in self.get_rates().items():
+            lines.append(f"{name}: {rate:.1f}")
+        return "\n".join(lines)
+
+    def to_json(self) -> Dict[Str, Any]:
+        return {
+            "phases": [p._asdict() for p in self.phases],
+            "counters": self.counters,
+            "rates": self.get_rates(),
+        }
+
+    def write(self, output_path: Path, profile_format: ProfileFormat) -> None:
+        match profile_format:
+            case ProfileFormat.JSON:
+                with open(output_path, "w") as f:
+                    json.dump(self.to_json(), f, indent=2)
+            case ProfileFormat.CPROFILE:
+                if self._cprofile is None:
+                    raise ValueError("The profiler wasn't run with cProfile enabled.")
+                self._cprofile.dump_stats(output_path)
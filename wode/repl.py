@@ -0,0 +1,102 @@
+from pathlib import Path
+
+from wode.ast_to_s_expression import convert_all_to_s_expressions, format_s_expression
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.streaming import iter_statements
+from wode.symbol_table import SymbolTable
+from wode.token_type import TokenType
+from wode.types import Any, Callable, List, Optional, Str
+
+PROMPT = "wode> "
+CONTINUATION_PROMPT = "...   "
+
+
+class ReplSession:
+    """The state of an interactive session, which lasts between lines of input.
+
+    Lines are collected until a statement ends with a semicolon, then each finished statement is scanned and parsed on its own.
+    Names are interned in one symbol table for the whole session.
+    """
+
+    def __init__(self) -> None:
+        self.symbol_table = SymbolTable()
+        # The input since the last finished statement
+        self.pending_code = ""
+
+    @property
+    def prompt(self) -> Str:
+        return PROMPT if self.pending_code == "" else CONTINUATION_PROMPT
+
+    def feed_line(self, line: Str) -> List[Str]:
+        """Add a line of input, returning the output of every statement that it finished."""
+        *statements, remainder = iter_statements([self.pending_code + line + "\n"])
+        output: List[Str] = []
+        for statement in statements:
+            output.extend(self.run_statement(statement.to_source()))
+        # Keep the code after the last semicolon until its statement is finished, unless it's only whitespace and comments
+        tokens, errors = scan_all_tokens(remainder.to_source(), self.symbol_table)
+        is_blank = len(errors) == 0 and tokens[0].token_type == TokenType.EOF
+        self.pending_code = "" if is_blank else remainder.code
+        return output
+
+    def run_statement(self, source: Source) -> List[Str]:
+        tokens, errors = scan_all_tokens(source, self.symbol_table)
+        # Like `wode run`, only parse the tokens if there weren't any scanning errors
+        if len(errors) == 0:
+            expressions, errors = parse_all(ParserState(tokens, source))
+            if len(errors) == 0:
+                # Atoms are shown without quotes
+                return [
+                    (
+                        s_expression
+                        if isinstance(s_expression, Str)
+                        else format_s_expression(s_expression)
+                    )
+                    for s_expression in convert_all_to_s_expressions(
+                        expressions, source
+                    )
+                ]
+        return [error.get_message() for error in errors]
+
+    def cancel(self) -> None:
+        self.pending_code = ""
+
+
+def _load_readline(history_path: Optional[Path]) -> Any:
+    # Line editing and history are only available where Python was built with readline
+    try:
+        import readline
+    except ImportError:  # pragma: no cover
+        return None
+    if history_path is not None and history_path.exists():
+        readline.read_history_file(history_path)
+    return readline
+
+
+def run_repl(
+    history_path: Optional[Path] = None,
+    read_line: Callable[[Str], Str] = input,
+    write: Callable[[Str], Any] = print,
+) -> None:
+    """Read statements and show their S-expressions until the input ends."""
+    readline = _load_readline(history_path)
+    session = ReplSession()
+    try:
+        while True:
+            try:
+                line = read_line(session.prompt)
+            except EOFError:
+                write("")
+                return
+            except KeyboardInterrupt:
+                # Throw away the unfinished statement, like Python's REPL
+                session.cancel()
+                write("")
+                continue
+            for output in session.feed_line(line):
+                write(output)
+    finally:
+        if readline is not None and history_path is not None:
+            readline.write_history_file(history_path)
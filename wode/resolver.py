@@ -0,0 +1,251 @@
+from wode.ast import (
+    BinaryExpression,
+    BlockExpression,
+    CallExpression,
+    CommentExpression,
+    Expression,
+    ForExpression,
+    FunctionExpression,
+    GroupingExpression,
+    HashConsed,
+    IfExpression,
+    LetStatement,
+    LiteralExpression,
+    MatchExpression,
+    ReturnStatement,
+    StructStatement,
+    UnaryExpression,
+    VariableExpression,
+    WhileExpression,
+    YieldStatement,
+)
+from wode.errors import DuplicateParameterError, UnresolvedNameError, WodeError
+from wode.source import Source
+from wode.token import Token
+from wode.token_type import TokenType
+from wode.tracing import Phase, end_phase, start_phase
+from wode.types import (
+    Any,
+    Dict,
+    Int,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Str,
+    Tuple,
+)
+from wode.utils import UnreachableError
+
+# The kinds of work on the resolver's stack
+_VISIT = 0
+_DECLARE = 1
+_ENTER_SCOPE = 2
+_EXIT_SCOPE = 3
+
+
+class BindingSite(NamedTuple):
+    # How many scopes out from the use the binding's scope is
+    depth: Int
+    # The binding's index in its scope
+    slot: Int
+    # The binding's index in `Resolution.bindings`
+    binding_index: Int
+
+
+class Scope:
+    """The names declared directly in a block, function, loop body or match arm, linked to the scope around it.
+
+    Scopes are only added to while they're being resolved, so later passes can share them without copying.
+    """
+
+    def __init__(self, parent: Optional["Scope"]) -> None:
+        self.parent = parent
+        self.depth: Int = 0 if parent is None else parent.depth + 1
+        # The token that declared each slot, predefined names don't have one
+        self.bindings: List[Optional[Token]] = []
+
+
+class Resolution:
+    """Links every identifier use and declaration in some code to its binding site.
+
+    Later passes can keep one value per binding in a list indexed by `BindingSite.binding_index`, or one list per scope indexed by `BindingSite.slot`, instead of looking names up by their strings.
+    """
+
+    def __init__(self) -> None:
+        # The token that declared each binding in the order they were declared, predefined names don't have one
+        self.bindings: List[Optional[Token]] = []
+        # The names that were declared before the code, they're the first bindings
+        self.predefined_names: List[Str] = []
+        # Every scope in the order they were entered, the first is the file's scope
+        self.scopes: List[Scope] = []
+        # Keyed by the `id` of the use's expression or the declaration's token, which outlive the resolution
+        self.use_sites: Dict[Int, BindingSite] = {}
+        self.declaration_sites: Dict[Int, BindingSite] = {}
+
+    def __len__(self) -> Int:
+        return len(self.use_sites)
+
+    def get_binding_site(self, expression: Expression) -> Optional[BindingSite]:
+        return self.use_sites.get(id(expression))
+
+    def get_declaration_site(self, token: Token) -> Optional[BindingSite]:
+        return self.declaration_sites.get(id(token))
+
+
+def resolve_all(
+    expressions: List[Expression],
+    source: Optional[Source] = None,
+    predefined_names: Iterable[Str] = (),
+) -> Tuple[Resolution, List[WodeError]]:
+    start_time = start_phase(Phase.RESOLVE, source)
+    resolution, errors = _resolve(expressions, predefined_names)
+    end_phase(Phase.RESOLVE, source, start_time, len(resolution), errors)
+    return resolution, errors
+
+
+def _resolve(
+    expressions: List[Expression], predefined_names: Iterable[Str]
+) -> Tuple[Resolution, List[WodeError]]:
+    resolution = Resolution()
+    errors: List[WodeError] = []
+    uses = resolution.use_sites
+    declarations = resolution.declaration_sites
+    bindings = resolution.bindings
+
+    # The bindings each name currently refers to, innermost last, so every lookup is O(1) however deep the scopes go.
+    # Interned identifiers share their name's string, so its hash is only computed once.
+    visible: Dict[Str, List[Tuple[Int, Int, Int]]] = {}
+    scope = Scope(None)
+    resolution.scopes.append(scope)
+    # The names declared in each scope that's open, so they can be hidden again when it's exited
+    declared_names: List[List[Str]] = [[]]
+
+    def declare(name: Str, token: Optional[Token]) -> None:
+        slot = len(scope.bindings)
+        binding_index = len(bindings)
+        scope.bindings.append(token)
+        bindings.append(token)
+        if token is not None:
+            declarations[id(token)] = BindingSite(0, slot, binding_index)
+        visible.setdefault(name, []).append((scope.depth, slot, binding_index))
+        declared_names[-1].append(name)
+
+    def use(expression: Expression, token: Token) -> None:
+        candidates = visible.get(token.lexeme)
+        if not candidates:
+            errors.append(UnresolvedNameError(token.source_range))
+            return
+        depth, slot, binding_index = candidates[-1]
+        uses[id(expression)] = BindingSite(scope.depth - depth, slot, binding_index)
+
+    # Predefined names come first in the file's scope, they don't have a token
+    for name in predefined_names:
+        resolution.predefined_names.append(name)
+        declare(name, None)
+
+    # Walk the trees with an explicit stack, so deeply nested code doesn't hit the recursion limit
+    stack: List[Tuple[Int, Any]] = []
+    for expression in reversed(expressions):
+        stack.append((_VISIT, expression))
+    while len(stack) > 0:
+        action, item = stack.pop()
+        if action == _DECLARE:
+            declare(item.lexeme, item)
+            continue
+        if action == _ENTER_SCOPE:
+            scope = Scope(scope)
+            resolution.scopes.append(scope)
+            declared_names.append([])
+            continue
+        if action == _EXIT_SCOPE:
+            for name in declared_names.pop():
+                visible[name].pop()
+            assert scope.parent is not None
+            scope = scope.parent
+            continue
+
+        # Work is pushed in reverse, so it's done in source order
+        match item:
+            case LiteralExpression(literal=literal):
+                if literal.token_type == TokenType.IDENTIFIER:
+                    if isinstance(item, HashConsed):
+                        raise ValueError(
+                            "Hash-consed ASTs share identifiers between scopes, so they can't be resolved."
+                        )
+                    use(item, literal)
+            case VariableExpression(token=token):
+                use(item, token)
+            case UnaryExpression(right=right):
+                stack.append((_VISIT, right))
+            case BinaryExpression(left=left, right=right):
+                stack.append((_VISIT, right))
+                stack.append((_VISIT, left))
+            case GroupingExpression(expression=expression):
+                stack.append((_VISIT, expression))
+            case CallExpression(callee=callee, arguments=arguments):
+                for argument in reversed(arguments):
+                    stack.append((_VISIT, argument))
+                stack.append((_VISIT, callee))
+            case BlockExpression(statements=statements):
+                stack.append((_EXIT_SCOPE, None))
+                for statement in reversed(statements):
+                    stack.append((_VISIT, statement))
+                stack.append((_ENTER_SCOPE, None))
+            case IfExpression(
+                conditions=conditions, bodies=bodies, else_body=else_body
+            ):
+                if else_body is not None:
+                    stack.append((_VISIT, else_body))
+                for condition, body in reversed(list(zip(conditions, bodies))):
+                    stack.append((_VISIT, body))
+                    stack.append((_VISIT, condition))
+            case WhileExpression(condition=condition, body=body):
+                stack.append((_VISIT, body))
+                stack.append((_VISIT, condition))
+            case ForExpression(variable=variable, iterable=iterable, body=body):
+                stack.append((_EXIT_SCOPE, None))
+                stack.append((_VISIT, body))
+                stack.append((_DECLARE, variable))
+                stack.append((_ENTER_SCOPE, None))
+                stack.append((_VISIT, iterable))
+            case MatchExpression(subject=subject, patterns=patterns, arms=arms):
+                for pattern, arm in reversed(list(zip(patterns, arms))):
+                    stack.append((_EXIT_SCOPE, None))
+                    stack.append((_VISIT, arm))
+                    # An identifier pattern binds the subject instead of using a name
+                    if pattern.literal.token_type == TokenType.IDENTIFIER:
+                        stack.append((_DECLARE, pattern.literal))
+                    stack.append((_ENTER_SCOPE, None))
+                stack.append((_VISIT, subject))
+            case FunctionExpression(parameters=parameters, body=body):
+                stack.append((_EXIT_SCOPE, None))
+                stack.append((_VISIT, body))
+                seen_names: Set[Str] = set()
+                for parameter in parameters:
+                    name = parameter.lexeme
+                    if name in seen_names:
+                        errors.append(DuplicateParameterError(parameter.source_range))
+                    seen_names.add(name)
+                for parameter in reversed(parameters):
+                    stack.append((_DECLARE, parameter))
+                stack.append((_ENTER_SCOPE, None))
+            case LetStatement(name=name, value=value):
+                # A function can call itself, any other value only sees the names declared before it
+                if isinstance(value, FunctionExpression):
+                    stack.append((_VISIT, value))
+                    stack.append((_DECLARE, name))
+                else:
+                    stack.append((_DECLARE, name))
+                    stack.append((_VISIT, value))
+            case ReturnStatement(value=value) | YieldStatement(value=value):
+                if value is not None:
+                    stack.append((_VISIT, value))
+            case StructStatement(name=name):
+                stack.append((_DECLARE, name))
+            case CommentExpression():
+                pass
+            case _:  # pragma: no cover
+                raise UnreachableError(f"Unknown expression type `{type(item)}`.")
+    return resolution, errors
@@ -1,6 +1,13 @@
-from koda import Err, Just, Maybe, Ok, Result, mapping_get, nothing
+import re
 
-from wode.constants import VALID_IDENTIFIER_CHARACTERS, VALID_IDENTIFIER_PREFIXES
+from koda import Err, Just, Maybe, Ok, Result, nothing
+
+from wode.constants import (
+    DIGITS,
+    VALID_IDENTIFIER_CHARACTERS,
+    VALID_IDENTIFIER_PREFIXES,
+    WHITESPACE_CHARACTERS,
+)
 from wode.errors import (
     NoLeadingZeroOnFloatError,
     TooManyDecimalPointsError,
@@ -10,10 +17,12 @@ from wode.errors import (
     WodeError,
 )
 from wode.source import Source, SourcePosition, SourceRange
-from wode.token import EOFToken, Token
+from wode.symbol_table import SymbolTable
+from wode.token import EOFToken, IdentifierToken, Token, Trivia, TriviaType
 from wode.token_type import TokenType
-from wode.types import Int, List, Str, Tuple
-from wode.utils import UnreachableError, is_digit, is_whitespace
+from wode.tracing import Phase, end_phase, start_phase
+from wode.types import Bool, Int, List, Optional, Str, Tuple
+from wode.utils import UnreachableError, safe_substring
 
 token_mapping = {
     # Triple character tokens
@@ -68,371 +77,352 @@ reserved_keywords = {
     "yield": TokenType.YIELD,
 }
 
+# Matches a run of whitespace, so the whole run can be skipped in one step
+_whitespace_pattern = re.compile(
+    "[" + "".join(re.escape(c) for c in WHITESPACE_CHARACTERS) + "]+"
+)
+
 
 class ScannerState:
-    def __init__(self, source: Source, position: Int = 0) -> None:
+    def __init__(
+        self,
+        source: Source,
+        position: Int = 0,
+        symbol_table: Optional[SymbolTable] = None,
+    ) -> None:
         self.source = source
         self.position = position
+        self.symbol_table = SymbolTable() if symbol_table is None else symbol_table
 
     def chomp(self, n: Int = 1) -> Maybe[Tuple[Str, "ScannerState"]]:
         try:
-            first_n_characters = SourceRange(
-                self.source, self.position, self.position + n
-            ).lexeme
+            first_n_characters = safe_substring(
+                self.source.code, start=self.position, length=n
+            )
         except IndexError:
             return nothing
         new_position = self.position + n
-        return Just((first_n_characters, ScannerState(self.source, new_position)))
+        return Just(
+            (
+                first_n_characters,
+                ScannerState(self.source, new_position, self.symbol_table),
+            )
+        )
 
 
-def scan_for_eof_token(state: ScannerState) -> Maybe[Tuple[Token, ScannerState]]:
-    match state.chomp():
-        case Just(_):
-            return nothing
-        case _:
-            return Just((EOFToken(state.source), state))
+# The result of scanning one step: a token or an error, or neither for whitespace and comments, and the position after the step
+ScanResult = Tuple[Optional[Token], Optional[WodeError], Int]
 
+_digits = frozenset(DIGITS)
+_identifier_prefixes = frozenset(VALID_IDENTIFIER_PREFIXES)
+_identifier_characters = frozenset(VALID_IDENTIFIER_CHARACTERS)
 
-def scan_for_whitespace_token(state: ScannerState) -> Maybe[ScannerState]:
-    match state.chomp():
-        case Just((bite, new_state)):
-            pass
-        case _:  # pragma: no cover
-            raise UnreachableError(
-                "Scanning for whitespace happens after scanning for an EOF token."
-            )
 
-    if is_whitespace(bite):
-        return Just(new_state)
-    else:
-        return nothing
+# The scanner's hot loop works on positions and returns plain tuples, with `None` for no match
+# The `Maybe` and `Result` based functions further down wrap these for a more functional API
 
 
-def scan_for_comment_token(state: ScannerState) -> Maybe[ScannerState]:
-    # TODO: Make this function return a comment token
+def _scan_whitespace(code: Str, position: Int) -> Optional[Int]:
+    whitespace_match = _whitespace_pattern.match(code, position)
+    return None if whitespace_match is None else whitespace_match.end()
 
-    # Get the first character
-    match state.chomp():
-        case Just((bite, _)):
-            pass
-        case _:  # pragma: no cover
-            raise UnreachableError(
-                "Scanning for a comment token happens after scanning for an EOF token."
+
+def _scan_comment(code: Str, position: Int) -> Optional[Int]:
+    if code[position] != "#":
+        return None
+    # Jump to the end of the line, or the end of the file if there isn't one
+    end_of_line_position = code.find("\n", position + 1)
+    return len(code) if end_of_line_position == -1 else end_of_line_position + 1
+
+
+def _scan_string(source: Source, position: Int) -> Optional[ScanResult]:
+    code = source.code
+    if code[position] != '"':
+        return None
+    # Jump straight to the closing quotation mark
+    start_of_string_position = position + 1
+    end_of_string_position = code.find('"', start_of_string_position)
+    if end_of_string_position == -1:
+        unexpected_end_of_file_error = UnexpectedEndOfFileError(
+            SourcePosition(source, len(code) - 1)
+        )
+        return None, unexpected_end_of_file_error, len(code)
+    string_token = Token(
+        TokenType.STRING,
+        SourceRange(source, start_of_string_position, end_of_string_position),
+    )
+    return string_token, None, end_of_string_position + 1
+
+
+def _scan_n_character_token(
+    source: Source, position: Int, n_characters: Int
+) -> Optional[Token]:
+    end_position = position + n_characters
+    # If we reach the end of the file it means the token is less than n characters
+    if end_position > len(source.code):
+        return None
+    token_type = token_mapping.get(source.code[position:end_position])
+    if token_type is None:
+        return None
+    return Token(token_type, SourceRange(source, position, end_position))
+
+
+def _skip_digits(code: Str, position: Int) -> Int:
+    while position < len(code) and code[position] in _digits:
+        position += 1
+    return position
+
+
+def _scan_number(source: Source, position: Int) -> Optional[ScanResult]:
+    code = source.code
+    start_of_number_position = position
+    if code[position] == ".":
+        # If the first character is a decimal point, the number has no leading zero
+        position = _skip_digits(code, position + 1)
+        no_leading_zero_on_float_error = NoLeadingZeroOnFloatError(
+            SourceRange(source, start_of_number_position, position)
+        )
+        # The character after the digits is skipped too
+        return None, no_leading_zero_on_float_error, min(position + 1, len(code))
+    if code[position] not in _digits:
+        return None
+
+    position = _skip_digits(code, position)
+    found_a_decimal_point = position < len(code) and code[position] == "."
+    if found_a_decimal_point:
+        # When we find a decimal point, parse the fractional part
+        end_of_fraction_position = _skip_digits(code, position + 1)
+        found_a_fractional_part = end_of_fraction_position > position + 1
+        position = end_of_fraction_position
+        if position < len(code) and code[position] == ".":
+            # If we find another decimal point, skip the rest of the digits and decimal points and return an error
+            while position < len(code) and (
+                code[position] in _digits or code[position] == "."
+            ):
+                position += 1
+            too_many_decimal_points_error = TooManyDecimalPointsError(
+                SourceRange(source, start_of_number_position, position)
             )
+            return None, too_many_decimal_points_error, position
+        if not found_a_fractional_part:
+            unterminated_float_error = UnterminatedFloatError(
+                SourceRange(source, start_of_number_position, position)
+            )
+            return None, unterminated_float_error, position
 
-    # If the first character is not a hash then we didn't find a comment
-    if bite != "#":
-        return nothing
+    token_type = TokenType.FLOAT if found_a_decimal_point else TokenType.INTEGER
+    token = Token(token_type, SourceRange(source, start_of_number_position, position))
+    return token, None, position
 
-    # If we found a comment, keep consuming characters until the end of the line
-    while True:
-        match state.chomp():
-            case Just((bite, state)):
-                # The comment finishes at the end of the line
-                if bite == "\n":
-                    return Just(state)
-            # The comment also finishes when we reach the end of the file
-            case _:
-                return Just(state)
 
+def _scan_identifier(
+    source: Source, position: Int, symbol_table: SymbolTable
+) -> Optional[Tuple[Token, Int]]:
+    code = source.code
+    # Make sure the identifier starts with a valid character
+    if code[position] not in _identifier_prefixes:
+        return None
+    start_of_identifier_position = position
+    position += 1
+    while position < len(code) and code[position] in _identifier_characters:
+        position += 1
+
+    token_source_range = SourceRange(source, start_of_identifier_position, position)
+    name = code[start_of_identifier_position:position]
+    # Reserved keywords get their own token type, every other name is interned in the symbol table
+    keyword_token_type = reserved_keywords.get(name)
+    if keyword_token_type is not None:
+        return Token(keyword_token_type, token_source_range), position
+    symbol_id = symbol_table.intern(name)
+    return IdentifierToken(token_source_range, symbol_table, symbol_id), position
+
+
+def scan_token_at(
+    source: Source, position: Int, symbol_table: SymbolTable
+) -> ScanResult:
+    """Scan one token, error, or run of whitespace or comment starting at a position.
+
+    This is the allocation-light core of `scan_one_token`, which is used by the scanner's own loops.
+    """
+    code = source.code
+    if position >= len(code):
+        return EOFToken(source), None, position
+
+    end_position = _scan_whitespace(code, position)
+    if end_position is not None:
+        return None, None, end_position
+
+    end_position = _scan_comment(code, position)
+    if end_position is not None:
+        return None, None, end_position
+
+    result = _scan_string(source, position)
+    if result is not None:
+        return result
+
+    for n_characters in (3, 2):
+        token = _scan_n_character_token(source, position, n_characters)
+        if token is not None:
+            return token, None, position + n_characters
+
+    result = _scan_number(source, position)
+    if result is not None:
+        return result
 
-def scan_for_string_token(
-    state: ScannerState,
+    # Must go after number token so we don't accidentally parse the dot in .123
+    token = _scan_n_character_token(source, position, 1)
+    if token is not None:
+        return token, None, position + 1
+
+    identifier_result = _scan_identifier(source, position, symbol_table)
+    if identifier_result is not None:
+        return identifier_result[0], None, identifier_result[1]
+
+    unknown_character_error = UnknownCharacterError(SourcePosition(source, position))
+    return None, unknown_character_error, position + 1
+
+
+def _to_state(state: ScannerState, position: Int) -> ScannerState:
+    return ScannerState(state.source, position, state.symbol_table)
+
+
+def _to_maybe_result(
+    state: ScannerState, result: Optional[ScanResult]
 ) -> Maybe[Tuple[Result[Token, WodeError], ScannerState]]:
-    # Get the first character
-    match state.chomp():
-        case Just((bite, state)):
-            pass
+    match result:
+        case None:
+            return nothing
+        case (Token() as token, _, position):
+            return Just((Ok(token), _to_state(state, position)))
+        case (_, WodeError() as error, position):
+            return Just((Err(error), _to_state(state, position)))
         case _:  # pragma: no cover
-            raise UnreachableError(
-                "Scanning for a string token happens after scanning for an EOF token."
-            )
+            raise UnreachableError("A scan result has either a token or an error.")
 
-    # If the first character isn't a quotation mark it's not a string
-    if bite != '"':
-        return nothing
 
-    start_of_string_position = state.position
-    while True:
-        match state.chomp():
-            case Just((bite, state)):
-                pass
-            case _:
-                unexpected_end_of_file_error = UnexpectedEndOfFileError(
-                    SourcePosition(state.source, state.position - 1)
-                )
-                return Just((Err(unexpected_end_of_file_error), state))
-
-        # Check if we found the closing quotation mark
-        if bite == '"':
-            end_of_string_position = state.position - 1
-            string_token = Token(
-                TokenType.STRING,
-                SourceRange(
-                    state.source, start_of_string_position, end_of_string_position
-                ),
-            )
-            return Just((Ok(string_token), state))
+def scan_for_eof_token(state: ScannerState) -> Maybe[Tuple[Token, ScannerState]]:
+    if state.position < len(state.source.code):
+        return nothing
+    return Just((EOFToken(state.source), state))
 
 
-def scan_for_n_character_token(
-    state: ScannerState, n_characters: Int
-) -> Maybe[Tuple[Token, ScannerState]]:
-    # Check if we've reached the end of the file
-    match state.chomp():
-        case Just((_, _)):
-            pass
-        case _:  # pragma: no cover
-            raise UnreachableError(
-                f"Scanning for a {n_characters} character token happens after scanning for an EOF token."
-            )
+def scan_for_whitespace_token(state: ScannerState) -> Maybe[ScannerState]:
+    end_position = _scan_whitespace(state.source.code, state.position)
+    return nothing if end_position is None else Just(_to_state(state, end_position))
 
-    # Get the next n characters
-    match state.chomp(n_characters):
-        case Just((bite, new_state)):
-            pass
-        case _:
-            # If we reach the end of the file now it means the token is less than n characters
-            return nothing
 
-    maybe_token_type = mapping_get(token_mapping, bite)
-    maybe_token = maybe_token_type.map(
-        lambda token_type: Token(
-            token_type,
-            SourceRange(state.source, state.position, state.position + n_characters),
-        )
-    )
-    return maybe_token.map(lambda token: (token, new_state))
+def scan_for_comment_token(state: ScannerState) -> Maybe[ScannerState]:
+    # Comments aren't tokens, but `scan_all_tokens` can keep them as trivia
+    end_position = _scan_comment(state.source.code, state.position)
+    return nothing if end_position is None else Just(_to_state(state, end_position))
 
 
-def scan_for_number_token(
+def scan_for_string_token(
     state: ScannerState,
 ) -> Maybe[Tuple[Result[Token, WodeError], ScannerState]]:
-    start_of_number_position = state.position
+    return _to_maybe_result(state, _scan_string(state.source, state.position))
 
-    # Get the first character
-    match state.chomp():
-        case Just((bite, new_state)):
-            pass
-        case _:  # pragma: no cover
-            raise UnreachableError(
-                "Scanning for a number token happens after scanning for an EOF token."
-            )
 
-    # If the first character is a decimal point, the number has no leading zero
-    if bite == ".":
-        state = new_state
-        while True:
-            match state.chomp():
-                case Just((bite, new_state)):
-                    if is_digit(bite):
-                        pass
-                    else:
-                        break
-                case _:
-                    break
-            state = new_state
-        no_leading_zero_on_float_error = NoLeadingZeroOnFloatError(
-            SourceRange(state.source, start_of_number_position, state.position)
-        )
-        return Just((Err(no_leading_zero_on_float_error), new_state))
-    elif is_digit(bite):
-        pass
-    else:
+def scan_for_n_character_token(
+    state: ScannerState, n_characters: Int
+) -> Maybe[Tuple[Token, ScannerState]]:
+    token = _scan_n_character_token(state.source, state.position, n_characters)
+    if token is None:
         return nothing
+    return Just((token, _to_state(state, state.position + n_characters)))
 
-    found_a_decimal_point = False
-    while True:
-        match state.chomp():
-            case Just((".", new_state)):
-                # When we find a decimal point, start parsing the fractional part
-                found_a_decimal_point = True
-                state = new_state
-                break
-            case Just((bite, new_state)):
-                if is_digit(bite):
-                    pass
-                else:
-                    # If the character isn't a number or a decimal then the number has ended
-                    break
-            case _:
-                # If we reach the end of the file then the number has ended
-                break
-        state = new_state
-
-    # Check if we need to parse the fractional part
-    if found_a_decimal_point:
-        found_a_fractional_part = False
-        while True:
-            match state.chomp():
-                case Just((".", new_state)):
-                    # If we find another decimal point, return an error
-                    while True:
-                        match state.chomp():
-                            case Just((bite, new_state)):
-                                if is_digit(bite) or bite == ".":
-                                    state = new_state
-                                else:
-                                    break
-                            case _:
-                                break
-                    too_many_decimal_points_error = TooManyDecimalPointsError(
-                        SourceRange(
-                            state.source, start_of_number_position, state.position
-                        )
-                    )
-                    return Just((Err(too_many_decimal_points_error), state))
-                case Just((bite, new_state)):
-                    if is_digit(bite):
-                        found_a_fractional_part = True
-                    else:
-                        # If the character isn't a number or a decimal then the number has ended
-                        break
-                case _:
-                    # If we reach the end of the file then the number has ended
-                    break
-            state = new_state
-        if not found_a_fractional_part:
-            unterminated_float_error = UnterminatedFloatError(
-                SourceRange(state.source, start_of_number_position, state.position)
-            )
-            return Just((Err(unterminated_float_error), state))
 
-    # Return the number token
-    token_type = TokenType.FLOAT if found_a_decimal_point else TokenType.INTEGER
-    token = Token(
-        token_type, SourceRange(state.source, start_of_number_position, state.position)
-    )
-    return Just((Ok(token), state))
+def scan_for_number_token(
+    state: ScannerState,
+) -> Maybe[Tuple[Result[Token, WodeError], ScannerState]]:
+    return _to_maybe_result(state, _scan_number(state.source, state.position))
 
 
 def scan_for_identifier_token(state: ScannerState) -> Maybe[Tuple[Token, ScannerState]]:
-    # Get the first character
-    match state.chomp():
-        case Just((bite, _)):
-            pass
-        case _:  # pragma: no cover
-            raise UnreachableError(
-                "Scanning for an identifier token happens after scanning for an EOF token."
-            )
-
-    # Make sure the identifier starts with a valid character
-    if bite not in VALID_IDENTIFIER_PREFIXES:
+    result = _scan_identifier(state.source, state.position, state.symbol_table)
+    if result is None:
         return nothing
-
-    start_of_identifier_position = state.position
-    while True:
-        match state.chomp():
-            case Just((bite, new_state)):
-                if bite in VALID_IDENTIFIER_CHARACTERS:
-                    pass
-                else:
-                    break
-            case _:
-                # If we reached the end of the file the identifier has ended
-                break
-        state = new_state
-
-    end_of_identifier_position = state.position
-    token_source_range = SourceRange(
-        state.source, start_of_identifier_position, end_of_identifier_position
-    )
-    # Try to find the token type of the reserved keyword, defaulting to the identifier type if one isn't found
-    token_type = reserved_keywords.get(token_source_range.lexeme, TokenType.IDENTIFIER)
-
-    token = Token(token_type, token_source_range)
-    return Just((token, state))
+    token, position = result
+    return Just((token, _to_state(state, position)))
 
 
 def scan_one_token(
     state: ScannerState,
 ) -> Tuple[Result[Maybe[Token], WodeError], ScannerState]:
-    match scan_for_eof_token(state):
-        case Just((token, state)):
-            return Ok(Just(token)), state
-        case _:
-            pass
-
-    match scan_for_whitespace_token(state):
-        case Just(new_state):
-            return Ok(nothing), new_state
-        case _:
-            pass
-
-    match scan_for_comment_token(state):
-        case Just(new_state):
-            return Ok(nothing), new_state
-        case _:
-            pass
-
-    match scan_for_string_token(state):
-        case Just((Ok(token), state)):
-            return Ok(Just(token)), state
-        case Just((Err(wode_error), state)):
-            return Err(wode_error), state
-        case _:
-            pass
-
-    match scan_for_n_character_token(state, 3):
-        case Just((token, state)):
-            return Ok(Just(token)), state
-        case _:
-            pass
-
-    match scan_for_n_character_token(state, 2):
-        case Just((token, state)):
-            return Ok(Just(token)), state
-        case _:
-            pass
-
-    match scan_for_number_token(state):
-        case Just((Ok(token), state)):
-            return Ok(Just(token)), state
-        case Just((Err(wode_error), state)):
-            return Err(wode_error), state
-        case _:
-            pass
-
-    # Must go after number token so we don't accidentally parse the dot in .123
-    match scan_for_n_character_token(state, 1):
-        case Just((token, state)):
-            return Ok(Just(token)), state
-        case _:
-            pass
-
-    match scan_for_identifier_token(state):
-        case Just((token, state)):
-            return Ok(Just(token)), state
-        case _:
-            pass
-
-    match state.chomp():
-        case Just((_, new_state)):
-            unknown_character_error = UnknownCharacterError(
-                SourcePosition(state.source, state.position)
-            )
-            return Err(unknown_character_error), new_state
-        case _:  # pragma: no cover
-            raise UnreachableError(
-                "Reaching an unknown character error happens after scanning for an EOF token."
-            )
+    token, error, position = scan_token_at(
+        state.source, state.position, state.symbol_table
+    )
+    new_state = state if position == state.position else _to_state(state, position)
+    if error is not None:
+        return Err(error), new_state
+    return Ok(nothing if token is None else Just(token)), new_state
+
+
+def scan_all_tokens(
+    source: Source,
+    symbol_table: Optional[SymbolTable] = None,
+    keep_trivia: Bool = False,
+) -> Tuple[List[Token], List[WodeError]]:
+    start_time = start_phase(Phase.SCAN, source)
+    if symbol_table is None:
+        symbol_table = SymbolTable()
+    # Keeping trivia uses a separate loop so the default path doesn't have to check for it
+    if keep_trivia:
+        tokens, errors = _scan_all_tokens_with_trivia(source, symbol_table)
+    else:
+        tokens, errors = _scan_all_tokens(source, symbol_table)
+    end_phase(Phase.SCAN, source, start_time, len(tokens), errors)
+    return tokens, errors
 
 
-def scan_all_tokens(source: Source) -> Tuple[List[Token], List[WodeError]]:
+def _scan_all_tokens(
+    source: Source, symbol_table: SymbolTable
+) -> Tuple[List[Token], List[WodeError]]:
+    tokens: List[Token] = []
+    errors: List[WodeError] = []
+    position = 0
+    while True:
+        token, error, position = scan_token_at(source, position, symbol_table)
+        if token is not None:
+            tokens.append(token)
+            if token.token_type == TokenType.EOF:
+                return tokens, errors
+        elif error is not None:
+            errors.append(error)
+
+
+def _scan_all_tokens_with_trivia(
+    source: Source, symbol_table: SymbolTable
+) -> Tuple[List[Token], List[WodeError]]:
     tokens: List[Token] = []
     errors: List[WodeError] = []
-    state = ScannerState(source)
+    trivia: List[Trivia] = []
+    position = 0
     while True:
-        match scan_one_token(state):
-            case (Ok(Just(token)), new_state):
-                tokens.append(token)
-                state = new_state
-                if token.token_type == TokenType.EOF:
-                    return tokens, errors
-            case (Err(wode_error), new_state):
-                errors.append(wode_error)
-                state = new_state
-                # if wode_error.error_type==WodeErrorType.UnexpectedEndOfFileError:
-                #     return tokens,errors
-            case (_, new_state):
-                state = new_state
+        token, error, new_position = scan_token_at(source, position, symbol_table)
+        if token is not None:
+            # Attach the trivia since the last token to this token
+            if len(trivia) > 0:
+                token.leading_trivia = Tuple(trivia)
+                trivia = []
+            tokens.append(token)
+            if token.token_type == TokenType.EOF:
+                return tokens, errors
+        elif error is not None:
+            errors.append(error)
+        else:
+            trivia_type = (
+                TriviaType.COMMENT
+                if source.code[position] == "#"
+                else TriviaType.WHITESPACE
+            )
+            # Merge runs of whitespace into a single piece of trivia
+            if (
+                trivia_type == TriviaType.WHITESPACE
+                and len(trivia) > 0
+                and trivia[-1].trivia_type == TriviaType.WHITESPACE
+            ):
+                trivia[-1] = Trivia(trivia_type, trivia[-1].start, new_position)
+            else:
+                trivia.append(Trivia(trivia_type, position, new_position))
+        position = new_position
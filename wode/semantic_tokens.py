@@ -0,0 +1,179 @@
+from bisect import bisect_left, bisect_right
+
+from wode.source import Source
+from wode.token import Token
+from wode.token_stream import TOKEN_TYPE_CODES, TOKEN_TYPES, TokenStream
+from wode.token_type import TokenType
+from wode.types import Dict, Int, List, Optional, Sequence, Str, Tuple
+
+# The semantic token types reported to editors, the index of each type is its code in the encoded tokens
+SEMANTIC_TOKEN_TYPES = [
+    "keyword",
+    "number",
+    "string",
+    "variable",
+    "operator",
+    "comment",
+]
+
+_KEYWORD_TOKEN_TYPES = [
+    TokenType.ELIF,
+    TokenType.ELSE,
+    TokenType.FALSE,
+    TokenType.FOR,
+    TokenType.IF,
+    TokenType.IN,
+    TokenType.LET,
+    TokenType.MATCH,
+    TokenType.NOTHING,
+    TokenType.RETURN,
+    TokenType.STRUCT,
+    TokenType.TRUE,
+    TokenType.WHILE,
+    TokenType.YIELD,
+]
+_OPERATOR_TOKEN_TYPES = [
+    TokenType.CARET,
+    TokenType.PLUS,
+    TokenType.SLASH,
+    TokenType.STAR,
+    TokenType.AMPERSAND_AMPERSAND,
+    TokenType.BANG,
+    TokenType.BAR_BAR,
+    TokenType.DOUBLE_ARROW,
+    TokenType.ELLIPSIS,
+    TokenType.EQUAL_EQUAL,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS_EQUAL,
+    TokenType.PIPE,
+    TokenType.SINGLE_ARROW,
+    TokenType.BANG_EQUAL,
+    TokenType.EQUAL,
+    TokenType.GREATER,
+    TokenType.LESS,
+    TokenType.MINUS,
+]
+
+# Token types without a semantic token type, like brackets and the EOF token, aren't highlighted
+SEMANTIC_TOKEN_TYPE_CODES: Dict[TokenType, Int] = {
+    **{t: SEMANTIC_TOKEN_TYPES.index("keyword") for t in _KEYWORD_TOKEN_TYPES},
+    **{t: SEMANTIC_TOKEN_TYPES.index("operator") for t in _OPERATOR_TOKEN_TYPES},
+    TokenType.INTEGER: SEMANTIC_TOKEN_TYPES.index("number"),
+    TokenType.FLOAT: SEMANTIC_TOKEN_TYPES.index("number"),
+    TokenType.STRING: SEMANTIC_TOKEN_TYPES.index("string"),
+    TokenType.IDENTIFIER: SEMANTIC_TOKEN_TYPES.index("variable"),
+    TokenType.COMMENT: SEMANTIC_TOKEN_TYPES.index("comment"),
+}
+
+
+def get_encoded_length(text: Str, position_encoding: Str = "utf-32") -> Int:
+    """Get the length of some text in the units of an LSP position encoding."""
+    match position_encoding:
+        case "utf-32":
+            return len(text)
+        case "utf-16":
+            return len(text.encode("utf-16-le")) // 2
+        case "utf-8":
+            return len(text.encode("utf-8"))
+        case _:
+            raise ValueError(f"Unknown position encoding `{position_encoding}`.")
+
+
+# The semantic token type of each token type code in a token stream, or `NO_SEMANTIC_TOKEN_TYPE`
+NO_SEMANTIC_TOKEN_TYPE = -1
+SEMANTIC_TOKEN_TYPES_BY_CODE = [
+    SEMANTIC_TOKEN_TYPE_CODES.get(token_type, NO_SEMANTIC_TOKEN_TYPE)
+    for token_type in TOKEN_TYPES
+]
+_STRING_CODE = TOKEN_TYPE_CODES[TokenType.STRING]
+
+
+def encode_token_stream(
+    token_stream: TokenStream,
+    line_range: Optional[Tuple[Int, Int]] = None,
+    position_encoding: Str = "utf-32",
+) -> List[Int]:
+    """Encode tokens in the relative format of the LSP `textDocument/semanticTokens` requests.
+
+    Each token is five integers: the line relative to the previous token, the start column (relative to the previous token if they're on the same line), the length, the token type and the modifiers.
+    Tokens that span several lines are split into one token per line, since not every editor supports multi-line tokens.
+    If a range of line indices is given, only tokens that start in it are included, and tokens outside it aren't looked at.
+    Columns and lengths are measured in the units of the position encoding agreed with the editor.
+    """
+    source = token_stream.source
+    code = source.code
+    line_start_positions = source.line_start_positions
+    n_lines = len(line_start_positions)
+    token_type_codes = token_stream.token_type_codes
+    starts = token_stream.starts
+    ends = token_stream.ends
+
+    # The tokens are in order, so the first token in the range can be found with a binary search
+    first_index = 0
+    last_line_index = n_lines
+    if line_range is not None:
+        first_line_index, last_line_index = line_range
+        if first_line_index >= n_lines:
+            return []
+        first_index = bisect_left(starts, line_start_positions[first_line_index])
+
+    data: List[Int] = []
+    previous_line_index = 0
+    previous_column = 0
+    for index in range(first_index, len(token_type_codes)):
+        token_type_code = token_type_codes[index]
+        semantic_token_type = SEMANTIC_TOKEN_TYPES_BY_CODE[token_type_code]
+        if semantic_token_type == NO_SEMANTIC_TOKEN_TYPE:
+            continue
+        start = starts[index]
+        end = ends[index]
+        # The range of a string token doesn't include its quotation marks, but they should be highlighted too
+        if token_type_code == _STRING_CODE:
+            start -= 1
+            end += 1
+        line_index = bisect_right(line_start_positions, start) - 1
+        if line_index >= last_line_index:
+            break
+        if line_range is not None and line_index < line_range[0]:
+            continue
+        column = get_encoded_length(
+            code[line_start_positions[line_index] : start], position_encoding
+        )
+        while start < end:
+            line_end = (
+                line_start_positions[line_index + 1]
+                if line_index + 1 < n_lines
+                else len(code)
+            )
+            # Line breaks aren't part of the highlighted text
+            length = get_encoded_length(
+                code[start : min(end, line_end)].rstrip("\r\n"), position_encoding
+            )
+            if length > 0:
+                data.extend(
+                    [
+                        line_index - previous_line_index,
+                        column
+                        - (previous_column if line_index == previous_line_index else 0),
+                        length,
+                        semantic_token_type,
+                        0,
+                    ]
+                )
+                previous_line_index = line_index
+                previous_column = column
+            start = line_end
+            line_index += 1
+            column = 0
+    return data
+
+
+def encode_semantic_tokens(
+    source: Source,
+    tokens: Sequence[Token],
+    line_range: Optional[Tuple[Int, Int]] = None,
+    position_encoding: Str = "utf-32",
+) -> List[Int]:
+    return encode_token_stream(
+        TokenStream.from_tokens(source, List(tokens)), line_range, position_encoding
+    )
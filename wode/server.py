@@ -0,0 +1,170 @@
+import asyncio
+import json
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+
+from wode.ast import Expression
+from wode.ast_to_s_expression import convert_all_to_s_expressions
+from wode.errors import WodeError
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.token import Token
+from wode.types import Any, Coroutine, Dict, Int, List, Optional, Set, Str, cast
+
+OUTPUTS = ["tokens", "ast", "diagnostics"]
+# The longest request line a socket connection reads, asyncio's default of 64 KiB is too short for many source files
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+def _token_to_json(token: Token) -> Dict[Str, Any]:
+    return {
+        "type": token.token_type.value,
+        "lexeme": token.lexeme,
+        "start": token.source_range.start.position,
+        "end": token.source_range.end.position,
+    }
+
+
+def _error_to_json(error: WodeError) -> Dict[Str, Any]:
+    return {
+        "error_type": error.error_type,
+        "message": error.message,
+        "start": error.source_range.start.position,
+        "end": error.source_range.end.position,
+        "rendered": error.get_message(),
+    }
+
+
+def compile_source(
+    code: Str, file_path: Optional[Str] = None, outputs: List[Str] = OUTPUTS
+) -> Dict[Str, Any]:
+    """Scan and parse some source code, returning the requested outputs as JSON-compatible values."""
+    source = Source(None if file_path is None else Path(file_path), code)
+    tokens, errors = scan_all_tokens(source)
+    expressions: List[Expression] = []
+    # Like `wode run`, only parse the tokens if there weren't any scanning errors
+    if len(errors) == 0:
+        expressions, errors = parse_all(ParserState(tokens, source))
+
+    result: Dict[Str, Any] = {}
+    if "tokens" in outputs:
+        result["tokens"] = [_token_to_json(t) for t in tokens]
+    if "ast" in outputs:
+        result["ast"] = convert_all_to_s_expressions(expressions, source)
+    if "diagnostics" in outputs:
+        result["diagnostics"] = [_error_to_json(e) for e in errors]
+    return result
+
+
+class CompileServer:
+    """Handles newline-delimited JSON compile requests concurrently.
+
+    Each request is an object with a `source` string and optional `id`, `path` and `outputs` fields.
+    Small sources are compiled on the event loop, larger ones are sent to a pool of worker processes.
+    """
+
+    def __init__(self, workers: Int = 0, inline_threshold: Int = 4096) -> None:
+        self.inline_threshold = inline_threshold
+        self._executor: Optional[Executor] = (
+            ProcessPoolExecutor(workers) if workers > 0 else None
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def handle_request(self, line: bytes) -> bytes:
+        request_id: Any = None
+        try:
+            request: Any = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("The request must be a JSON object.")
+            request = cast(Dict[Str, Any], request)
+            request_id = request.get("id")
+            code = request["source"]
+            file_path = request.get("path")
+            outputs = request.get("outputs", OUTPUTS)
+            if not isinstance(code, Str):
+                raise ValueError("The `source` field must be a string.")
+            if self._executor is None or len(code) < self.inline_threshold:
+                result = compile_source(code, file_path, outputs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._executor, compile_source, code, file_path, outputs
+                )
+            response: Dict[Str, Any] = {"id": request_id, "result": result}
+            # Encoding the result can fail too, like an AST that's nested too deeply for `json`
+            return json.dumps(response).encode("utf-8") + b"\n"
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"id": request_id, "error": f"Invalid request: {e}"}
+        except Exception as e:
+            # Any other failure only fails this request, instead of the task that's handling it
+            response = {"id": request_id, "error": f"Compiling failed: {e!r}"}
+        return json.dumps(response).encode("utf-8") + b"\n"
+
+    def _start_task(
+        self, pending: Set["asyncio.Task[None]"], coroutine: Coroutine[Any, Any, None]
+    ) -> None:
+        # Keep a reference to each task until it's done so it isn't garbage collected
+        task = asyncio.create_task(coroutine)
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        write_lock = asyncio.Lock()
+        pending: Set["asyncio.Task[None]"] = set()
+
+        async def respond(line: bytes) -> None:
+            response = await self.handle_request(line)
+            async with write_lock:
+                writer.write(response)
+                await writer.drain()
+
+        try:
+            # Requests on the same connection are handled concurrently, so responses can arrive out of order
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError as e:
+                    # The line is longer than the limit, and has been dropped from the stream
+                    response = {"id": None, "error": f"Invalid request: {e}"}
+                    async with write_lock:
+                        writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                        await writer.drain()
+                    continue
+                if not line:
+                    break
+                if line.strip():
+                    self._start_task(pending, respond(line))
+            await asyncio.gather(*pending)
+        finally:
+            writer.close()
+
+    async def serve_unix_socket(self, socket_path: Path) -> None:
+        server = await asyncio.start_unix_server(
+            self.handle_connection, path=Str(socket_path), limit=STREAM_LIMIT
+        )
+        async with server:
+            await server.serve_forever()
+
+    async def serve_stdio(self) -> None:
+        loop = asyncio.get_running_loop()
+        write_lock = asyncio.Lock()
+        pending: Set["asyncio.Task[None]"] = set()
+
+        async def respond(line: bytes) -> None:
+            response = await self.handle_request(line)
+            async with write_lock:
+                sys.stdout.buffer.write(response)
+                sys.stdout.buffer.flush()
+
+        # Reading stdin blocks, so do it in a thread to keep the event loop free
+        while line := await loop.run_in_executor(None, sys.stdin.buffer.readline):
+            if line.strip():
+                self._start_task(pending, respond(line))
+        await asyncio.gather(*pending)
@@ -1,11 +1,15 @@
+import os
+from bisect import bisect_right
 from itertools import accumulate
 from pathlib import Path
 
-from wode.types import Int, List, Optional, Str, Tuple, Union
+from wode.types import Bool, Int, List, Optional, Str, Tuple, Union
 from wode.utils import safe_substring
 
 
 class LineNumber:
+    __slots__ = ("value",)
+
     def __init__(self, value: Int) -> None:
         if value <= 0:
             raise ValueError(f"Line number `{value}` must be greater than zero.")
@@ -19,6 +23,8 @@ class LineNumber:
 
 
 class LineIndex:
+    __slots__ = ("value",)
+
     def __init__(self, value: Int) -> None:
         if value < 0:
             raise ValueError(
@@ -34,6 +40,8 @@ class LineIndex:
 
 
 class Column:
+    __slots__ = ("value",)
+
     def __init__(self, value: Int) -> None:
         if value < 0:
             raise ValueError(f"Column `{value}` must be greater than or equal to zero.")
@@ -41,15 +49,37 @@ class Column:
 
 
 class Source:
-    def __init__(self, file_path: Optional[Path], code: Str) -> None:
+    def __init__(
+        self,
+        file_path: Optional[Path],
+        code: Str,
+        file_id: Optional[Int] = None,
+        first_line_index: Int = 0,
+        first_column: Int = 0,
+    ) -> None:
         self._file_path: Optional[Path] = file_path
+        self._resolved_file_path: Optional[Path] = None
         self._code = code
+        # The ID of the file in a `SourceMap`, if it belongs to one
+        self.file_id = file_id
+        # Where the code starts if it's part of a larger stream, this only changes how positions are shown
+        self.first_line_index = first_line_index
+        self.first_column = first_column
         self._lines = self.code.splitlines(keepends=True)
+        self._line_start_positions: Optional[List[Int]] = None
+        self._code_view: Optional[memoryview] = None
 
     @property
     def file_path(self) -> Optional[Path]:
         return self._file_path
 
+    @property
+    def resolved_file_path(self) -> Optional[Path]:
+        # Resolving a path touches the file system, so only do it once
+        if self._resolved_file_path is None and self._file_path is not None:
+            self._resolved_file_path = self._file_path.resolve()
+        return self._resolved_file_path
+
     @property
     def code(self) -> Str:
         return self._code
@@ -58,58 +88,125 @@ class Source:
     def lines(self) -> List[Str]:
         return self._lines
 
+    @property
+    def is_ascii(self) -> Bool:
+        return self._code.isascii()
+
+    @property
+    def code_view(self) -> memoryview:
+        """The code as a read-only view of bytes, only available for ASCII code where every character is one byte."""
+        if self._code_view is None:
+            if not self.is_ascii:
+                raise ValueError("Only ASCII code can be viewed as bytes.")
+            self._code_view = memoryview(self._code.encode("ascii")).toreadonly()
+        return self._code_view
+
+    def get_lexeme_view(self, start: Int, end: Int) -> memoryview:
+        # Slicing a memoryview doesn't copy, so this only costs O(1) however long the lexeme is
+        code_view = self.code_view
+        if not 0 <= start <= end <= len(code_view):
+            raise IndexError(f"The range from `{start}` to `{end}` is out of bounds.")
+        return code_view[start:end]
+
     def get_line(self, line_number: LineNumber) -> Str:
-        return self._lines[line_number.to_line_index().value]
+        line_index = line_number.to_line_index().value
+        # The empty line after a final line break isn't in the list of lines
+        if line_index == len(self._lines) == len(self.line_start_positions) - 1:
+            return ""
+        return self._lines[line_index]
+
+    @property
+    def line_start_positions(self) -> List[Int]:
+        # Only computed the first time it's needed
+        if self._line_start_positions is None:
+            line_end_positions = List(accumulate(len(line) for line in self._lines))
+            # If the code ends with a line break, there is an empty line after it
+            last_line = self._lines[-1] if len(self._lines) > 0 else ""
+            if last_line.splitlines() == [last_line]:
+                line_end_positions = line_end_positions[:-1]
+            self._line_start_positions = [0] + line_end_positions
+        return self._line_start_positions
+
+    def get_line_index_and_column(self, position: Int) -> Tuple[Int, Int]:
+        line_start_positions = self.line_start_positions
+        line_index = max(0, bisect_right(line_start_positions, position) - 1)
+        return line_index, position - line_start_positions[line_index]
+
+
+# Checks that positions are in bounds and ranges are in order, which costs time on every range so it's off by default
+_debug_validation = os.environ.get("WODE_DEBUG_VALIDATION", "") not in ["", "0"]
+
+
+def set_debug_validation(enabled: Bool) -> None:
+    global _debug_validation
+    _debug_validation = enabled
+
+
+def _validate_position(source: Source, position: Int) -> None:
+    # Errors can point at the position before the first character
+    if not -1 <= position <= len(source.code):
+        raise ValueError(f"Position `{position}` is outside of the source code.")
 
 
 class SourcePosition:
+    """A position in some source code."""
+
+    __slots__ = ("source", "position")
+
     def __init__(self, source: Source, position: Int) -> None:
+        if _debug_validation:
+            _validate_position(source, position)
         self.source = source
         self.position = position
 
+    def __eq__(self, other: object) -> Bool:
+        return (
+            isinstance(other, SourcePosition)
+            and self.source is other.source
+            and self.position == other.position
+        )
+
+    def __hash__(self) -> Int:
+        return hash((id(self.source), self.position))
+
+    @property
+    def line_index_and_column(self) -> Tuple[Int, Int]:
+        # Plain integers, for when the wrapper types aren't needed
+        return self.source.get_line_index_and_column(self.position)
+
     @property
     def line_index(self) -> LineIndex:
-        line_lengths = [len(line) for line in self.source.lines]
-        line_end_positions = list(accumulate(line_lengths))
-
-        # Get the index of the first line that ends after the specified position
-        return next(
-            LineIndex(line_index)
-            for line_index, line_end_position in enumerate(line_end_positions)
-            if line_end_position > self.position
-        )
+        return LineIndex(self.line_index_and_column[0])
 
     @property
     def line_number(self) -> LineNumber:
-        return self.line_index.to_line_number()
+        return LineNumber(self.line_index_and_column[0] + 1)
 
     @property
     def column(self) -> Column:
-        line_lengths = [len(line) for line in self.source.lines]
-        line_end_positions = list(accumulate(line_lengths))
-
-        # The start of the line is the end of the previous line
-        line_start_position = (
-            0
-            if self.line_index.value == 0
-            else line_end_positions[self.line_index.value - 1]
-        )
-        # The column is the offset from the start of the line
-        return Column(self.position - line_start_position)
+        return Column(self.line_index_and_column[1])
 
     @property
     def coordinates(self) -> Tuple[LineNumber, Column]:
-        return self.line_number, self.column
+        line_index, column = self.line_index_and_column
+        return LineNumber(line_index + 1), Column(column)
 
     @property
     def lexeme(self) -> Str:
         return safe_substring(self.source.code, start=self.position, length=1)
 
     def __str__(self) -> Str:
-        return Str(self.line_number.value) + ":" + Str(self.column.value)
+        line_index, column = self.line_index_and_column
+        if line_index == 0:
+            column += self.source.first_column
+        return Str(self.source.first_line_index + line_index + 1) + ":" + Str(column)
 
 
 class SourceRange:
+    """A range of source code."""
+
+    __slots__ = ("source", "start", "end")
+
     def __init__(
         self,
         source: Source,
@@ -117,20 +214,36 @@ class SourceRange:
         end: Union[Int, SourcePosition],
     ) -> None:
         self.source = source
+        # Positions belong to the same source object, like they do when they're compared, so this check is O(1)
         match start:
             case Int():
                 self.start = SourcePosition(self.source, start)
             case SourcePosition():
-                if start.source.code != self.source.code:
+                if start.source is not source:
                     raise ValueError("Start position bad")
                 self.start = start
         match end:
             case Int():
                 self.end = SourcePosition(self.source, end)
             case SourcePosition():
-                if end.source.code != self.source.code:
+                if end.source is not source:
                     raise ValueError("End position bad")
                 self.end = end
+        if _debug_validation and self.start.position > self.end.position:
+            raise ValueError(
+                f"The range starts at `{self.start.position}` after it ends at `{self.end.position}`."
+            )
+
+    def __eq__(self, other: object) -> Bool:
+        return (
+            isinstance(other, SourceRange)
+            and self.source is other.source
+            and self.start.position == other.start.position
+            and self.end.position == other.end.position
+        )
+
+    def __hash__(self) -> Int:
+        return hash((id(self.source), self.start.position, self.end.position))
 
     @property
     def lexeme(self) -> Str:
@@ -138,5 +251,9 @@ class SourceRange:
             self.source.code, start=self.start.position, end=self.end.position
         )
 
+    @property
+    def lexeme_view(self) -> memoryview:
+        return self.source.get_lexeme_view(self.start.position, self.end.position)
+
     def __len__(self) -> Int:
         return self.end.position - self.start.position
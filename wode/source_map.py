@@ -0,0 +1,75 @@
+from bisect import bisect_right
+from pathlib import Path
+
+from wode.source import Source, SourcePosition
+from wode.types import Dict, Int, Iterator, List, Optional, Str, Tuple
+
+
+class SourceMap:
+    """All the source files in a project, each with a compact integer ID.
+
+    Every file is also given a range of global offsets, so a position in any file can be stored as a single integer.
+    The ranges are separated by one unused offset, so the end of one file isn't the same offset as the start of the next.
+    """
+
+    def __init__(self) -> None:
+        self._sources: List[Source] = []
+        self._base_offsets: List[Int] = []
+        self._next_base_offset = 0
+        self._file_ids_by_path: Dict[Path, Int] = {}
+
+    def __len__(self) -> Int:
+        return len(self._sources)
+
+    def __iter__(self) -> Iterator[Source]:
+        return iter(self._sources)
+
+    def add_source(self, file_path: Optional[Path], code: Str) -> Source:
+        """Add some code to the map, or return the existing source if its file was already added."""
+        # The source resolves its path once, and keeps it for showing errors
+        file_id = len(self._sources)
+        source = Source(file_path, code, file_id)
+        resolved_file_path = source.resolved_file_path
+        if resolved_file_path is not None:
+            existing_file_id = self._file_ids_by_path.get(resolved_file_path)
+            if existing_file_id is not None:
+                return self._sources[existing_file_id]
+        self._sources.append(source)
+        self._base_offsets.append(self._next_base_offset)
+        self._next_base_offset += len(code) + 1
+        if resolved_file_path is not None:
+            self._file_ids_by_path[resolved_file_path] = file_id
+        return source
+
+    def add_file(self, file_path: Path) -> Source:
+        file_id = self._file_ids_by_path.get(file_path.resolve())
+        if file_id is not None:
+            return self._sources[file_id]
+        with open(file_path, "r") as f:
+            return self.add_source(file_path, f.read())
+
+    def get_source(self, file_id: Int) -> Source:
+        return self._sources[file_id]
+
+    def get_file_id(self, file_path: Path) -> Optional[Int]:
+        return self._file_ids_by_path.get(file_path.resolve())
+
+    def _get_file_id_of_source(self, source: Source) -> Int:
+        file_id = source.file_id
+        if file_id is None or self._sources[file_id] is not source:
+            raise ValueError("The source doesn't belong to this source map.")
+        return file_id
+
+    def get_global_offset(self, position: SourcePosition) -> Int:
+        file_id = self._get_file_id_of_source(position.source)
+        return self._base_offsets[file_id] + position.position
+
+    def get_file_id_and_offset(self, global_offset: Int) -> Tuple[Int, Int]:
+        if not 0 <= global_offset < self._next_base_offset:
+            raise IndexError(f"The global offset `{global_offset}` is out of bounds.")
+        file_id = bisect_right(self._base_offsets, global_offset) - 1
+        return file_id, global_offset - self._base_offsets[file_id]
+
+    def get_position(self, global_offset: Int) -> SourcePosition:
+        file_id, offset = self.get_file_id_and_offset(global_offset)
+        return SourcePosition(self._sources[file_id], offset)
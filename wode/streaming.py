@@ -0,0 +1,124 @@
+import codecs
+import re
+
+from wode.ast import Expression
+from wode.errors import WodeError
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.types import BinaryIO, Int, Iterable, Iterator, List, NamedTuple, Str, Tuple
+
+# The characters that can change where a statement ends
+_statement_boundary_pattern = re.compile(r'[;"#()\[\]{}]')
+_OPENING_BRACKETS = "([{"
+_CLOSING_BRACKETS = ")]}"
+
+
+class StreamedStatement(NamedTuple):
+    code: Str
+    # Where the statement starts in the stream
+    line_index: Int
+    column: Int
+
+    def to_source(self) -> Source:
+        return Source(
+            None, self.code, first_line_index=self.line_index, first_column=self.column
+        )
+
+
+def read_chunks(stream: BinaryIO, chunk_size: Int = 65536) -> Iterator[Str]:
+    """Read text from a stream as soon as it arrives, instead of waiting for a whole chunk or the end of the stream."""
+    # `read1` returns whatever is available, streams without it block until a whole chunk is read
+    read = getattr(stream, "read1", stream.read)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        data: bytes = read(chunk_size)
+        if len(data) == 0:
+            final_text: Str = decoder.decode(b"", final=True)
+            if len(final_text) > 0:
+                yield final_text
+            return
+        text: Str = decoder.decode(data)
+        if len(text) > 0:
+            yield text
+
+
+def iter_statements(chunks: Iterable[Str]) -> Iterator[StreamedStatement]:
+    """Split streamed code into statements, yielding each statement as soon as its semicolon arrives.
+
+    Statements end at semicolons outside of strings, comments and brackets, which is where the scanner and parser would end them too.
+    Only the current statement and the unsplit part of the latest chunk are kept in memory.
+    The code after the last semicolon, which might be empty or just whitespace, is yielded as the final statement.
+    """
+    buffer = ""
+    # Where the next statement starts in the buffer, and where to continue searching for its end
+    statement_start = 0
+    search_position = 0
+    depth = 0
+    line_index = 0
+    column = 0
+    for chunk in chunks:
+        # Drop the statements that were already yielded before adding the new text
+        buffer = buffer[statement_start:] + chunk
+        search_position -= statement_start
+        statement_start = 0
+        while True:
+            boundary_match = _statement_boundary_pattern.search(buffer, search_position)
+            if boundary_match is None:
+                search_position = len(buffer)
+                break
+            character = boundary_match.group()
+            position = boundary_match.start()
+            if character == '"' or character == "#":
+                # Skip to the end of the string or comment, or wait for more text if it hasn't arrived yet
+                end_position = buffer.find(
+                    '"' if character == '"' else "\n", position + 1
+                )
+                if end_position == -1:
+                    search_position = position
+                    break
+                search_position = end_position + 1
+            elif character in _OPENING_BRACKETS:
+                depth += 1
+                search_position = position + 1
+            elif character in _CLOSING_BRACKETS:
+                depth = max(depth - 1, 0)
+                search_position = position + 1
+            else:
+                search_position = position + 1
+                if depth == 0:
+                    code = buffer[statement_start:search_position]
+                    yield StreamedStatement(code, line_index, column)
+                    line_index, column = _advance(line_index, column, code)
+                    statement_start = search_position
+    yield StreamedStatement(buffer[statement_start:], line_index, column)
+
+
+def _advance(line_index: Int, column: Int, code: Str) -> Tuple[Int, Int]:
+    # Get the line index and column of the end of some code that started at a line index and column
+    n_line_breaks = code.count("\n")
+    if n_line_breaks == 0:
+        return line_index, column + len(code)
+    return line_index + n_line_breaks, len(code) - code.rfind("\n") - 1
+
+
+class CompiledStatement(NamedTuple):
+    source: Source
+    expressions: List[Expression]
+    scanner_errors: List[WodeError]
+    parser_errors: List[WodeError]
+
+
+def compile_statements(chunks: Iterable[Str]) -> Iterator[CompiledStatement]:
+    """Scan and parse streamed code one statement at a time.
+
+    Like `wode run`, a statement is only parsed if there weren't any scanning errors in it.
+    """
+    for statement in iter_statements(chunks):
+        source = statement.to_source()
+        tokens, scanner_errors = scan_all_tokens(source)
+        if len(scanner_errors) > 0:
+            yield CompiledStatement(source, [], scanner_errors, [])
+            continue
+        expressions, parser_errors = parse_all(ParserState(tokens, source))
+        yield CompiledStatement(source, expressions, [], parser_errors)
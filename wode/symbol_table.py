@@ -0,0 +1,32 @@
+from wode.types import Bool, Dict, Int, List, Optional, Str
+
+
+class SymbolTable:
+    def __init__(self) -> None:
+        self._symbol_ids: Dict[Str, Int] = {}
+        self._names: List[Str] = []
+
+    def intern(self, name: Str) -> Int:
+        # Reuse the existing ID if we've already seen this name
+        symbol_id = self._symbol_ids.get(name)
+        if symbol_id is None:
+            symbol_id = len(self._names)
+            self._symbol_ids[name] = symbol_id
+            self._names.append(name)
+        return symbol_id
+
+    def get_name(self, symbol_id: Int) -> Str:
+        return self._names[symbol_id]
+
+    def get_symbol_id(self, name: Str) -> Optional[Int]:
+        return self._symbol_ids.get(name)
+
+    @property
+    def names(self) -> List[Str]:
+        return self._names
+
+    def __len__(self) -> Int:
+        return len(self._names)
+
+    def __contains__(self, name: Str) -> Bool:
+        return name in self._symbol_ids
@@ -440,10 +440,7 @@ test_cases = [
         ],
         expected_scanner_error_types=[],
         expected_s_expressions=[],
-        expected_parser_error_types=[
-            UnexpectedTokenTypeError,
-            UnexpectedTokenTypeError,
-        ],
+        expected_parser_error_types=[UnexpectedTokenTypeError],
     ),
     WodeTestCase(
         "nested brackets",
@@ -465,8 +462,6 @@ test_cases = [
             UnexpectedTokenTypeError,
             UnexpectedTokenTypeError,
             UnexpectedTokenTypeError,
-            UnexpectedTokenTypeError,
-            UnexpectedTokenTypeError,
         ],
     ),
     WodeTestCase(
@@ -612,7 +607,333 @@ test_cases = [
             ],
         ],
         expected_parser_error_types=[],
-        broken=True,
+    ),
+    WodeTestCase(
+        "nested groups",
+        source="""
+        ((1) * -(2 + (3)));
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.INTEGER, "1"),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.STAR, "*"),
+            SimplifiedToken(TokenType.MINUS, "-"),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.INTEGER, "2"),
+            SimplifiedToken(TokenType.PLUS, "+"),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.INTEGER, "3"),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[
+            [
+                "group",
+                [
+                    "*",
+                    ["group", "1"],
+                    ["-", ["group", ["+", "2", ["group", "3"]]]],
+                ],
+            ],
+        ],
+        expected_parser_error_types=[],
+    ),
+    WodeTestCase(
+        "function calls",
+        source="""
+        foo();
+        bar(1, baz(2) + 3)(4) ^ 5;
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.IDENTIFIER, "foo"),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+            SimplifiedToken(TokenType.IDENTIFIER, "bar"),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.INTEGER, "1"),
+            SimplifiedToken(TokenType.COMMA, ","),
+            SimplifiedToken(TokenType.IDENTIFIER, "baz"),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.INTEGER, "2"),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.PLUS, "+"),
+            SimplifiedToken(TokenType.INTEGER, "3"),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.INTEGER, "4"),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.CARET, "^"),
+            SimplifiedToken(TokenType.INTEGER, "5"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[
+            ["call", "foo"],
+            [
+                "^",
+                ["call", ["call", "bar", "1", ["+", ["call", "baz", "2"], "3"]], "4"],
+                "5",
+            ],
+        ],
+        expected_parser_error_types=[],
+    ),
+    WodeTestCase(
+        "an unclosed bracket",
+        source="""
+        (1 + 2;
+        foo(1, 2
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.INTEGER, "1"),
+            SimplifiedToken(TokenType.PLUS, "+"),
+            SimplifiedToken(TokenType.INTEGER, "2"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+            SimplifiedToken(TokenType.IDENTIFIER, "foo"),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.INTEGER, "1"),
+            SimplifiedToken(TokenType.COMMA, ","),
+            SimplifiedToken(TokenType.INTEGER, "2"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[],
+        expected_parser_error_types=[
+            UnexpectedTokenTypeError,
+            UnexpectedEndOfFileError,
+        ],
+    ),
+    # Statements and blocks
+    WodeTestCase(
+        "let statements",
+        source="""
+        let x = 1;
+        let y = x * -2;
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.LET, "let"),
+            SimplifiedToken(TokenType.IDENTIFIER, "x"),
+            SimplifiedToken(TokenType.EQUAL, "="),
+            SimplifiedToken(TokenType.INTEGER, "1"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+            SimplifiedToken(TokenType.LET, "let"),
+            SimplifiedToken(TokenType.IDENTIFIER, "y"),
+            SimplifiedToken(TokenType.EQUAL, "="),
+            SimplifiedToken(TokenType.IDENTIFIER, "x"),
+            SimplifiedToken(TokenType.STAR, "*"),
+            SimplifiedToken(TokenType.MINUS, "-"),
+            SimplifiedToken(TokenType.INTEGER, "2"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[
+            ["let", "x", "1"],
+            ["let", "y", ["*", "x", ["-", "2"]]],
+        ],
+        expected_parser_error_types=[],
+    ),
+    WodeTestCase(
+        "if, elif and else",
+        source="""
+        if x < 1 { a; } elif x >= 2 { b; } else { c; }
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.IF, "if"),
+            SimplifiedToken(TokenType.IDENTIFIER, "x"),
+            SimplifiedToken(TokenType.LESS, "<"),
+            SimplifiedToken(TokenType.INTEGER, "1"),
+            SimplifiedToken(TokenType.LEFT_CURLY_BRACKET, "{"),
+            SimplifiedToken(TokenType.IDENTIFIER, "a"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+            SimplifiedToken(TokenType.RIGHT_CURLY_BRACKET, "}"),
+            SimplifiedToken(TokenType.ELIF, "elif"),
+            SimplifiedToken(TokenType.IDENTIFIER, "x"),
+            SimplifiedToken(TokenType.GREATER_EQUAL, ">="),
+            SimplifiedToken(TokenType.INTEGER, "2"),
+            SimplifiedToken(TokenType.LEFT_CURLY_BRACKET, "{"),
+            SimplifiedToken(TokenType.IDENTIFIER, "b"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+            SimplifiedToken(TokenType.RIGHT_CURLY_BRACKET, "}"),
+            SimplifiedToken(TokenType.ELSE, "else"),
+            SimplifiedToken(TokenType.LEFT_CURLY_BRACKET, "{"),
+            SimplifiedToken(TokenType.IDENTIFIER, "c"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+            SimplifiedToken(TokenType.RIGHT_CURLY_BRACKET, "}"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[
+            [
+                "if",
+                [["<", "x", "1"], ["block", "a"]],
+                [[">=", "x", "2"], ["block", "b"]],
+                ["else", ["block", "c"]],
+            ]
+        ],
+        expected_parser_error_types=[],
+    ),
+    WodeTestCase(
+        "while and for loops",
+        source="""
+        while !done { step(); }
+        for item in items { yield item; };
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.WHILE, "while"),
+            SimplifiedToken(TokenType.BANG, "!"),
+            SimplifiedToken(TokenType.IDENTIFIER, "done"),
+            SimplifiedToken(TokenType.LEFT_CURLY_BRACKET, "{"),
+            SimplifiedToken(TokenType.IDENTIFIER, "step"),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+            SimplifiedToken(TokenType.RIGHT_CURLY_BRACKET, "}"),
+            SimplifiedToken(TokenType.FOR, "for"),
+            SimplifiedToken(TokenType.IDENTIFIER, "item"),
+            SimplifiedToken(TokenType.IN, "in"),
+            SimplifiedToken(TokenType.IDENTIFIER, "items"),
+            SimplifiedToken(TokenType.LEFT_CURLY_BRACKET, "{"),
+            SimplifiedToken(TokenType.YIELD, "yield"),
+            SimplifiedToken(TokenType.IDENTIFIER, "item"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+            SimplifiedToken(TokenType.RIGHT_CURLY_BRACKET, "}"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[
+            ["while", ["!", "done"], ["block", ["call", "step"]]],
+            ["for", "item", "items", ["block", ["yield", "item"]]],
+        ],
+        expected_parser_error_types=[],
+    ),
+    WodeTestCase(
+        "a match expression",
+        source="""
+        match x {
+            1 => "one",
+            n => { return n; },
+        }
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.MATCH, "match"),
+            SimplifiedToken(TokenType.IDENTIFIER, "x"),
+            SimplifiedToken(TokenType.LEFT_CURLY_BRACKET, "{"),
+            SimplifiedToken(TokenType.INTEGER, "1"),
+            SimplifiedToken(TokenType.DOUBLE_ARROW, "=>"),
+            SimplifiedToken(TokenType.STRING, "one"),
+            SimplifiedToken(TokenType.COMMA, ","),
+            SimplifiedToken(TokenType.IDENTIFIER, "n"),
+            SimplifiedToken(TokenType.DOUBLE_ARROW, "=>"),
+            SimplifiedToken(TokenType.LEFT_CURLY_BRACKET, "{"),
+            SimplifiedToken(TokenType.RETURN, "return"),
+            SimplifiedToken(TokenType.IDENTIFIER, "n"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+            SimplifiedToken(TokenType.RIGHT_CURLY_BRACKET, "}"),
+            SimplifiedToken(TokenType.COMMA, ","),
+            SimplifiedToken(TokenType.RIGHT_CURLY_BRACKET, "}"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[
+            ["match", "x", ["1", '"one"'], ["n", ["block", ["return", "n"]]]]
+        ],
+        expected_parser_error_types=[],
+    ),
+    WodeTestCase(
+        "a struct",
+        source="""
+        struct Point { x: Float, y: Float }
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.STRUCT, "struct"),
+            SimplifiedToken(TokenType.IDENTIFIER, "Point"),
+            SimplifiedToken(TokenType.LEFT_CURLY_BRACKET, "{"),
+            SimplifiedToken(TokenType.IDENTIFIER, "x"),
+            SimplifiedToken(TokenType.COLON, ":"),
+            SimplifiedToken(TokenType.IDENTIFIER, "Float"),
+            SimplifiedToken(TokenType.COMMA, ","),
+            SimplifiedToken(TokenType.IDENTIFIER, "y"),
+            SimplifiedToken(TokenType.COLON, ":"),
+            SimplifiedToken(TokenType.IDENTIFIER, "Float"),
+            SimplifiedToken(TokenType.RIGHT_CURLY_BRACKET, "}"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[["struct", "Point", ["x", "Float"], ["y", "Float"]]],
+        expected_parser_error_types=[],
+    ),
+    WodeTestCase(
+        "functions",
+        source="""
+        let add = (a, b) -> a + b;
+        () -> nothing;
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.LET, "let"),
+            SimplifiedToken(TokenType.IDENTIFIER, "add"),
+            SimplifiedToken(TokenType.EQUAL, "="),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.IDENTIFIER, "a"),
+            SimplifiedToken(TokenType.COMMA, ","),
+            SimplifiedToken(TokenType.IDENTIFIER, "b"),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.SINGLE_ARROW, "->"),
+            SimplifiedToken(TokenType.IDENTIFIER, "a"),
+            SimplifiedToken(TokenType.PLUS, "+"),
+            SimplifiedToken(TokenType.IDENTIFIER, "b"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+            SimplifiedToken(TokenType.LEFT_BRACKET, "("),
+            SimplifiedToken(TokenType.RIGHT_BRACKET, ")"),
+            SimplifiedToken(TokenType.SINGLE_ARROW, "->"),
+            SimplifiedToken(TokenType.NOTHING, "nothing"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[
+            ["let", "add", ["->", ["a", "b"], ["+", "a", "b"]]],
+            ["->", [], "nothing"],
+        ],
+        expected_parser_error_types=[],
+    ),
+    WodeTestCase(
+        "a match arm without an arrow",
+        source="""
+        match x { 1 2 };
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.MATCH, "match"),
+            SimplifiedToken(TokenType.IDENTIFIER, "x"),
+            SimplifiedToken(TokenType.LEFT_CURLY_BRACKET, "{"),
+            SimplifiedToken(TokenType.INTEGER, "1"),
+            SimplifiedToken(TokenType.INTEGER, "2"),
+            SimplifiedToken(TokenType.RIGHT_CURLY_BRACKET, "}"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[],
+        expected_parser_error_types=[
+            UnexpectedTokenTypeError,
+            UnexpectedTokenTypeError,
+            UnexpectedEndOfExpressionError,
+        ],
+    ),
+    WodeTestCase(
+        "an unclosed block",
+        source="""
+        while true { 1;
+        """,
+        expected_tokens=[
+            SimplifiedToken(TokenType.WHILE, "while"),
+            SimplifiedToken(TokenType.TRUE, "true"),
+            SimplifiedToken(TokenType.LEFT_CURLY_BRACKET, "{"),
+            SimplifiedToken(TokenType.INTEGER, "1"),
+            SimplifiedToken(TokenType.SEMICOLON, ";"),
+        ],
+        expected_scanner_error_types=[],
+        expected_s_expressions=[],
+        expected_parser_error_types=[UnexpectedEndOfFileError],
     ),
     # Erroring
     WodeTestCase(
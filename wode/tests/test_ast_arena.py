@@ -0,0 +1,64 @@
+import pytest
+
+from wode.ast import BinaryExpression, LiteralExpression
+from wode.ast_arena import AstArena
+from wode.ast_to_s_expression import convert_to_s_expression
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.tests.conftest import test_cases
+from wode.token_stream import TokenStream
+
+
+@pytest.mark.parametrize(
+    "source",
+    [pytest.param(tc.source, id=tc.test_case_id) for tc in test_cases],
+)
+def test_arena_round_trips_test_cases(source: Source) -> None:
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source))
+
+    arena = AstArena.from_expressions(source, tokens, expressions)
+    assert len(arena.roots) == len(expressions)
+
+    # Convert back using the original tokens
+    assert [convert_to_s_expression(e) for e in arena.to_expressions(tokens)] == [
+        convert_to_s_expression(e) for e in expressions
+    ]
+    # Convert back using tokens materialised from the token stream
+    assert [convert_to_s_expression(e) for e in arena.to_expressions()] == [
+        convert_to_s_expression(e) for e in expressions
+    ]
+
+
+def test_token_stream_round_trips_tokens() -> None:
+    source = Source(None, 'foo + "bar" * 1.5;')
+    tokens, _ = scan_all_tokens(source)
+    token_stream = TokenStream.from_tokens(source, tokens)
+    assert len(token_stream) == len(tokens)
+    assert [
+        (t.token_type, t.lexeme, t.symbol_id) for t in token_stream.to_tokens()
+    ] == [(t.token_type, t.lexeme, t.symbol_id) for t in tokens]
+
+
+def test_arena_traverses_in_preorder() -> None:
+    source = Source(None, "1 + 2 * 3;")
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source))
+    arena = AstArena.from_expressions(source, tokens, expressions)
+
+    node_types = [arena.get_node_type(i) for i in arena.iter_preorder(arena.roots[0])]
+    assert node_types == [
+        BinaryExpression,
+        LiteralExpression,
+        BinaryExpression,
+        LiteralExpression,
+        LiteralExpression,
+    ]
+
+
+def test_ast_nodes_have_no_instance_dictionary() -> None:
+    source = Source(None, "1;")
+    tokens, _ = scan_all_tokens(source)
+    (expression,), _ = parse_all(ParserState(tokens, source))
+    assert not hasattr(expression, "__dict__")
@@ -0,0 +1,72 @@
+import mmap
+from pathlib import Path
+
+import pytest
+
+from wode.ast_serialization import (
+    AstFormatError,
+    dump_ast,
+    dump_expressions,
+    load_ast,
+    load_expressions,
+)
+from wode.ast_to_s_expression import convert_to_s_expression
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.tests.conftest import test_cases
+
+
+@pytest.mark.parametrize(
+    "source",
+    [pytest.param(tc.source, id=tc.test_case_id) for tc in test_cases],
+)
+def test_serialisation_round_trips_test_cases(source: Source) -> None:
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source))
+
+    loaded_source, loaded_tokens, loaded_expressions = load_expressions(
+        dump_expressions(source, tokens, expressions)
+    )
+
+    assert loaded_source.code == source.code
+    assert [
+        (t.token_type, t.lexeme, t.source_range.start.position) for t in loaded_tokens
+    ] == [(t.token_type, t.lexeme, t.source_range.start.position) for t in tokens]
+    assert [convert_to_s_expression(e) for e in loaded_expressions] == [
+        convert_to_s_expression(e) for e in expressions
+    ]
+
+
+def test_serialisation_can_be_loaded_from_a_memory_map(tmp_path: Path) -> None:
+    source = Source(Path("example.wode"), "foo + 1 * bar;\n-2;\n")
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source))
+    cache_path = tmp_path / "example.wast"
+    cache_path.write_bytes(dump_expressions(source, tokens, expressions))
+
+    with open(cache_path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as memory_map:
+        arena = load_ast(memory_map)
+        assert arena.token_stream.source.file_path == Path("example.wode")
+        assert [convert_to_s_expression(e) for e in arena.to_expressions()] == [
+            ["+", "foo", ["*", "1", "bar"]],
+            ["-", "2"],
+        ]
+        # Re-serialising a loaded arena gives the same bytes
+        assert dump_ast(arena) == cache_path.read_bytes()
+        del arena
+
+
+def test_loading_rejects_invalid_buffers() -> None:
+    with pytest.raises(AstFormatError):
+        load_ast(b"")
+    with pytest.raises(AstFormatError):
+        load_ast(b"\0" * 100)
+
+    source = Source(None, "1;")
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source))
+    with pytest.raises(AstFormatError):
+        load_ast(dump_expressions(source, tokens, expressions)[:-4])
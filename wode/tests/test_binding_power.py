@@ -1,6 +1,10 @@
 import pytest
 
-from wode.binding_power import get_infix_binding_power, get_prefix_binding_power
+from wode.binding_power import (
+    get_infix_binding_power,
+    get_postfix_binding_power,
+    get_prefix_binding_power,
+)
 from wode.token_type import TokenType
 from wode.types import Float
 
@@ -25,3 +29,14 @@ def test_get_prefix_binding_power_gets_binding_power():
 def test_get_prefix_binding_power_errors_for_invalid_tokens():
     with pytest.raises(ValueError):
         get_prefix_binding_power(TokenType.COMMENT)
+
+
+def test_get_postfix_binding_power_gets_binding_power():
+    left, right = get_postfix_binding_power(TokenType.LEFT_BRACKET)
+    assert isinstance(left, Float)
+    assert right is None
+
+
+def test_get_postfix_binding_power_errors_for_invalid_tokens():
+    with pytest.raises(ValueError):
+        get_postfix_binding_power(TokenType.PLUS)
@@ -1,5 +1,10 @@
+import sys
+from pathlib import Path
+
 import pytest
+from typer.testing import CliRunner
 
+from wode import cli
 from wode.ast import (
     BinaryExpression,
     Expression,
@@ -7,7 +12,11 @@ from wode.ast import (
     LiteralExpression,
     UnaryExpression,
 )
-from wode.ast_to_s_expression import convert_to_s_expression
+from wode.ast_to_s_expression import (
+    SExpression,
+    convert_to_s_expression,
+    format_s_expression,
+)
 from wode.source import Source, SourcePosition, SourceRange
 from wode.token import Token
 from wode.token_type import TokenType
@@ -76,3 +85,40 @@ def test_converter_converts_expressions_to_s_expressions_correctly(
     expression: Expression, expected_s_expression: Str
 ):
     assert convert_to_s_expression(expression) == expected_s_expression
+
+
+@pytest.mark.parametrize(
+    "s_expression",
+    [
+        "1",
+        '"a string"',
+        [],
+        ["->", [], "nothing"],
+        ["if", [["<", "x", "1"], ["block", "a"]], ["else", ["block"]]],
+    ],
+)
+def test_s_expressions_are_formatted_like_repr(s_expression: SExpression):
+    assert format_s_expression(s_expression) == repr(s_expression)
+
+
+@pytest.mark.parametrize(
+    ["opening", "operand", "closing", "expected_opening"],
+    [
+        pytest.param("(", "1", ")", "['group', ", id="groups"),
+        pytest.param("", "f", "()", "['call', ", id="calls"),
+        pytest.param("!", "x", "", "['!', ", id="unary operators"),
+        pytest.param("{", "1;", "}", "['block', ", id="blocks"),
+    ],
+)
+def test_run_prints_deeply_nested_code(
+    tmp_path: Path, opening: Str, operand: Str, closing: Str, expected_opening: Str
+):
+    depth = 2 * sys.getrecursionlimit()
+    file_path = tmp_path / "deep.wode"
+    file_path.write_text(opening * depth + operand + closing * depth + ";")
+    result = CliRunner(mix_stderr=False).invoke(cli, ["run", str(file_path)])
+    assert result.exit_code == 0, result.stderr
+    innermost = repr(operand.rstrip(";"))
+    assert result.stdout == (
+        "Parsed AST:\n" + expected_opening * depth + innermost + "]" * depth + "\n"
+    )
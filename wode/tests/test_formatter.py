@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from wode import cli
+from wode.formatter import FormatCache, format_files, format_source
+from wode.source import Source
+from wode.tests.conftest import test_cases
+from wode.tracing import MetricsAggregator, observing
+from wode.types import Str
+
+
+@pytest.mark.parametrize(
+    "source",
+    [pytest.param(tc.source, id=tc.test_case_id) for tc in test_cases],
+)
+def test_formatting_is_idempotent(source: Source) -> None:
+    formatted_code, errors = format_source(source)
+    if formatted_code is None:
+        assert len(errors) > 0
+        return
+    assert format_source(Source(None, formatted_code)) == (formatted_code, [])
+
+
+def test_formatting_keeps_comments():
+    formatted_code, _ = format_source(
+        Source(None, "# Head\n\n\n1+2;  # Trailing\n-x *3 ;foo;\n1 + # Middle\n2;")
+    )
+    assert formatted_code == (
+        "# Head\n\n1 + 2; # Trailing\n-x * 3;\nfoo;\n1 + # Middle\n    2;\n"
+    )
+
+
+def test_formatting_brackets():
+    formatted_code, _ = format_source(
+        Source(None, "foo ( 1,2 ,-( x+3 ) ) ( ) *(bar)(4);")
+    )
+    assert formatted_code == "foo(1, 2, -(x + 3))() * (bar)(4);\n"
+
+
+def test_formatting_blocks():
+    formatted_code, _ = format_source(
+        Source(
+            None,
+            "if x { while y { f(); } } else {}\n"
+            "let z = match x { 1 => !y, _ => { 2; } };\n"
+            "struct Point { x: Int, y: Int }",
+        )
+    )
+    assert formatted_code == (
+        "if x {\n"
+        "    while y {\n"
+        "        f();\n"
+        "    }\n"
+        "} else {}\n"
+        "let z = match x {\n"
+        "    1 => !y,\n"
+        "    _ => {\n"
+        "        2;\n"
+        "    }\n"
+        "};\n"
+        "struct Point {\n"
+        "    x: Int,\n"
+        "    y: Int\n"
+        "}\n"
+    )
+
+
+def test_unchanged_files_are_skipped(tmp_path: Path):
+    file_path = tmp_path / "example.wode"
+    file_path.write_text("1+2;")
+    cache = FormatCache(tmp_path / "cache.json")
+    (result,) = format_files([file_path], check=False, cache=cache)
+    assert result.is_changed
+    assert file_path.read_text() == "1 + 2;\n"
+    cache.save()
+
+    with observing(MetricsAggregator()) as metrics:
+        cache = FormatCache(tmp_path / "cache.json")
+        assert list(format_files([file_path], check=False, cache=cache)) == []
+    assert metrics.snapshot()["cache_hits"] == {"fmt": 1}
+
+
+def test_fmt_command_checks_files(tmp_path: Path):
+    formatted_file_path = tmp_path / "formatted.wode"
+    formatted_file_path.write_text("1 + 2;\n")
+    unformatted_file_path = tmp_path / "unformatted.wode"
+    unformatted_file_path.write_text("1+2;")
+    broken_file_path = tmp_path / "broken.wode"
+    broken_file_path.write_text("1 +;")
+    arguments = ["fmt", "--workers=0", "--no-cache", "--check"]
+
+    result = CliRunner(mix_stderr=False).invoke(
+        cli, arguments + [Str(formatted_file_path)]
+    )
+    assert result.exit_code == 0, result.output
+
+    result = CliRunner(mix_stderr=False).invoke(
+        cli, arguments + [Str(unformatted_file_path), Str(broken_file_path)]
+    )
+    assert result.exit_code == 1
+    assert f"Would reformat {unformatted_file_path}" in result.stdout
+    assert "UnexpectedEndOfExpression" not in result.stdout
+    assert f"Couldn't format {broken_file_path}" in result.stderr
+    assert unformatted_file_path.read_text() == "1+2;"
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from wode.errors import WodeError
+from wode.fuzzing import (
+    SCANNER_BACKENDS,
+    ProgramGenerator,
+    compare_backends,
+    register_scanner_backend,
+    run_differential_fuzzing,
+    run_timing_fuzzing,
+)
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.timing import estimate_growth_exponent
+from wode.token import Token
+from wode.types import List, Tuple
+
+
+def test_generated_programs_are_reproducible():
+    programs = [ProgramGenerator(random.Random(1)).get_program(5) for _ in range(2)]
+    assert programs[0] == programs[1]
+    # Without mistakes, every program should scan and parse without errors
+    for seed in range(20):
+        code = ProgramGenerator(random.Random(seed), error_rate=0).get_program(3)
+        _, errors = scan_all_tokens(Source(None, code))
+        assert errors == [], code
+
+
+def test_generated_programs_without_mistakes_parse():
+    for seed in range(100):
+        code = ProgramGenerator(random.Random(seed), error_rate=0.0).get_program(5)
+        source = Source(None, code)
+        tokens, _ = scan_all_tokens(source)
+        _, errors = parse_all(ParserState(tokens, source))
+        assert errors == [], code
+
+
+def test_backends_agree_on_random_programs():
+    divergences = run_differential_fuzzing(seed=0, n_programs=30)
+    assert divergences == [], "\n".join(str(d) for d in divergences)
+
+
+def test_divergent_backends_are_reported(monkeypatch: pytest.MonkeyPatch):
+    def drop_last_token(source: Source) -> Tuple[List[Token], List[WodeError]]:
+        tokens, errors = scan_all_tokens(source)
+        return tokens[:-1], errors
+
+    monkeypatch.setattr("wode.fuzzing.SCANNER_BACKENDS", dict(SCANNER_BACKENDS))
+    register_scanner_backend("broken", drop_last_token)
+    (divergence,) = compare_backends("1 + 2;")
+    assert divergence.backend == "scanner:broken"
+
+
+def test_growth_exponent_is_estimated():
+    assert estimate_growth_exponent([10, 20, 40], [1, 2, 4]) == pytest.approx(1)
+    assert estimate_growth_exponent([10, 20, 40], [1, 4, 16]) == pytest.approx(2)
+    with pytest.raises(ValueError):
+        estimate_growth_exponent([10], [1])
+
+
+def test_timing_fuzzing_measures_each_shape():
+    measurements, flagged = run_timing_fuzzing(
+        seed=0,
+        sizes=[5, 10, 20],
+        repeat=1,
+        shapes=["nested prefix operators"],
+        max_growth_exponent=100,
+    )
+    assert [m.name for m in measurements] == [
+        "scan nested prefix operators",
+        "scan and parse nested prefix operators",
+    ]
+    assert flagged == []
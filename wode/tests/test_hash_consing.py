@@ -0,0 +1,117 @@
+import pytest
+
+from wode.ast import BinaryExpression, HashConsed, SharedBinaryExpression
+from wode.ast_arena import AstArena
+from wode.ast_to_s_expression import (
+    convert_all_to_s_expressions,
+    convert_to_s_expression,
+)
+from wode.hash_consing import AstInterner
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.tests.conftest import test_cases
+from wode.tracing import Observer, add_observer, remove_observer
+from wode.types import Bool, List, Str
+
+
+def _parse_hash_consed(code: Str):
+    source = Source(None, code)
+    tokens, _ = scan_all_tokens(source)
+    interner = AstInterner()
+    expressions, errors = parse_all(ParserState(tokens, source, interner=interner))
+    return source, tokens, expressions, errors, interner
+
+
+@pytest.mark.parametrize(
+    "source",
+    [pytest.param(tc.source, id=tc.test_case_id) for tc in test_cases],
+)
+def test_hash_consing_matches_plain_parse(source: Source) -> None:
+    tokens, _ = scan_all_tokens(source)
+    expressions, errors = parse_all(ParserState(tokens, source))
+    shared_expressions, shared_errors = parse_all(
+        ParserState(tokens, source, interner=AstInterner())
+    )
+    assert convert_all_to_s_expressions(
+        shared_expressions
+    ) == convert_all_to_s_expressions(expressions)
+    assert [type(e) for e in shared_errors] == [type(e) for e in errors]
+
+
+def test_identical_subtrees_are_shared() -> None:
+    _, _, expressions, _, interner = _parse_hash_consed(
+        "1 + foo * 2; -3; 1 + foo * 2; bar - foo * 2; -3;"
+    )
+    first, negative_three, second, third, fourth = expressions
+    assert first is second
+    assert negative_three is fourth
+    # The shared right hand side of the subtraction
+    assert isinstance(first, BinaryExpression)
+    assert isinstance(third, SharedBinaryExpression)
+    assert third.right is first.right
+    # 1, foo, 2, foo * 2, 1 + foo * 2, 3, -3, bar and bar - foo * 2
+    assert len(interner) == 9
+
+
+def test_different_subtrees_are_not_shared() -> None:
+    _, _, expressions, _, _ = _parse_hash_consed('1 + 2; 1 - 2; 1.0 + 2; "1" + 2;')
+    assert len({id(e) for e in expressions}) == 4
+    assert len(set(expressions)) == 4
+
+
+def test_equality_and_hashing() -> None:
+    _, _, expressions, _, _ = _parse_hash_consed("1 + 2; 1 + 2; 2 + 1;")
+    first, second, third = expressions
+    assert isinstance(first, HashConsed)
+    assert first == second
+    assert first != third
+    assert hash(first) == hash(second)
+    assert len(set(expressions)) == 2
+
+
+def test_shared_nodes_keep_the_first_tokens() -> None:
+    _, _, expressions, _, _ = _parse_hash_consed("1 + 2;\n1 + 2;")
+    assert isinstance(expressions[1], BinaryExpression)
+    assert expressions[1].operator.source_range.start.position == 2
+
+
+def test_s_expressions_are_converted_once_per_subtree() -> None:
+    _, _, expressions, _, _ = _parse_hash_consed("1 + 2 * 3; 1 + 2 * 3;")
+    s_expressions = convert_all_to_s_expressions(expressions)
+    assert s_expressions == [["+", "1", ["*", "2", "3"]]] * 2
+    assert s_expressions[0] is s_expressions[1]
+    # Without a memo, every occurrence is converted
+    assert convert_to_s_expression(expressions[0]) is not s_expressions[0]
+
+
+def test_arena_stores_shared_subtrees_once() -> None:
+    source, tokens, expressions, _, _ = _parse_hash_consed("foo * 2 + foo * 2;")
+    arena = AstArena.from_expressions(source, tokens, expressions)
+    # foo, 2, foo * 2 and the addition
+    assert len(arena) == 4
+    (rebuilt,) = arena.to_expressions(tokens)
+    assert isinstance(rebuilt, BinaryExpression)
+    assert convert_to_s_expression(rebuilt) == [
+        "+",
+        ["*", "foo", "2"],
+        ["*", "foo", "2"],
+    ]
+    assert rebuilt.left is rebuilt.right
+
+
+def test_cache_lookups_are_traced() -> None:
+    lookups: List[Bool] = []
+
+    class LookupObserver(Observer):
+        def on_cache_lookup(self, cache_name: Str, hit: Bool) -> None:
+            if cache_name == "hash_consing":
+                lookups.append(hit)
+
+    observer = LookupObserver()
+    add_observer(observer)
+    try:
+        _parse_hash_consed("1 + 1;")
+    finally:
+        remove_observer(observer)
+    assert lookups == [False, True, False]
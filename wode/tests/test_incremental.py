@@ -0,0 +1,52 @@
+import random
+
+from wode.incremental import IncrementalScanner
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.token_type import TokenType
+from wode.types import Any, List, Tuple
+
+# Fragments that are likely to start, end or split tokens when they're inserted
+FRAGMENTS = list('ab1.2 \n#"+-=<>;()') + ["let", "...", "if", "->"]
+
+
+def get_random_code(rng: random.Random, n_fragments: int) -> str:
+    return "".join(rng.choice(FRAGMENTS) for _ in range(n_fragments))
+
+
+def summarise(tokens: List[Any], errors: List[Any]) -> Tuple[Any, Any]:
+    return (
+        [(t.token_type, t.lexeme, t.source_range.start.position) for t in tokens],
+        [
+            (type(e), e.source_range.start.position, e.source_range.end.position)
+            for e in errors
+        ],
+    )
+
+
+def test_incremental_scanning_matches_a_full_scan():
+    rng = random.Random(0)
+    for _ in range(30):
+        scanner = IncrementalScanner(get_random_code(rng, 20))
+        for _ in range(5):
+            code = scanner.source.code
+            start = rng.randint(0, len(code))
+            end = rng.randint(start, min(len(code), start + 5))
+            scanner.apply_edit(start, end, get_random_code(rng, rng.randint(0, 3)))
+            expected_tokens, expected_errors = scan_all_tokens(
+                Source(None, scanner.source.code)
+            )
+            assert summarise(scanner.tokens, scanner.errors) == summarise(
+                expected_tokens, expected_errors
+            ), scanner.source.code
+
+
+def test_incremental_scanning_only_rescans_near_the_edit():
+    scanner = IncrementalScanner("let x = 1;\n" * 100)
+    n_steps = len(scanner.steps)
+    assert scanner.apply_edit(499, 500, "yy") < 5
+    assert len(scanner.steps) == n_steps
+    # Opening a string changes the meaning of everything after it
+    scanner.apply_edit(0, 0, '"')
+    assert [t.token_type for t in scanner.tokens] == [TokenType.EOF]
+    assert [e.error_type for e in scanner.errors] == ["UnexpectedEndOfFileError"]
@@ -0,0 +1,228 @@
+import io
+import json
+
+from wode.language_server import (
+    CONTENT_MODIFIED,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    LOG_MESSAGE_ERROR,
+    PARSE_ERROR,
+    REQUEST_CANCELLED,
+    LanguageServer,
+    read_message,
+    write_message,
+)
+from wode.scanner import scan_all_tokens
+from wode.semantic_tokens import SEMANTIC_TOKEN_TYPES, encode_semantic_tokens
+from wode.source import Source
+from wode.types import Any, Dict, List
+
+URI = "file:///example.wode"
+
+
+def read_all_messages(stream: io.BytesIO) -> List[Dict[str, Any]]:
+    stream.seek(0)
+    messages: List[Dict[str, Any]] = []
+    while (message := read_message(stream)) is not None:
+        messages.append(message)
+    return messages
+
+
+def did_change(version: int, start: Any, end: Any, text: str) -> Dict[str, Any]:
+    return {
+        "method": "textDocument/didChange",
+        "params": {
+            "textDocument": {"uri": URI, "version": version},
+            "contentChanges": [{"range": {"start": start, "end": end}, "text": text}],
+        },
+    }
+
+
+def test_semantic_tokens_are_delta_encoded():
+    source = Source(None, 'let x = "a\nb"; # c\n1.5')
+    tokens, _ = scan_all_tokens(source)
+    data = encode_semantic_tokens(source, tokens)
+    rows = [data[i : i + 5] for i in range(0, len(data), 5)]
+    types = [SEMANTIC_TOKEN_TYPES[row[3]] for row in rows]
+    assert types == ["keyword", "variable", "operator", "string", "string", "number"]
+    # The string is split at the line break and includes its quotation marks
+    assert rows[3] == [0, 2, 2, SEMANTIC_TOKEN_TYPES.index("string"), 0]
+    assert rows[4] == [1, 0, 2, SEMANTIC_TOKEN_TYPES.index("string"), 0]
+    assert rows[5] == [1, 0, 3, SEMANTIC_TOKEN_TYPES.index("number"), 0]
+    assert encode_semantic_tokens(source, tokens, (2, 3)) == [2, 0, 3, 1, 0]
+
+
+def test_language_server_session():
+    messages: List[Dict[str, Any]] = [
+        {
+            "id": 1,
+            "method": "initialize",
+            "params": {"capabilities": {"general": {"positionEncodings": ["utf-32"]}}},
+        },
+        {"method": "initialized", "params": {}},
+        {
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {"uri": URI, "version": 1, "text": "1 + 2;\n3 +;"}
+            },
+        },
+        did_change(2, {"line": 1, "character": 3}, {"line": 1, "character": 3}, " 4"),
+        {
+            "id": 2,
+            "method": "textDocument/semanticTokens/full",
+            "params": {"textDocument": {"uri": URI}},
+        },
+        {"id": 3, "method": "shutdown"},
+        {"method": "exit"},
+    ]
+    input_stream = io.BytesIO()
+    for message in messages:
+        write_message(input_stream, {"jsonrpc": "2.0", **message})
+    input_stream.seek(0)
+    output_stream = io.BytesIO()
+    server = LanguageServer(input_stream, output_stream)
+    server.run()
+    assert server.is_shut_down
+
+    messages = read_all_messages(output_stream)
+    responses = {m["id"]: m for m in messages if "id" in m}
+    assert responses[1]["result"]["capabilities"]["positionEncoding"] == "utf-32"
+    assert len(responses[2]["result"]["data"]) == 5 * 6
+    assert responses[3]["result"] is None
+    diagnostics = [
+        m["params"]["diagnostics"]
+        for m in messages
+        if m.get("method") == "textDocument/publishDiagnostics"
+    ]
+    # The last version of the document has no errors
+    assert diagnostics[-1] == []
+    assert server.documents[URI].source.code == "1 + 2;\n3 + 4;"
+
+
+def test_language_server_skips_cancelled_and_stale_requests():
+    output_stream = io.BytesIO()
+    server = LanguageServer(io.BytesIO(), output_stream)
+    open_document = {
+        "method": "textDocument/didOpen",
+        "params": {"textDocument": {"uri": URI, "version": 1, "text": "1;"}},
+    }
+    semantic_tokens_request = {
+        "method": "textDocument/semanticTokens/full",
+        "params": {"textDocument": {"uri": URI}},
+    }
+    server.handle_batch(
+        [
+            open_document,
+            {"id": 1, **semantic_tokens_request},
+            {"id": 2, **semantic_tokens_request},
+            {"method": "$/cancelRequest", "params": {"id": 1}},
+            did_change(
+                2, {"line": 0, "character": 1}, {"line": 0, "character": 1}, " +"
+            ),
+            {"id": 3, **semantic_tokens_request},
+        ]
+    )
+    messages = read_all_messages(output_stream)
+    responses = {m["id"]: m for m in messages if "id" in m}
+    assert responses[1]["error"]["code"] == REQUEST_CANCELLED
+    assert responses[2]["error"]["code"] == CONTENT_MODIFIED
+    assert "result" in responses[3]
+    # Diagnostics are only published for the final version of the document
+    diagnostics = [
+        m["params"]
+        for m in messages
+        if m.get("method") == "textDocument/publishDiagnostics"
+    ]
+    assert len(diagnostics) == 1
+    assert diagnostics[0]["version"] == 2
+    assert [d["code"] for d in diagnostics[0]["diagnostics"]] == [
+        "UnexpectedEndOfExpressionError"
+    ]
+    assert json.dumps(diagnostics)
+
+
+def test_language_server_answers_malformed_messages_with_errors():
+    output_stream = io.BytesIO()
+    server = LanguageServer(io.BytesIO(), output_stream)
+    server.handle_batch(
+        [
+            {
+                "method": "textDocument/didOpen",
+                "params": {"textDocument": {"uri": URI, "version": 1, "text": "1;"}},
+            },
+            # Missing params
+            {"method": "textDocument/didChange"},
+            {"id": 1, "method": "textDocument/semanticTokens/range", "params": {}},
+            # An edit that ends before it starts
+            did_change(
+                2, {"line": 0, "character": 2}, {"line": 0, "character": 0}, "2"
+            ),
+            {
+                "id": 2,
+                "method": "textDocument/semanticTokens/full",
+                "params": {"textDocument": {"uri": URI}},
+            },
+        ]
+    )
+    messages = read_all_messages(output_stream)
+    # Only the request is answered, the notifications' failures are logged
+    errors = [m for m in messages if "error" in m]
+    assert [(m["id"], m["error"]["code"]) for m in errors] == [(1, INVALID_PARAMS)]
+    logged = [m["params"] for m in messages if m.get("method") == "window/logMessage"]
+    assert [m["type"] for m in logged] == [LOG_MESSAGE_ERROR] * 2
+    assert "textDocument/didChange" in logged[0]["message"]
+    assert "out of bounds" in logged[1]["message"]
+    # The server carries on with the next message, and the bad edit didn't change the document
+    assert [m["id"] for m in messages if "result" in m] == [2]
+    assert server.documents[URI].source.code == "1;"
+
+
+def test_language_server_answers_unreadable_messages_with_parse_errors():
+    shutdown = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "shutdown"}).encode()
+    exit_ = json.dumps({"jsonrpc": "2.0", "method": "exit"}).encode()
+    input_stream = io.BytesIO(
+        b"Content-Length: 5\r\n\r\n{oops"
+        + b"Content-Length: 2\r\n\r\n\xff\xfe"
+        + b"Content-Type: application/json\r\n\r\n"
+        + b"Content-Length: many\r\n\r\n"
+        + f"Content-Length: {len(shutdown)}\r\n\r\n".encode()
+        + shutdown
+        + f"Content-Length: {len(exit_)}\r\n\r\n".encode()
+        + exit_
+    )
+    output_stream = io.BytesIO()
+    server = LanguageServer(input_stream, output_stream)
+    server.run()
+    assert server.is_shut_down
+
+    messages = read_all_messages(output_stream)
+    errors = [m for m in messages if "error" in m]
+    assert [(m["id"], m["error"]["code"]) for m in errors] == [(None, PARSE_ERROR)] * 4
+    assert "Content-Length" in errors[2]["error"]["message"]
+    assert "many" in errors[3]["error"]["message"]
+    assert [m["id"] for m in messages if "result" in m] == [1]
+
+
+def test_language_server_answers_messages_that_are_not_objects():
+    input_stream = io.BytesIO(b"Content-Length: 5\r\n\r\n[1,2]")
+    input_stream.seek(0, io.SEEK_END)
+    for message in [
+        {"method": "$/cancelRequest", "params": None},
+        {"id": 1, "method": "textDocument/semanticTokens/full", "params": [URI]},
+        {"id": 2, "method": "shutdown"},
+        {"method": "exit"},
+    ]:
+        write_message(input_stream, {"jsonrpc": "2.0", **message})
+    input_stream.seek(0)
+    output_stream = io.BytesIO()
+    server = LanguageServer(input_stream, output_stream)
+    server.run()
+    assert server.is_shut_down
+
+    messages = read_all_messages(output_stream)
+    errors = [m for m in messages if "error" in m]
+    assert [(m["id"], m["error"]["code"]) for m in errors] == [
+        (None, INVALID_REQUEST),
+        (1, INVALID_PARAMS),
+    ]
+    assert [m["id"] for m in messages if "result" in m] == [2]
@@ -0,0 +1,96 @@
+import pytest
+
+from wode.ast_to_s_expression import convert_to_s_expression
+from wode.errors import WodeError
+from wode.parallel_parser import (
+    parse_all_in_chunks,
+    parse_all_in_parallel,
+    split_statements,
+)
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.tests.conftest import test_cases
+from wode.token_stream import TOKEN_TYPE_CODES
+from wode.token_type import TokenType
+from wode.types import Any, List, Str, Tuple
+
+
+def summarise(errors: List[WodeError]) -> List[Tuple[Any, ...]]:
+    return [
+        (type(e), e.source_range.start.position, e.source_range.end.position)
+        for e in errors
+    ]
+
+
+def assert_same_as_parse_all(source: Source, workers: int) -> None:
+    tokens, _ = scan_all_tokens(source)
+    expressions, errors = parse_all(ParserState(tokens, source))
+    # Split after every statement to test the merging as much as possible
+    parallel_expressions, parallel_errors = parse_all_in_chunks(
+        source, tokens, workers, min_chunk_size=1
+    )
+    assert [convert_to_s_expression(e) for e in parallel_expressions] == [
+        convert_to_s_expression(e) for e in expressions
+    ]
+    assert summarise(parallel_errors) == summarise(errors)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [pytest.param(tc.source, id=tc.test_case_id) for tc in test_cases],
+)
+def test_chunked_parsing_matches_parse_all(source: Source) -> None:
+    assert_same_as_parse_all(source, workers=0)
+
+
+@pytest.mark.timeout(60)
+def test_parallel_parsing_matches_parse_all():
+    # Errors in the middle of a statement mustn't change where the next chunk starts
+    code = "\n".join(["1 + 2;", "1 2 3;", "-;", "foo * bar;", "1 +;", "2"] * 20)
+    assert_same_as_parse_all(Source(None, code), workers=2)
+
+
+def test_statements_are_only_split_outside_brackets():
+    token_types = [
+        TokenType.INTEGER,
+        TokenType.SEMICOLON,
+        TokenType.LEFT_CURLY_BRACKET,
+        TokenType.INTEGER,
+        TokenType.SEMICOLON,
+        TokenType.RIGHT_CURLY_BRACKET,
+        TokenType.SEMICOLON,
+        TokenType.EOF,
+    ]
+    codes = [TOKEN_TYPE_CODES[t] for t in token_types]
+    assert split_statements(codes, 1) == [(0, 2), (2, 7), (7, 8)]
+    assert split_statements(codes, 3) == [(0, 7), (7, 8)]
+    assert split_statements([], 1) == [(0, 0)]
+
+
+def test_errors_can_be_parsed_without_expressions():
+    source = Source(None, "1 + 2;\n3 +;\n4;")
+    tokens, _ = scan_all_tokens(source)
+    for parse in [parse_all_in_chunks, parse_all_in_parallel]:
+        expressions, errors = parse(
+            source, tokens, 0, min_chunk_size=1, include_expressions=False
+        )
+        assert expressions == []
+        assert [Str(e.source_range.start) for e in errors] == ["2:3"]
+
+
+def test_small_inputs_are_parsed_in_this_process(monkeypatch: pytest.MonkeyPatch):
+    # Starting a pool for a single chunk would be slower than parsing it
+    def fail(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("A pool shouldn't have been started.")
+
+    monkeypatch.setattr("wode.parallel_parser.ProcessPoolExecutor", fail)
+    source = Source(None, "1 + 2;\n3 +;\n4;")
+    tokens, _ = scan_all_tokens(source)
+    for workers in [0, 1, 8]:
+        expressions, errors = parse_all_in_parallel(source, tokens, workers)
+        assert [convert_to_s_expression(e) for e in expressions] == [
+            ["+", "1", "2"],
+            "4",
+        ]
+        assert summarise(errors) == summarise(parse_all(ParserState(tokens, source))[1])
@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from wode import cli
+from wode.profiling import NullProfiler, Profiler
+from wode.types import Str
+
+
+def test_profiler_measures_phases():
+    profiler = Profiler()
+    with profiler.phase("scan"):
+        [i for i in range(1000)]
+    profiler.add_counter("tokens", 10)
+    profiler.add_counter("tokens", 5)
+    profiler.stop()
+
+    (phase,) = profiler.phases
+    assert phase.name == "scan"
+    assert phase.wall_time >= 0
+    assert phase.peak_memory is not None
+    assert profiler.counters == {"tokens": 15}
+    assert "tokens_per_second" in profiler.get_rates()
+    assert "scan" in profiler.get_report()
+
+
+def test_null_profiler_does_nothing():
+    profiler = NullProfiler()
+    with profiler.phase("scan"):
+        pass
+    profiler.add_counter("tokens", 1)
+    profiler.stop()
+
+
+def test_run_writes_a_json_profile(tmp_path: Path):
+    source_file_path = tmp_path / "example.wode"
+    source_file_path.write_text("1 + foo;\n")
+    profile_path = tmp_path / "profile.json"
+
+    result = CliRunner(mix_stderr=False).invoke(
+        cli,
+        [
+            "run",
+            Str(source_file_path),
+            "--profile",
+            "--profile-counters",
+            "--profile-out",
+            Str(profile_path),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "['+', '1', 'foo']" in result.stdout
+    assert "scan" in result.stderr
+
+    profile = json.loads(profile_path.read_text())
+    assert [p["name"] for p in profile["phases"]] == ["read", "scan", "parse", "print"]
+    assert profile["counters"]["tokens"] == 5
+    assert profile["counters"]["scanner_steps"] > 0
@@ -0,0 +1,62 @@
+import time
+
+from wode.repl import CONTINUATION_PROMPT, PROMPT, ReplSession, run_repl
+from wode.types import Iterator, List, Str
+
+
+def test_statements_continue_until_a_semicolon():
+    session = ReplSession()
+    assert session.feed_line("1 +") == []
+    assert session.prompt == CONTINUATION_PROMPT
+    assert session.feed_line("2; -x") == ["['+', '1', '2']"]
+    assert session.feed_line(";") == ["['-', 'x']"]
+    assert session.prompt == PROMPT
+    # Lines that are only whitespace or comments don't start a statement
+    assert session.feed_line("  # Comment") == []
+    assert session.prompt == PROMPT
+
+
+def test_errors_are_shown_for_each_statement():
+    session = ReplSession()
+    (message,) = session.feed_line("1 +;")
+    assert "An error occurred at 1:3" in message
+    (message,) = session.feed_line("$;")
+    assert "The character `$` is not known" in message
+    # A string can span several lines
+    assert session.feed_line('"a') == []
+    assert session.feed_line('b";') == ['"a\nb"']
+
+
+def test_names_are_interned_once_per_session():
+    session = ReplSession()
+    session.feed_line("foo + bar;")
+    session.feed_line("foo;")
+    assert len(session.symbol_table) == 2
+
+
+def test_run_repl_reads_until_the_input_ends():
+    lines = iter(["1 +", "2;", "3;"])
+    prompts: List[Str] = []
+    output: List[Str] = []
+
+    def read_line(prompt: Str) -> Str:
+        prompts.append(prompt)
+        try:
+            return next(lines)
+        except StopIteration:
+            raise EOFError()
+
+    run_repl(None, read_line, output.append)
+    assert prompts == [PROMPT, CONTINUATION_PROMPT, PROMPT, PROMPT]
+    assert output == ["['+', '1', '2']", "3", ""]
+
+
+def test_small_lines_take_less_than_a_millisecond():
+    session = ReplSession()
+    lines: Iterator[Str] = iter([f"foo_{i} + {i} * -bar;" for i in range(200)])
+    durations: List[float] = []
+    for line in lines:
+        start_time = time.perf_counter()
+        session.feed_line(line)
+        durations.append(time.perf_counter() - start_time)
+    assert sorted(durations)[len(durations) // 2] < 1e-3
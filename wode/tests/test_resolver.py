@@ -0,0 +1,217 @@
+import sys
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from wode import cli
+from wode.ast import (
+    BinaryExpression,
+    BlockExpression,
+    Expression,
+    ForExpression,
+    FunctionExpression,
+    LetStatement,
+    LiteralExpression,
+)
+from wode.errors import DuplicateParameterError, UnresolvedNameError
+from wode.hash_consing import AstInterner
+from wode.parallel_parser import parse_all_in_chunks
+from wode.parser import ParserState, parse_all
+from wode.resolver import BindingSite, resolve_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.tests.conftest import test_cases
+from wode.token_type import TokenType
+from wode.types import Dict, List, Str
+
+
+def _parse(code: Str) -> List[Expression]:
+    source = Source(None, code)
+    tokens, _ = scan_all_tokens(source)
+    expressions, errors = parse_all(ParserState(tokens, source))
+    assert errors == []
+    return expressions
+
+
+def _get_identifier_uses(expressions: List[Expression]) -> List[LiteralExpression]:
+    # Every identifier literal in source order, in code without match patterns
+    uses: List[LiteralExpression] = []
+    stack = list(reversed(expressions))
+    while len(stack) > 0:
+        expression = stack.pop()
+        match expression:
+            case LiteralExpression(literal=literal):
+                if literal.token_type == TokenType.IDENTIFIER:
+                    uses.append(expression)
+            case BinaryExpression(left=left, right=right):
+                stack.extend([right, left])
+            case LetStatement(value=value):
+                stack.append(value)
+            case FunctionExpression(body=body):
+                stack.append(body)
+            case BlockExpression(statements=statements):
+                stack.extend(reversed(statements))
+            case _:
+                pass
+    return uses
+
+
+def _get_binding_sites(code: Str) -> Dict[Str, List[BindingSite]]:
+    expressions = _parse(code)
+    resolution, errors = resolve_all(expressions)
+    assert errors == []
+    binding_sites: Dict[Str, List[BindingSite]] = {}
+    for use in _get_identifier_uses(expressions):
+        binding_site = resolution.get_binding_site(use)
+        assert binding_site is not None
+        binding_sites.setdefault(use.literal.lexeme, []).append(binding_site)
+    return binding_sites
+
+
+def test_uses_are_linked_to_their_declarations() -> None:
+    binding_sites = _get_binding_sites("let a = 1; let b = a + 2; a * b;")
+    assert binding_sites == {
+        "a": [BindingSite(0, 0, 0), BindingSite(0, 0, 0)],
+        "b": [BindingSite(0, 1, 1)],
+    }
+
+
+def test_depths_count_the_scopes_between_use_and_declaration() -> None:
+    binding_sites = _get_binding_sites(
+        "let a = 1; { let b = 2; { let c = a + b; c; }; };"
+    )
+    assert binding_sites == {
+        "a": [BindingSite(2, 0, 0)],
+        "b": [BindingSite(1, 0, 1)],
+        "c": [BindingSite(0, 0, 2)],
+    }
+
+
+def test_inner_declarations_shadow_outer_ones() -> None:
+    binding_sites = _get_binding_sites("let x = 1; { let x = x + 1; x; }; x;")
+    assert binding_sites == {
+        # The inner value only sees the outer `x`, and the inner `x` is hidden after its block
+        "x": [BindingSite(1, 0, 0), BindingSite(0, 0, 1), BindingSite(0, 0, 0)]
+    }
+
+
+def test_functions_see_their_parameters_and_themselves() -> None:
+    binding_sites = _get_binding_sites(
+        "let f = (a, b) -> a * f + b; let g = (x) -> { let y = x; y; };"
+    )
+    assert binding_sites == {
+        "a": [BindingSite(0, 0, 1)],
+        "f": [BindingSite(1, 0, 0)],
+        "b": [BindingSite(0, 1, 2)],
+        "x": [BindingSite(1, 0, 4)],
+        "y": [BindingSite(0, 0, 5)],
+    }
+
+
+def test_declarations_have_slots() -> None:
+    expressions = _parse("struct P { x: Float } let a = 1; for i in a { i; }")
+    resolution, errors = resolve_all(expressions)
+    assert errors == []
+    assert [b.lexeme for b in resolution.bindings if b is not None] == ["P", "a", "i"]
+    # The file, the for loop's variable and the loop body
+    assert [s.depth for s in resolution.scopes] == [0, 1, 2]
+    for_expression = expressions[2]
+    assert isinstance(for_expression, ForExpression)
+    assert resolution.get_declaration_site(for_expression.variable) == BindingSite(
+        0, 0, 2
+    )
+
+
+def test_match_patterns_bind_names_in_their_arm() -> None:
+    code = "let n = 1; match n { 0 => n, other => other, }; other;"
+    resolution, errors = resolve_all(_parse(code))
+    assert [type(e) for e in errors] == [UnresolvedNameError]
+    assert errors[0].source_range.lexeme == "other"
+    assert errors[0].source_range.start.position == len(code) - len("other;")
+    assert [b.lexeme for b in resolution.bindings if b is not None] == ["n", "other"]
+
+
+@pytest.mark.parametrize(
+    "code, expected_names",
+    [
+        ("foo;", ["foo"]),
+        ("let a = a;", ["a"]),
+        ("b; let b = 1;", ["b"]),
+        ("{ let c = 1; }; c;", ["c"]),
+        ("(d) -> d; d;", ["d"]),
+        ("for e in xs { e; }; e;", ["xs", "e"]),
+    ],
+)
+def test_unresolved_names(code: Str, expected_names: List[Str]) -> None:
+    source = Source(None, code)
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source))
+    _, errors = resolve_all(expressions, source)
+    assert all(isinstance(e, UnresolvedNameError) for e in errors)
+    assert [e.source_range.lexeme for e in errors] == expected_names
+    assert "isn't defined" in "".join(e.get_message() for e in errors)
+
+
+def test_duplicate_parameters() -> None:
+    _, errors = resolve_all(_parse("(a, b, a) -> a + b;"))
+    assert [type(e) for e in errors] == [DuplicateParameterError]
+    assert errors[0].source_range.start.position == 7
+
+
+def test_predefined_names() -> None:
+    expressions = _parse("print(sqrt(2));")
+    resolution, errors = resolve_all(expressions, predefined_names=["sqrt", "print"])
+    assert errors == []
+    assert resolution.bindings == [None, None]
+    assert len(resolution) == 2
+
+
+@pytest.mark.parametrize(
+    "source",
+    [pytest.param(tc.source, id=tc.test_case_id) for tc in test_cases],
+)
+def test_parallel_parses_resolve_the_same(source: Source) -> None:
+    # Identifiers from the parallel parser aren't interned
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source))
+    parallel_expressions, _ = parse_all_in_chunks(source, tokens, min_chunk_size=1)
+    resolution, errors = resolve_all(expressions, source)
+    parallel_resolution, parallel_errors = resolve_all(parallel_expressions, source)
+    assert [e.get_message() for e in parallel_errors] == [
+        e.get_message() for e in errors
+    ]
+    assert sorted(resolution.use_sites.values()) == sorted(
+        parallel_resolution.use_sites.values()
+    )
+
+
+def test_deep_nesting_doesnt_recurse() -> None:
+    depth = 2 * sys.getrecursionlimit()
+    source = Source(None, "let x = 1;" + "(" * depth + "x" + " + 1)" * depth + ";")
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source))
+    resolution, errors = resolve_all(expressions, source)
+    assert errors == []
+    assert list(resolution.use_sites.values()) == [BindingSite(0, 0, 0)]
+
+
+def test_hash_consed_asts_are_rejected() -> None:
+    source = Source(None, "x + 1;")
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source, interner=AstInterner()))
+    with pytest.raises(ValueError):
+        resolve_all(expressions, source)
+
+
+def test_check_command(tmp_path: Path) -> None:
+    good_path = tmp_path / "good.wode"
+    good_path.write_text("let a = 1;\na + 1;\n")
+    bad_path = tmp_path / "bad.wode"
+    bad_path.write_text("let a = 1;\nb + 1;\n")
+    runner = CliRunner(mix_stderr=False)
+    result = runner.invoke(cli, ["check", str(good_path)])
+    assert result.exit_code == 0
+    result = runner.invoke(cli, ["check", str(good_path), str(bad_path)])
+    assert result.exit_code == 1
+    assert "The name `b` isn't defined here." in result.stderr
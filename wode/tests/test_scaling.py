@@ -0,0 +1,117 @@
+import pytest
+
+from wode.ast_to_s_expression import convert_to_s_expression
+from wode.parser import ParserState, parse_all
+from wode.resolver import resolve_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.timing import ScalingMeasurement, measure_scaling
+from wode.type_inference import infer_all
+from wode.types import Any, Callable, List
+
+# The number of statements in each input, big enough that a quadratic phase stands out from the constant overheads
+SIZES = [125, 250, 500, 1_000]
+# Linear phases measure close to 1, this leaves room for noise without letting quadratic phases through
+MAX_GROWTH_EXPONENT = 1.3
+
+
+def make_source(n_statements: int) -> Source:
+    return Source(
+        None,
+        "\n".join(f"foo_{i % 10} + {i} * bar - {i}.5;" for i in range(n_statements)),
+    )
+
+
+def make_source_with_errors(n_statements: int) -> Source:
+    return Source(None, "\n".join("1 +;" for _ in range(n_statements)))
+
+
+def assert_linear(
+    name: str,
+    make_input: Callable[[int], Any],
+    run: Callable[[Any], Any],
+    sizes: List[int] = SIZES,
+) -> None:
+    # Timings are noisy, so measure a few times and only fail if the phase is never linear
+    measurements: List[ScalingMeasurement] = []
+    for _ in range(3):
+        measurement = measure_scaling(name, make_input, run, sizes)
+        if measurement.growth_exponent < MAX_GROWTH_EXPONENT:
+            return
+        measurements.append(measurement)
+    pytest.fail("\n".join(str(m) for m in measurements))
+
+
+@pytest.mark.timeout(60)
+def test_scanning_is_linear():
+    assert_linear("scan", make_source, scan_all_tokens)
+
+
+@pytest.mark.timeout(60)
+def test_parsing_is_linear():
+    def make_parser_state(n_statements: int) -> ParserState:
+        source = make_source(n_statements)
+        tokens, _ = scan_all_tokens(source)
+        return ParserState(tokens, source)
+
+    assert_linear("parse", make_parser_state, parse_all)
+
+
+@pytest.mark.timeout(60)
+def test_resolving_is_linear():
+    def make_expressions(n_statements: int):
+        source = make_source(n_statements)
+        tokens, _ = scan_all_tokens(source)
+        return parse_all(ParserState(tokens, source))[0]
+
+    predefined_names = ["bar"] + [f"foo_{i}" for i in range(10)]
+    assert_linear(
+        "resolve",
+        make_expressions,
+        lambda expressions: resolve_all(expressions, None, predefined_names),
+    )
+
+
+@pytest.mark.timeout(60)
+def test_inferring_types_is_linear():
+    def make_resolved_expressions(n_statements: int):
+        source = Source(
+            None,
+            "let foo = (a) -> a * 2;\n"
+            + "\n".join(f"let bar_{i} = foo({i}) + {i};" for i in range(n_statements)),
+        )
+        tokens, _ = scan_all_tokens(source)
+        expressions, _ = parse_all(ParserState(tokens, source))
+        return expressions, resolve_all(expressions, source)[0]
+
+    assert_linear(
+        "infer",
+        make_resolved_expressions,
+        lambda resolved_expressions: infer_all(*resolved_expressions),
+    )
+
+
+@pytest.mark.timeout(60)
+def test_rendering_error_messages_is_linear():
+    def make_errors(n_statements: int):
+        source = make_source_with_errors(n_statements)
+        tokens, _ = scan_all_tokens(source)
+        return parse_all(ParserState(tokens, source))[1]
+
+    assert_linear(
+        "get_message", make_errors, lambda errors: [e.get_message() for e in errors]
+    )
+
+
+@pytest.mark.timeout(60)
+def test_converting_to_s_expressions_is_linear():
+    def make_expressions(n_statements: int):
+        source = make_source(n_statements)
+        tokens, _ = scan_all_tokens(source)
+        return parse_all(ParserState(tokens, source))[0]
+
+    assert_linear(
+        "convert_to_s_expression",
+        make_expressions,
+        lambda expressions: [convert_to_s_expression(e) for e in expressions],
+    )
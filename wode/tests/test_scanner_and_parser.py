@@ -1,11 +1,21 @@
+import sys
 from textwrap import dedent
 
 import pytest
 
+from wode.ast import (
+    BlockExpression,
+    CallExpression,
+    GroupingExpression,
+    IfExpression,
+    LiteralExpression,
+    MatchExpression,
+    WhileExpression,
+)
 from wode.ast_to_s_expression import SExpression, convert_to_s_expression
 from wode.errors import WodeError
 from wode.parser import ParserState, parse_all
-from wode.scanner import scan_all_tokens
+from wode.scanner import ScannerState, scan_all_tokens, scan_one_token
 from wode.source import Source
 from wode.tests.conftest import SimplifiedToken, test_cases
 from wode.types import List, Str, Type
@@ -96,3 +106,71 @@ def test_test_cases(
         {[Str(e) for e in  parser_error_types]}
         """
     )
+
+
+@pytest.mark.parametrize(
+    ["code", "end_position"],
+    [
+        pytest.param(" \t\r\n  x", 6, id="whitespace"),
+        pytest.param("# Comment\nx", 10, id="comment"),
+        pytest.param("# Comment", 9, id="comment at the end of the file"),
+        pytest.param('"A string" x', 10, id="string"),
+        pytest.param('"Unterminated', 13, id="unterminated string"),
+    ],
+)
+def test_bulk_regions_are_scanned_in_one_step(code: Str, end_position: int):
+    _, state = scan_one_token(ScannerState(Source(None, code)))
+    assert state.position == end_position
+
+
+@pytest.mark.parametrize(
+    ["opening", "closing"],
+    [pytest.param("(", ")", id="groups"), pytest.param("f(", ")", id="calls")],
+)
+def test_deep_nesting_doesnt_recurse(opening: Str, closing: Str):
+    depth = 2 * sys.getrecursionlimit()
+    source = Source(None, opening * depth + "1" + closing * depth + ";")
+    tokens, _ = scan_all_tokens(source)
+    (expression,), errors = parse_all(ParserState(tokens, source))
+    assert errors == []
+    # Walk down to the innermost expression
+    for _ in range(depth):
+        match expression:
+            case GroupingExpression(inner):
+                expression = inner
+            case CallExpression(_, [inner], _):
+                expression = inner
+            case _:
+                pytest.fail(f"Expected a group or a call, got {expression}.")
+    assert isinstance(expression, LiteralExpression)
+
+
+@pytest.mark.parametrize(
+    ["opening", "closing"],
+    [
+        pytest.param("{", "}", id="blocks"),
+        pytest.param("if a {", "}", id="ifs"),
+        pytest.param("while a {", "}", id="while loops"),
+        pytest.param("match a { 1 => {", "} }", id="match arms"),
+    ],
+)
+def test_deep_blocks_dont_recurse(opening: Str, closing: Str):
+    depth = 2 * sys.getrecursionlimit()
+    source = Source(None, opening * depth + "1;" + closing * depth)
+    tokens, _ = scan_all_tokens(source)
+    (statement,), errors = parse_all(ParserState(tokens, source))
+    assert errors == []
+    # Walk down to the innermost statement
+    for _ in range(depth):
+        match statement:
+            case BlockExpression(_, [inner], _):
+                statement = inner
+            case IfExpression(_, _, [BlockExpression(_, [inner], _)], None):
+                statement = inner
+            case WhileExpression(_, _, BlockExpression(_, [inner], _)):
+                statement = inner
+            case MatchExpression(_, _, _, [BlockExpression(_, [inner], _)], _):
+                statement = inner
+            case _:
+                pytest.fail(f"Expected a block, got {statement}.")
+    assert isinstance(statement, LiteralExpression)
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from wode import cli
+from wode.incremental import IncrementalScanner
+from wode.scanner import scan_all_tokens
+from wode.semantic_tokens import encode_semantic_tokens, encode_token_stream
+from wode.source import Source
+from wode.token_stream import TokenStream
+from wode.types import Str
+
+CODE = 'let x = "a\nb";\nfoo + 1;\n"é\U0001f600" + y;\n'
+
+
+def test_range_restricted_encoding_matches_the_full_encoding():
+    source = Source(None, CODE)
+    tokens, _ = scan_all_tokens(source)
+    token_stream = TokenStream.from_tokens(source, tokens)
+    full = encode_token_stream(token_stream)
+    assert encode_semantic_tokens(source, tokens) == full
+    # The tokens on the third line, relative to the start of the file
+    assert encode_token_stream(token_stream, (2, 3)) == [2, 0, 3, 3, 0] + full[-25:-15]
+    assert encode_token_stream(token_stream, (10, 20)) == []
+    assert encode_token_stream(IncrementalScanner(CODE).token_stream) == full
+
+
+def test_lengths_are_measured_in_the_position_encoding():
+    source = Source(None, '"\U0001f600";')
+    tokens, _ = scan_all_tokens(source)
+    token_stream = TokenStream.from_tokens(source, tokens)
+    assert encode_token_stream(token_stream)[2] == 3
+    assert encode_token_stream(token_stream, position_encoding="utf-16")[2] == 4
+
+
+def test_tokens_command_outputs_semantic_tokens(tmp_path: Path):
+    source_file_path = tmp_path / "example.wode"
+    source_file_path.write_text(CODE)
+
+    result = CliRunner(mix_stderr=False).invoke(
+        cli,
+        ["tokens", Str(source_file_path), "--format=lsp-semantic", "--start-line=3"],
+    )
+    assert result.exit_code == 0, result.output
+    output = json.loads(result.stdout)
+    assert output["legend"][output["data"][3]] == "variable"
+
+    result = CliRunner(mix_stderr=False).invoke(
+        cli, ["tokens", Str(source_file_path), "--end-line=1"]
+    )
+    assert result.exit_code == 0, result.output
+    assert result.stdout.splitlines()[0] == "1:0 let 'let'"
+    assert "foo" not in result.stdout
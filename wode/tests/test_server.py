@@ -0,0 +1,167 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+import wode.server
+from wode import cli
+from wode.load_test import run_load_test
+from wode.server import CompileServer, compile_source
+from wode.types import Str
+
+
+def test_compile_source_returns_requested_outputs():
+    result = compile_source("1 + foo;")
+    assert [t["lexeme"] for t in result["tokens"]] == ["1", "+", "foo", ";", ""]
+    assert result["ast"] == [["+", "1", "foo"]]
+    assert result["diagnostics"] == []
+
+    result = compile_source("1 +;", outputs=["diagnostics"])
+    assert list(result) == ["diagnostics"]
+    assert [d["error_type"] for d in result["diagnostics"]] == [
+        "UnexpectedEndOfExpressionError"
+    ]
+
+
+def test_server_reports_invalid_requests():
+    server = CompileServer(workers=0)
+    response = json.loads(asyncio.run(server.handle_request(b'{"id": 3}')))
+    assert response["id"] == 3
+    assert "error" in response
+    response = json.loads(asyncio.run(server.handle_request(b"[]")))
+    assert "error" in response
+
+
+def test_server_reports_compiler_failures(monkeypatch: pytest.MonkeyPatch):
+    server = CompileServer(workers=0)
+    # An AST nested more deeply than `json` can encode
+    depth = 2 * sys.getrecursionlimit()
+    request = {"id": 1, "source": "(" * depth + "1" + ")" * depth + ";"}
+    response = json.loads(
+        asyncio.run(server.handle_request(json.dumps(request).encode()))
+    )
+    assert response["id"] == 1
+    assert "RecursionError" in response["error"]
+
+    def fail(*args: object) -> None:
+        raise RuntimeError("The parser broke.")
+
+    monkeypatch.setattr(wode.server, "parse_all", fail)
+    request = {"id": 2, "source": "1 + 2;"}
+    response = json.loads(
+        asyncio.run(server.handle_request(json.dumps(request).encode()))
+    )
+    assert response == {
+        "id": 2,
+        "error": "Compiling failed: RuntimeError('The parser broke.')",
+    }
+    # The server keeps handling requests afterwards
+    monkeypatch.undo()
+    response = json.loads(
+        asyncio.run(server.handle_request(json.dumps(request).encode()))
+    )
+    assert response["result"]["ast"] == [["+", "1", "2"]]
+
+
+def test_server_handles_requests_over_a_unix_socket(tmp_path: Path):
+    socket_path = tmp_path / "wode.sock"
+
+    async def run() -> None:
+        server = CompileServer(workers=0)
+        serve_task = asyncio.create_task(server.serve_unix_socket(socket_path))
+        while not socket_path.exists():
+            await asyncio.sleep(0.01)
+
+        reader, writer = await asyncio.open_unix_connection(Str(socket_path))
+        writer.write(b'{"id": "a", "source": "1;", "outputs": ["ast"]}\n')
+        await writer.drain()
+        assert json.loads(await reader.readline()) == {
+            "id": "a",
+            "result": {"ast": ["1"]},
+        }
+        writer.close()
+
+        result = await run_load_test(
+            socket_path, "1 + 2;", n_requests=10, concurrency=3
+        )
+        assert result.n_requests == 10
+        assert result.n_errors == 0
+        assert len(result.latencies) == 10
+        assert result.get_percentile(50) <= result.get_percentile(99)
+
+        serve_task.cancel()
+
+    asyncio.run(run())
+
+
+@pytest.mark.timeout(60)
+def test_server_handles_requests_longer_than_the_stream_limit(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    socket_path = tmp_path / "wode.sock"
+    # Longer than asyncio's default limit of 64 KiB
+    code = "1;\n" * 30_000
+
+    async def run() -> None:
+        server = CompileServer(workers=0)
+        serve_task = asyncio.create_task(server.serve_unix_socket(socket_path))
+        while not socket_path.exists():
+            await asyncio.sleep(0.01)
+
+        result = await run_load_test(socket_path, code, n_requests=2, concurrency=1)
+        assert result.n_errors == 0
+        serve_task.cancel()
+
+        # A line that's longer than the server's limit is answered with an error, and the connection carries on
+        monkeypatch.setattr(wode.server, "STREAM_LIMIT", 1024)
+        socket_path.unlink()
+        serve_task = asyncio.create_task(server.serve_unix_socket(socket_path))
+        while not socket_path.exists():
+            await asyncio.sleep(0.01)
+        reader, writer = await asyncio.open_unix_connection(Str(socket_path))
+        writer.write(json.dumps({"source": code}).encode() + b"\n")
+        writer.write(b'{"id": "a", "source": "1;", "outputs": ["ast"]}\n')
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        assert response["id"] is None
+        assert "Invalid request" in response["error"]
+        assert json.loads(await reader.readline())["id"] == "a"
+        writer.close()
+        serve_task.cancel()
+
+    asyncio.run(run())
+
+
+def test_load_test_counts_missing_and_invalid_responses_as_errors(tmp_path: Path):
+    socket_path = tmp_path / "wode.sock"
+
+    async def handle_connection(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        # Answer the first request with something that isn't JSON, then hang up
+        await reader.readline()
+        writer.write(b"not json\n")
+        await writer.drain()
+        await reader.readline()
+        writer.close()
+
+    async def run() -> None:
+        server = await asyncio.start_unix_server(handle_connection, Str(socket_path))
+        async with server:
+            result = await run_load_test(socket_path, "1;", n_requests=3, concurrency=1)
+        assert result.n_requests == 3
+        assert result.n_errors == 3
+
+    asyncio.run(run())
+
+
+def test_load_test_requires_a_source_file(tmp_path: Path):
+    socket_path = tmp_path / "wode.sock"
+    result = CliRunner(mix_stderr=False).invoke(
+        cli, ["load-test", "--socket", Str(socket_path)]
+    )
+    assert result.exit_code == 2
+    assert "SOURCE_FILE_PATH" in result.stderr
@@ -0,0 +1,71 @@
+import pytest
+
+from wode.scanner import scan_all_tokens
+from wode.source import Source, SourcePosition, SourceRange, set_debug_validation
+from wode.token_stream import TokenStream
+from wode.types import Str
+
+
+def test_lexeme_views_of_ascii_code():
+    source = Source(None, 'foo + "bar";')
+    assert SourceRange(source, 0, 3).lexeme_view == b"foo"
+    tokens, _ = scan_all_tokens(source)
+    token_stream = TokenStream.from_tokens(source, tokens)
+    assert [bytes(token_stream.get_lexeme_view(i)) for i in range(len(tokens))] == [
+        t.lexeme.encode("ascii") for t in tokens
+    ]
+    with pytest.raises(IndexError):
+        source.get_lexeme_view(10, 20)
+    with pytest.raises(TypeError):
+        source.code_view[0] = 0  # type: ignore
+
+
+def test_lexeme_views_need_ascii_code():
+    source = Source(None, '"é";')
+    assert not source.is_ascii
+    assert SourceRange(source, 1, 2).lexeme == "é"
+    with pytest.raises(ValueError):
+        SourceRange(source, 1, 2).lexeme_view
+
+
+def test_positions_are_found_without_rebuilding_the_lines():
+    source = Source(None, "a\nbc\r\nd\n")
+    assert [
+        SourcePosition(source, i).line_index_and_column
+        for i in range(len(source.code) + 1)
+    ] == [(0, 0), (0, 1), (1, 0), (1, 1), (1, 2), (1, 3), (2, 0), (2, 1), (3, 0)]
+    assert Str(SourcePosition(source, 7)) == "3:1"
+    line_number, column = SourcePosition(source, 3).coordinates
+    assert (line_number.value, column.value) == (2, 1)
+    # The empty line after the final line break
+    assert source.get_line(SourcePosition(source, 8).line_number) == ""
+
+
+def test_ranges_compare_by_value():
+    source = Source(None, "abc")
+    assert SourceRange(source, 0, 1) == SourceRange(
+        source, SourcePosition(source, 0), 1
+    )
+    assert SourceRange(source, 0, 1) != SourceRange(Source(None, "abc"), 0, 1)
+    assert len({SourcePosition(source, 1), SourcePosition(source, 1)}) == 1
+    with pytest.raises(AttributeError):
+        SourceRange(source, 0, 1).foo = 1  # type: ignore
+    with pytest.raises(ValueError):
+        SourceRange(source, SourcePosition(Source(None, "xyz"), 0), 1)
+    # Positions must come from the same source object, even if another one has the same code
+    with pytest.raises(ValueError):
+        SourceRange(source, 0, SourcePosition(Source(None, "abc"), 1))
+
+
+def test_debug_validation_is_opt_in():
+    source = Source(None, "abc")
+    SourceRange(source, 2, 1)
+    SourcePosition(source, 10)
+    set_debug_validation(True)
+    try:
+        with pytest.raises(ValueError):
+            SourceRange(source, 2, 1)
+        with pytest.raises(ValueError):
+            SourcePosition(source, 10)
+    finally:
+        set_debug_validation(False)
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from wode import cli
+from wode.source import SourcePosition
+from wode.source_map import SourceMap
+from wode.types import Str
+
+
+def test_global_offsets_round_trip():
+    source_map = SourceMap()
+    sources = [source_map.add_source(None, code) for code in ["1;", "", "foo;\nbar;"]]
+    assert [s.file_id for s in sources] == [0, 1, 2]
+    for source in sources:
+        for position in range(len(source.code) + 1):
+            global_offset = source_map.get_global_offset(
+                SourcePosition(source, position)
+            )
+            assert source_map.get_file_id_and_offset(global_offset) == (
+                source.file_id,
+                position,
+            )
+            assert source_map.get_position(global_offset) == SourcePosition(
+                source, position
+            )
+    with pytest.raises(IndexError):
+        source_map.get_position(2 + 1 + 0 + 1 + 9 + 1)
+
+
+def test_files_are_only_added_once(tmp_path: Path):
+    file_path = tmp_path / "example.wode"
+    file_path.write_text("1;")
+    source_map = SourceMap()
+    source = source_map.add_file(file_path)
+    assert (
+        source_map.add_file(tmp_path / ".." / tmp_path.name / "example.wode") is source
+    )
+    assert len(source_map) == 1
+    assert source_map.get_file_id(file_path) == 0
+    assert source.resolved_file_path == file_path.resolve()
+
+
+def test_positions_from_other_sources_are_rejected():
+    source_map = SourceMap()
+    source_map.add_source(None, "1;")
+    other_source = SourceMap().add_source(None, "1;")
+    with pytest.raises(ValueError):
+        source_map.get_global_offset(SourcePosition(other_source, 0))
+
+
+def test_build_command_reports_errors_in_file_order(tmp_path: Path):
+    first_file_path = tmp_path / "first.wode"
+    first_file_path.write_text("1 +;\n2 +;")
+    second_file_path = tmp_path / "second.wode"
+    second_file_path.write_text("$;")
+    result = CliRunner(mix_stderr=False).invoke(
+        cli, ["build", Str(second_file_path), Str(first_file_path)]
+    )
+    assert result.exit_code == 1
+    assert "Built 2 files with 3 errors." in result.stdout
+    assert result.stderr.index(Str(second_file_path)) < result.stderr.index(
+        Str(first_file_path)
+    )
+
+    result = CliRunner(mix_stderr=False).invoke(
+        cli, ["build", Str(tmp_path / "first.wode")]
+    )
+    assert result.exit_code == 1
+    assert result.stderr.index(":1:") < result.stderr.index(":2:")
@@ -0,0 +1,88 @@
+import random
+
+from typer.testing import CliRunner
+
+from wode import cli
+from wode.ast_to_s_expression import convert_to_s_expression
+from wode.fuzzing import ProgramGenerator
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.streaming import compile_statements, iter_statements
+from wode.types import Iterator, List, Str
+
+
+def test_statements_end_at_semicolons_outside_strings_comments_and_brackets():
+    code = '1;\n"a;b" # c;d\n;{x; y};\n  2 +\n 3;4'
+    statements = List(iter_statements([code]))
+    assert [s.code for s in statements] == [
+        "1;",
+        '\n"a;b" # c;d\n;',
+        "{x; y};",
+        "\n  2 +\n 3;",
+        "4",
+    ]
+    assert [(s.line_index, s.column) for s in statements] == [
+        (0, 0),
+        (0, 2),
+        (2, 1),
+        (2, 8),
+        (4, 3),
+    ]
+    # Splitting the code into any chunks gives the same statements
+    assert List(iter_statements(code)) == statements
+
+
+def test_statements_are_yielded_before_the_stream_ends():
+    read_chunks: List[Str] = []
+
+    def chunks() -> Iterator[Str]:
+        for chunk in ["1 + ", "2; 3", ";", " 4;"]:
+            read_chunks.append(chunk)
+            yield chunk
+
+    statements = iter_statements(chunks())
+    assert next(statements).code == "1 + 2;"
+    assert read_chunks == ["1 + ", "2; 3"]
+    assert next(statements).code == " 3;"
+    assert read_chunks == ["1 + ", "2; 3", ";"]
+
+
+def test_streaming_matches_compiling_the_whole_code():
+    generator = ProgramGenerator(random.Random(0), error_rate=0.1)
+    for _ in range(200):
+        code = generator.get_program(5)
+        source = Source(None, code)
+        tokens, scanner_errors = scan_all_tokens(source)
+        if len(scanner_errors) > 0:
+            # Scanning errors can hide a statement's semicolon from the whole code
+            continue
+        expressions, errors = parse_all(ParserState(tokens, source))
+
+        # Feed the code a few characters at a time
+        chunks = [code[i : i + 7] for i in range(0, len(code), 7)]
+        statements = List(compile_statements(chunks))
+        assert [
+            convert_to_s_expression(e) for s in statements for e in s.expressions
+        ] == [convert_to_s_expression(e) for e in expressions]
+        assert [
+            (e.error_type, Str(e.source_range.start), Str(e.source_range.end))
+            for s in statements
+            for e in s.parser_errors
+        ] == [
+            (e.error_type, Str(e.source_range.start), Str(e.source_range.end))
+            for e in errors
+        ]
+
+
+def test_run_and_build_read_from_stdin():
+    result = CliRunner().invoke(cli, ["run", "-"], input="1 + 2;\n-x;\n3 +;")
+    assert result.exit_code == 0, result.output
+    assert "['+', '1', '2']\n['-', 'x']\nAn error occurred at 3:3" in result.output
+
+    result = CliRunner(mix_stderr=False).invoke(
+        cli, ["build", "--stdin"], input="1;\n2 +;"
+    )
+    assert result.exit_code == 1
+    assert "An error occurred at 2:3" in result.stderr
+    assert "Built stdin with 1 errors." in result.stdout
@@ -0,0 +1,50 @@
+from wode.ast import LiteralExpression
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.symbol_table import SymbolTable
+from wode.token_type import TokenType
+
+
+def test_symbol_table_interns_names():
+    symbol_table = SymbolTable()
+    foo_id = symbol_table.intern("foo")
+    bar_id = symbol_table.intern("bar")
+    assert foo_id != bar_id
+    assert symbol_table.intern("foo") == foo_id
+    assert symbol_table.get_name(bar_id) == "bar"
+    assert symbol_table.get_symbol_id("baz") is None
+    assert "foo" in symbol_table
+    assert len(symbol_table) == 2
+
+
+def test_scanner_interns_identifiers():
+    symbol_table = SymbolTable()
+    source = Source(None, "foo + bar + foo + true;")
+    tokens, errors = scan_all_tokens(source, symbol_table)
+    assert errors == []
+
+    identifier_tokens = [t for t in tokens if t.token_type == TokenType.IDENTIFIER]
+    assert [t.lexeme for t in identifier_tokens] == ["foo", "bar", "foo"]
+    foo_1, bar, foo_2 = [t.symbol_id for t in identifier_tokens]
+    assert foo_1 == foo_2
+    assert foo_1 != bar
+
+    # Keywords aren't interned
+    assert symbol_table.names == ["foo", "bar"]
+    assert next(t for t in tokens if t.token_type == TokenType.TRUE).symbol_id is None
+
+
+def test_symbol_table_is_shared_between_sources():
+    symbol_table = SymbolTable()
+    first_tokens, _ = scan_all_tokens(Source(None, "foo;"), symbol_table)
+    second_tokens, _ = scan_all_tokens(Source(None, "bar; foo;"), symbol_table)
+    assert first_tokens[0].symbol_id == second_tokens[2].symbol_id
+
+
+def test_literal_expressions_carry_symbol_ids():
+    source = Source(None, "foo;")
+    tokens, _ = scan_all_tokens(source)
+    (expression,), _ = parse_all(ParserState(tokens, source))
+    assert isinstance(expression, LiteralExpression)
+    assert expression.symbol_id == tokens[0].symbol_id == 0
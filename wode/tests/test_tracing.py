@@ -0,0 +1,80 @@
+from wode.ast_to_s_expression import convert_all_to_s_expressions
+from wode.errors import WodeError
+from wode.parser import ParserState, parse_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.tracing import (
+    MetricsAggregator,
+    Observer,
+    Phase,
+    observing,
+    record_cache_lookup,
+)
+from wode.types import Float, Int, List, Optional, Str, Tuple
+
+
+class RecordingObserver(Observer):
+    def __init__(self) -> None:
+        self.events: List[Tuple[Str, Phase]] = []
+
+    def on_phase_start(self, phase: Phase, source: Optional[Source]) -> None:
+        self.events.append(("start", phase))
+
+    def on_phase_end(
+        self,
+        phase: Phase,
+        source: Optional[Source],
+        elapsed: Float,
+        item_count: Int,
+        errors: List[WodeError],
+    ) -> None:
+        self.events.append(("end", phase))
+
+
+def compile_source(code: Str) -> None:
+    source = Source(None, code)
+    tokens, _ = scan_all_tokens(source)
+    expressions, _ = parse_all(ParserState(tokens, source))
+    convert_all_to_s_expressions(expressions, source)
+
+
+def test_entry_points_call_observers():
+    with observing(RecordingObserver()) as observer:
+        compile_source("1 + 2;")
+    assert observer.events == [
+        ("start", Phase.SCAN),
+        ("end", Phase.SCAN),
+        ("start", Phase.PARSE),
+        ("end", Phase.PARSE),
+        ("start", Phase.RENDER),
+        ("end", Phase.RENDER),
+    ]
+
+    # Observers aren't called after they've been removed
+    compile_source("1 + 2;")
+    assert len(observer.events) == 6
+
+
+def test_metrics_aggregator_aggregates_metrics():
+    with observing(MetricsAggregator()) as metrics:
+        compile_source("1 + 2; 3;")
+        compile_source("😅; 123.456.789;")
+        record_cache_lookup("ast", hit=True)
+        record_cache_lookup("ast", hit=False)
+        record_cache_lookup("ast", hit=False)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["latencies"]["scan"]["count"] == 2
+    assert sum(snapshot["latencies"]["parse"]["counts"]) == 2
+    assert snapshot["item_counts"]["scan"] == 10
+    assert snapshot["item_counts"]["parse"] == 2
+    assert snapshot["error_counts"] == {
+        "UnknownCharacterError": 1,
+        "TooManyDecimalPointsError": 1,
+        "UnexpectedEndOfExpressionError": 2,
+    }
+    assert snapshot["cache_hits"] == {"ast": 1}
+    assert snapshot["cache_misses"] == {"ast": 2}
+
+    metrics.reset()
+    assert metrics.snapshot()["error_counts"] == {}
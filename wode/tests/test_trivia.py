@@ -0,0 +1,50 @@
+import pytest
+
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.tests.conftest import test_cases
+from wode.token import TriviaType
+from wode.token_type import TokenType
+from wode.types import List, Str
+
+
+def render_tokens_and_trivia(source: Source) -> str:
+    tokens, _ = scan_all_tokens(source, keep_trivia=True)
+    parts: List[Str] = []
+    for token in tokens:
+        parts.extend(trivia.get_text(source) for trivia in token.leading_trivia)
+        lexeme = token.lexeme
+        parts.append(f'"{lexeme}"' if token.token_type == TokenType.STRING else lexeme)
+    return "".join(parts)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        pytest.param(tc.source, id=tc.test_case_id)
+        for tc in test_cases
+        if len(tc.expected_scanner_error_types) == 0
+    ],
+)
+def test_trivia_round_trips_test_cases(source: Source) -> None:
+    assert render_tokens_and_trivia(source) == source.code
+
+
+def test_trivia_is_attached_to_the_next_token():
+    source = Source(None, "# a\n1 +  x; # b\n")
+    tokens, _ = scan_all_tokens(source, keep_trivia=True)
+    assert [
+        [(t.trivia_type, t.get_text(source)) for t in token.leading_trivia]
+        for token in tokens
+    ] == [
+        [(TriviaType.COMMENT, "# a\n")],
+        [(TriviaType.WHITESPACE, " ")],
+        [(TriviaType.WHITESPACE, "  ")],
+        [],
+        [(TriviaType.WHITESPACE, " "), (TriviaType.COMMENT, "# b\n")],
+    ]
+
+
+def test_trivia_is_not_kept_by_default():
+    tokens, _ = scan_all_tokens(Source(None, "# a\n1;"))
+    assert all(token.leading_trivia == () for token in tokens)
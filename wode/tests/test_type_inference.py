@@ -0,0 +1,193 @@
+import sys
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from wode import cli
+from wode.errors import (
+    InfiniteTypeError,
+    OperandTypeError,
+    TypeMismatchError,
+    UnknownTypeError,
+    WodeError,
+)
+from wode.parser import ParserState, parse_all
+from wode.resolver import resolve_all
+from wode.scanner import scan_all_tokens
+from wode.source import Source
+from wode.type_inference import (
+    FLOAT_TYPE,
+    INT_TYPE,
+    InferredType,
+    InferredTypes,
+    TypeVariable,
+    find,
+    format_types,
+    function_type,
+    infer_all,
+    list_type,
+)
+from wode.types import Dict, List, Str, Tuple, Type
+
+PREDEFINED_TYPES: Dict[Str, InferredType] = {
+    "range": function_type([INT_TYPE], list_type(INT_TYPE)),
+    "sqrt": function_type([FLOAT_TYPE], FLOAT_TYPE),
+}
+
+
+def _infer(code: Str) -> Tuple[Dict[Str, Str], InferredTypes, List[WodeError]]:
+    source = Source(None, code)
+    tokens, _ = scan_all_tokens(source)
+    expressions, parser_errors = parse_all(ParserState(tokens, source))
+    assert parser_errors == []
+    resolution, resolver_errors = resolve_all(expressions, source, PREDEFINED_TYPES)
+    assert resolver_errors == []
+    inferred_types, errors = infer_all(
+        expressions, resolution, source, PREDEFINED_TYPES
+    )
+    # The type of each named binding, later bindings replace earlier ones with the same name
+    binding_types = {
+        token.lexeme: format_types(binding_type)[0]
+        for token, binding_type in zip(
+            resolution.bindings, inferred_types.binding_types
+        )
+        if token is not None
+    }
+    return binding_types, inferred_types, errors
+
+
+@pytest.mark.parametrize(
+    "code, expected_types",
+    [
+        (
+            'let i = 1; let f = 1.5; let s = "s"; let b = true; let n = nothing;',
+            {"i": "Int", "f": "Float", "s": "Str", "b": "Bool", "n": "Nothing"},
+        ),
+        ("let a = -1 + 2 * 3 ^ 4; let b = 1 < 2 && !false;", {"a": "Int", "b": "Bool"}),
+        (
+            'let id = (x) -> x; let a = id(1); let b = id("s"); let c = id(id);',
+            {"id": "('a) -> 'a", "a": "Int", "b": "Str", "c": "('a) -> 'a"},
+        ),
+        (
+            "let compose = (f, g) -> (x) -> f(g(x));",
+            {"compose": "(('a) -> 'b, ('c) -> 'a) -> ('c) -> 'b"},
+        ),
+        (
+            "let fact = (n) -> { if n < 1 { return 1; } else { return n * fact(n - 1); } };",
+            {"fact": "(Int) -> Int"},
+        ),
+        (
+            "let pick = (c, a, b) -> if c { a; } elif !c { b; } else { a; };",
+            {"pick": "(Bool, 'a, 'a) -> 'a"},
+        ),
+        (
+            'let name = (n) -> match n { 0 => "zero", other => "some", };',
+            {"name": "(Int) -> Str", "other": "Int"},
+        ),
+        (
+            "struct Point { x: Float, y: Float } let p = Point(1.0, sqrt(2.0));",
+            {"Point": "(Float, Float) -> Point", "p": "Point"},
+        ),
+        (
+            "for i in range(10) { let j = i + 1; }",
+            {"i": "Int", "j": "Int"},
+        ),
+        ("let a = { let b = 1.5; b + 1.0; };", {"a": "Float"}),
+        # Only the names in the `let` are generalized, `x` is still the outer function's parameter
+        (
+            "let f = (x) -> { let g = (y) -> x; return g; };",
+            {"f": "('a) -> ('b) -> 'a"},
+        ),
+    ],
+)
+def test_inferred_types(code: Str, expected_types: Dict[Str, Str]) -> None:
+    binding_types, _, errors = _infer(code)
+    assert [e.get_message() for e in errors] == []
+    assert {name: binding_types[name] for name in expected_types} == expected_types
+
+
+@pytest.mark.parametrize(
+    "code, expected_errors",
+    [
+        # String tokens don't include their quotes
+        ('let a = 1 + "a";', [(TypeMismatchError, "a")]),
+        ('let f = (x) -> x + 1; f("a");', [(TypeMismatchError, "f")]),
+        ("if 1 { 2; }", [(TypeMismatchError, "1")]),
+        ("let f = (x) -> x(x);", [(InfiniteTypeError, "x")]),
+        ('let a = "a" - "b";', [(OperandTypeError, "a")]),
+        ("let a = !1.5;", [(TypeMismatchError, "1.5")]),
+        ("struct Line { start: Point }", [(UnknownTypeError, "Point")]),
+        ('match 1 { "one" => 1, };', [(TypeMismatchError, "one")]),
+        (
+            'let f = (x) -> { if x { return 1; } else { return "a"; } };',
+            [(TypeMismatchError, 'return "a')],
+        ),
+        # A parameter is the same type everywhere in its function, even through a `let`
+        ('let f = (x) -> { let y = x; y(1); y("a"); };', [(TypeMismatchError, "y")]),
+        ("let a = (1 + 2) * sqrt(3.0);", [(TypeMismatchError, "sqrt(3.0)")]),
+    ],
+)
+def test_type_errors(
+    code: Str, expected_errors: List[Tuple[Type[WodeError], Str]]
+) -> None:
+    _, _, errors = _infer(code)
+    assert [(type(e), e.source_range.lexeme) for e in errors] == expected_errors
+
+
+def test_statement_types() -> None:
+    _, inferred_types, _ = _infer('let a = 1; a + 2; "s"; {}; (x) -> x;')
+    assert format_types(*inferred_types.statement_types) == [
+        "Nothing",
+        "Int",
+        "Str",
+        "Nothing",
+        "('a) -> 'a",
+    ]
+
+
+def test_error_messages() -> None:
+    _, _, errors = _infer('let f = (x) -> x + 1;\nf(true);\n"a" - "b";')
+    assert [e.message for e in errors] == [
+        "This has the type `(Int) -> Int`, but `(Bool) -> Int` was expected.",
+        "The operator `-` can't be used with the type `Str`.",
+    ]
+    assert errors[0].source_range.start.line_index_and_column == (1, 0)
+
+
+def test_find_compresses_paths() -> None:
+    variables = [TypeVariable(0) for _ in range(10)]
+    for variable, next_variable in zip(variables, variables[1:]):
+        variable.link = next_variable
+    variables[-1].link = INT_TYPE
+    assert find(variables[0]) is INT_TYPE
+    assert all(v.link is INT_TYPE for v in variables)
+
+
+def test_deep_nesting_doesnt_recurse() -> None:
+    depth = 2 * sys.getrecursionlimit()
+    _, inferred_types, errors = _infer(
+        "let x = 1.5;" + "(" * depth + "x" + " + 1.0) * 2.0" * depth + ";"
+    )
+    assert errors == []
+    assert format_types(inferred_types.statement_types[-1]) == ["Float"]
+
+
+@pytest.mark.timeout(60)
+def test_deep_generic_types_dont_recurse() -> None:
+    depth = 2 * sys.getrecursionlimit()
+    binding_types, _, errors = _infer("let g = " + "(x) -> " * depth + "x;\nlet h = g;")
+    assert errors == []
+    # Each parameter has its own variable, and the innermost one is returned
+    assert binding_types["h"].count(" -> ") == depth
+    assert binding_types["h"].startswith("('a) -> ('b) -> ")
+    last_name = "'" + chr(ord("a") + (depth - 1) % 26) + str((depth - 1) // 26)
+    assert binding_types["h"].endswith(f"({last_name}) -> {last_name}")
+
+
+def test_check_command(tmp_path: Path) -> None:
+    file_path = tmp_path / "example.wode"
+    file_path.write_text('let a = 1;\na + "b";\n')
+    result = CliRunner(mix_stderr=False).invoke(cli, ["check", str(file_path)])
+    assert result.exit_code == 1
+    assert "This has the type `Str`, but `Int` was expected." in result.stderr
@@ -25,6 +25,7 @@ def test_is_whitespace():
 def test_safe_slice():
     assert safe_slice(["a", "b", "c"], start=1, end=2) == ["b"]
     assert safe_slice(["a", "b", "c"], start=1, length=1) == ["b"]
+    assert safe_slice(["a", "b", "c"], start=3, length=0) == []
     with pytest.raises(IndexError):
         safe_slice(["a", "b", "c"], start=2, end=10)
     with pytest.raises(IndexError):
@@ -38,3 +39,7 @@ def test_safe_slice():
 def test_safe_substring():
     assert safe_substring("abc", start=1, end=2) == "b"
     assert safe_substring("abc", start=1, length=1) == "b"
+    with pytest.raises(IndexError):
+        safe_substring("abc", start=2, length=2)
+    assert safe_substring("abc", start=3, length=0) == ""
+    assert safe_substring("abc", start=-1, end=1) == "ca"
@@ -0,0 +1,66 @@
+import math
+import timeit
+
+from wode.types import (
+    Any,
+    Callable,
+    Float,
+    Int,
+    List,
+    NamedTuple,
+    Sequence,
+    Str,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+
+def estimate_growth_exponent(sizes: Sequence[Int], times: Sequence[Float]) -> Float:
+    """Estimate `k` where the time grows like `size ** k`, from the slope of a least-squares fit on a log-log scale."""
+    if len(sizes) != len(times) or len(sizes) < 2:
+        raise ValueError("At least two sizes and times are needed.")
+    log_sizes = [math.log(s) for s in sizes]
+    # Clamp the times so a measurement of zero doesn't break the logarithm
+    log_times = [math.log(max(t, 1e-9)) for t in times]
+    mean_log_size = sum(log_sizes) / len(log_sizes)
+    mean_log_time = sum(log_times) / len(log_times)
+    covariance = sum(
+        (x - mean_log_size) * (y - mean_log_time) for x, y in zip(log_sizes, log_times)
+    )
+    variance = sum((x - mean_log_size) ** 2 for x in log_sizes)
+    return covariance / variance
+
+
+class ScalingMeasurement(NamedTuple):
+    name: Str
+    sizes: List[Int]
+    times: List[Float]
+
+    @property
+    def growth_exponent(self) -> Float:
+        return estimate_growth_exponent(self.sizes, self.times)
+
+    def __str__(self) -> Str:
+        timings = ", ".join(
+            f"{size}: {time * 1000:.2f} ms"
+            for size, time in zip(self.sizes, self.times)
+        )
+        return f"{self.name} grows like n^{self.growth_exponent:.2f} ({timings})"
+
+
+def measure_scaling(
+    name: Str,
+    make_input: Callable[[Int], T],
+    run: Callable[[T], Any],
+    sizes: Sequence[Int],
+    repeat: Int = 3,
+) -> ScalingMeasurement:
+    """Time a function on inputs of increasing size, keeping the fastest of a few runs to reduce noise."""
+    times: List[Float] = []
+    for size in sizes:
+        input_value = make_input(size)
+        times.append(
+            min(timeit.repeat(lambda: run(input_value), number=1, repeat=repeat))
+        )
+    return ScalingMeasurement(name, List(sizes), times)
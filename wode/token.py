@@ -1,9 +1,31 @@
+from enum import Enum
+
 from wode.source import Source, SourceRange
+from wode.symbol_table import SymbolTable
 from wode.token_type import TokenType
-from wode.types import Str
+from wode.types import Int, NamedTuple, Optional, Str, Tuple
+
+
+class TriviaType(Enum):
+    WHITESPACE = "whitespace"
+    COMMENT = "comment"
+
+
+class Trivia(NamedTuple):
+    """Whitespace or a comment, stored as offsets into the source code instead of a copy of the text."""
+
+    trivia_type: TriviaType
+    start: Int
+    end: Int
+
+    def get_text(self, source: Source) -> Str:
+        return source.code[self.start : self.end]
 
 
 class Token:
+    # The whitespace and comments before the token, only filled in when scanning with `keep_trivia`
+    leading_trivia: Tuple[Trivia, ...] = ()
+
     def __init__(self, token_type: TokenType, source_range: SourceRange) -> None:
         self.token_type = token_type
         self.source_range = source_range
@@ -12,6 +34,28 @@ class Token:
     def lexeme(self) -> Str:
         return self.source_range.lexeme
 
+    @property
+    def symbol_id(self) -> Optional[Int]:
+        return None
+
+
+class IdentifierToken(Token):
+    def __init__(
+        self, source_range: SourceRange, symbol_table: SymbolTable, symbol_id: Int
+    ) -> None:
+        super().__init__(TokenType.IDENTIFIER, source_range)
+        self.symbol_table = symbol_table
+        self._symbol_id = symbol_id
+
+    @property
+    def lexeme(self) -> Str:
+        # The name was interned when the token was scanned, so there's no need to read the source again
+        return self.symbol_table.get_name(self._symbol_id)
+
+    @property
+    def symbol_id(self) -> Int:
+        return self._symbol_id
+
 
 class EOFToken(Token):
     def __init__(self, source: Source) -> None:
@@ -0,0 +1,90 @@
+from array import array
+
+from wode.source import Source, SourceRange
+from wode.symbol_table import SymbolTable
+from wode.token import EOFToken, IdentifierToken, Token
+from wode.token_type import TokenType
+from wode.types import Int, List, Optional, Sequence, Str
+
+# Token types are stored as their index in this list so they fit in a single byte
+TOKEN_TYPES = List(TokenType)
+TOKEN_TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+# Stored in the symbol ID array for tokens that aren't identifiers
+NO_SYMBOL_ID = -1
+
+
+class TokenStream:
+    """A compact struct-of-arrays representation of a list of tokens.
+
+    Each token is stored as a type code and a pair of offsets into the source code, so a token costs a handful of bytes instead of a `Token`, `SourceRange` and two `SourcePosition` objects.
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        token_type_codes: Sequence[Int],
+        starts: Sequence[Int],
+        ends: Sequence[Int],
+        symbol_ids: Sequence[Int],
+        symbol_table: Optional[SymbolTable] = None,
+    ) -> None:
+        self.source = source
+        self.token_type_codes = token_type_codes
+        self.starts = starts
+        self.ends = ends
+        self.symbol_ids = symbol_ids
+        self.symbol_table = symbol_table
+
+    @classmethod
+    def from_tokens(
+        cls,
+        source: Source,
+        tokens: List[Token],
+        symbol_table: Optional[SymbolTable] = None,
+    ) -> "TokenStream":
+        token_type_codes = array("B")
+        starts = array("i")
+        ends = array("i")
+        symbol_ids = array("i")
+        for token in tokens:
+            token_type_codes.append(TOKEN_TYPE_CODES[token.token_type])
+            starts.append(token.source_range.start.position)
+            ends.append(token.source_range.end.position)
+            match token:
+                case IdentifierToken():
+                    symbol_ids.append(token.symbol_id)
+                    if symbol_table is None:
+                        symbol_table = token.symbol_table
+                case _:
+                    symbol_ids.append(NO_SYMBOL_ID)
+        return cls(source, token_type_codes, starts, ends, symbol_ids, symbol_table)
+
+    def __len__(self) -> Int:
+        return len(self.token_type_codes)
+
+    def get_token_type(self, index: Int) -> TokenType:
+        return TOKEN_TYPES[self.token_type_codes[index]]
+
+    def get_source_range(self, index: Int) -> SourceRange:
+        return SourceRange(self.source, self.starts[index], self.ends[index])
+
+    def get_lexeme(self, index: Int) -> Str:
+        return self.source.code[self.starts[index] : self.ends[index]]
+
+    def get_lexeme_view(self, index: Int) -> memoryview:
+        return self.source.get_lexeme_view(self.starts[index], self.ends[index])
+
+    def get_token(self, index: Int) -> Token:
+        token_type = self.get_token_type(index)
+        if token_type == TokenType.EOF:
+            return EOFToken(self.source)
+        symbol_id = self.symbol_ids[index]
+        if symbol_id != NO_SYMBOL_ID and self.symbol_table is not None:
+            return IdentifierToken(
+                self.get_source_range(index), self.symbol_table, symbol_id
+            )
+        return Token(token_type, self.get_source_range(index))
+
+    def to_tokens(self) -> List[Token]:
+        return [self.get_token(i) for i in range(len(self))]
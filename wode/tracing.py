@@ -0,0 +1,196 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from enum import Enum
+
+from wode.errors import WodeError
+from wode.source import Source
+from wode.types import (
+    Any,
+    Bool,
+    Dict,
+    Float,
+    Generator,
+    Int,
+    List,
+    Optional,
+    Str,
+    TypeVar,
+)
+
+
+class Phase(Enum):
+    SCAN = "scan"
+    PARSE = "parse"
+    RESOLVE = "resolve"
+    INFER = "infer"
+    RENDER = "render"
+
+
+class Observer:
+    """Receives events from the entry points of each phase, from scanning to rendering.
+
+    Every hook does nothing by default, so subclasses only need to override the hooks they're interested in.
+    """
+
+    def on_phase_start(self, phase: Phase, source: Optional[Source]) -> None:
+        pass
+
+    def on_phase_end(
+        self,
+        phase: Phase,
+        source: Optional[Source],
+        elapsed: Float,
+        item_count: Int,
+        errors: List[WodeError],
+    ) -> None:
+        pass
+
+    def on_cache_lookup(self, cache_name: Str, hit: Bool) -> None:
+        pass
+
+
+# The registered observers, entry points skip all tracing work when this is empty
+_observers: List[Observer] = []
+
+
+def add_observer(observer: Observer) -> None:
+    _observers.append(observer)
+
+
+def remove_observer(observer: Observer) -> None:
+    _observers.remove(observer)
+
+
+ObserverType = TypeVar("ObserverType", bound=Observer)
+
+
+@contextmanager
+def observing(observer: ObserverType) -> Generator[ObserverType, None, None]:
+    add_observer(observer)
+    try:
+        yield observer
+    finally:
+        remove_observer(observer)
+
+
+def start_phase(phase: Phase, source: Optional[Source]) -> Optional[Float]:
+    if not _observers:
+        return None
+    for observer in _observers:
+        observer.on_phase_start(phase, source)
+    return time.perf_counter()
+
+
+def end_phase(
+    phase: Phase,
+    source: Optional[Source],
+    start_time: Optional[Float],
+    item_count: Int,
+    errors: List[WodeError],
+) -> None:
+    if start_time is None or not _observers:
+        return
+    elapsed = time.perf_counter() - start_time
+    for observer in _observers:
+        observer.on_phase_end(phase, source, elapsed, item_count, errors)
+
+
+def record_cache_lookup(cache_name: Str, hit: Bool) -> None:
+    for observer in _observers:
+        observer.on_cache_lookup(cache_name, hit)
+
+
+# Upper bounds of the latency histogram buckets in seconds, the last bucket catches everything slower
+LATENCY_BUCKETS = [
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+]
+
+
+class LatencyHistogram:
+    def __init__(self, buckets: List[Float] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, elapsed: Float) -> None:
+        self.counts[bisect_left(self.buckets, elapsed)] += 1
+        self.count += 1
+        self.total += elapsed
+
+    def to_json(self) -> Dict[Str, Any]:
+        return {
+            "buckets": self.buckets,
+            "counts": self.counts,
+            "count": self.count,
+            "total": self.total,
+        }
+
+
+class MetricsAggregator(Observer):
+    """An observer that aggregates metrics in memory so they can be exported with `snapshot`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latencies = {phase: LatencyHistogram() for phase in Phase}
+            self.item_counts = {phase: 0 for phase in Phase}
+            self.error_counts: Dict[Str, Int] = {}
+            self.cache_hits: Dict[Str, Int] = {}
+            self.cache_misses: Dict[Str, Int] = {}
+
+    def on_phase_end(
+        self,
+        phase: Phase,
+        source: Optional[Source],
+        elapsed: Float,
+        item_count: Int,
+        errors: List[WodeError],
+    ) -> None:
+        with self._lock:
+            self.latencies[phase].record(elapsed)
+            self.item_counts[phase] += item_count
+            for error in errors:
+                self.error_counts[error.error_type] = (
+                    self.error_counts.get(error.error_type, 0) + 1
+                )
+
+    def on_cache_lookup(self, cache_name: Str, hit: Bool) -> None:
+        with self._lock:
+            counts = self.cache_hits if hit else self.cache_misses
+            counts[cache_name] = counts.get(cache_name, 0) + 1
+
+    def snapshot(self) -> Dict[Str, Any]:
+        with self._lock:
+            return {
+                "latencies": {
+                    phase.value: histogram.to_json()
+                    for phase, histogram in self.latencies.items()
+                },
+                "item_counts": {
+                    phase.value: count for phase, count in self.item_counts.items()
+                },
+                "error_counts": dict(self.error_counts),
+                "cache_hits": dict(self.cache_hits),
+                "cache_misses": dict(self.cache_misses),
+            }
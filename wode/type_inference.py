@@ -0,0 +1,684 @@
+import sys
+
+from wode.ast import (
+    BinaryExpression,
+    BlockExpression,
+    CallExpression,
+    CommentExpression,
+    Expression,
+    ForExpression,
+    FunctionExpression,
+    GroupingExpression,
+    IfExpression,
+    LetStatement,
+    LiteralExpression,
+    MatchExpression,
+    ReturnStatement,
+    StructStatement,
+    UnaryExpression,
+    VariableExpression,
+    WhileExpression,
+    YieldStatement,
+)
+from wode.errors import (
+    InfiniteTypeError,
+    OperandTypeError,
+    TypeMismatchError,
+    UnknownTypeError,
+    WodeError,
+)
+from wode.resolver import Resolution
+from wode.source import Source, SourceRange
+from wode.token import Token
+from wode.token_type import TokenType
+from wode.tracing import Phase, end_phase, start_phase
+from wode.types import (
+    Bool,
+    Callable,
+    Dict,
+    Int,
+    List,
+    Optional,
+    Sequence,
+    Str,
+    Tuple,
+    Union,
+)
+from wode.utils import UnreachableError
+
+# The level of type variables that have been generalized, every use of a binding gets fresh copies of them
+GENERIC_LEVEL = sys.maxsize
+
+
+class TypeVariable:
+    """A type that isn't known yet, which is a node in a union-find forest.
+
+    Unifying a variable links it to another type, and `find` follows the links and compresses the path it took.
+    A variable's level is how many `let`s it's inside, so a `let` can generalize the variables above its own level without searching the environment for free variables.
+    """
+
+    __slots__ = ("link", "level", "rank")
+
+    def __init__(self, level: Int) -> None:
+        self.link: Optional[InferredType] = None
+        self.level = level
+        # An upper bound on the height of the variable's tree, the shorter tree is linked under the taller one
+        self.rank: Int = 0
+
+
+class TypeConstructor:
+    __slots__ = ("name", "arguments")
+
+    def __init__(self, name: Str, arguments: Tuple["InferredType", ...] = ()) -> None:
+        self.name = name
+        self.arguments = arguments
+
+
+InferredType = Union[TypeVariable, TypeConstructor]
+
+INT_TYPE = TypeConstructor("Int")
+FLOAT_TYPE = TypeConstructor("Float")
+STR_TYPE = TypeConstructor("Str")
+BOOL_TYPE = TypeConstructor("Bool")
+NOTHING_TYPE = TypeConstructor("Nothing")
+BUILTIN_TYPES = {
+    t.name: t for t in [INT_TYPE, FLOAT_TYPE, STR_TYPE, BOOL_TYPE, NOTHING_TYPE]
+}
+
+_FUNCTION = "->"
+_LIST = "List"
+
+_LITERAL_TYPES = {
+    TokenType.INTEGER: INT_TYPE,
+    TokenType.FLOAT: FLOAT_TYPE,
+    TokenType.STRING: STR_TYPE,
+    TokenType.TRUE: BOOL_TYPE,
+    TokenType.FALSE: BOOL_TYPE,
+    TokenType.NOTHING: NOTHING_TYPE,
+}
+
+# The types each arithmetic or comparison operator can be used with, once its operands' type is known
+_NUMBER_TYPE_NAMES = ("Int", "Float")
+_OPERAND_TYPE_NAMES = {
+    TokenType.PLUS: ("Int", "Float", "Str"),
+    TokenType.MINUS: _NUMBER_TYPE_NAMES,
+    TokenType.STAR: _NUMBER_TYPE_NAMES,
+    TokenType.SLASH: _NUMBER_TYPE_NAMES,
+    TokenType.CARET: _NUMBER_TYPE_NAMES,
+    TokenType.LESS: ("Int", "Float", "Str"),
+    TokenType.LESS_EQUAL: ("Int", "Float", "Str"),
+    TokenType.GREATER: ("Int", "Float", "Str"),
+    TokenType.GREATER_EQUAL: ("Int", "Float", "Str"),
+}
+_COMPARISON_OPERATORS = frozenset(
+    [
+        TokenType.EQUAL_EQUAL,
+        TokenType.BANG_EQUAL,
+        TokenType.LESS,
+        TokenType.LESS_EQUAL,
+        TokenType.GREATER,
+        TokenType.GREATER_EQUAL,
+    ]
+)
+
+# The kinds of work on the inferrer's stack
+_VISIT = 0
+_BUILD = 1
+_BIND = 2
+
+
+def function_type(
+    parameters: Sequence[InferredType], result: InferredType
+) -> TypeConstructor:
+    return TypeConstructor(_FUNCTION, (*parameters, result))
+
+
+def list_type(element: InferredType) -> TypeConstructor:
+    return TypeConstructor(_LIST, (element,))
+
+
+def find(inferred_type: InferredType) -> InferredType:
+    # Find the representative of the type's set, then point everything on the way straight at it
+    root = inferred_type
+    while isinstance(root, TypeVariable) and root.link is not None:
+        root = root.link
+    while isinstance(inferred_type, TypeVariable) and inferred_type.link is not None:
+        inferred_type.link, inferred_type = root, inferred_type.link
+    return root
+
+
+def format_types(*inferred_types: InferredType) -> List[Str]:
+    """Format types like `(Int, 'a) -> 'a`, naming their variables consistently across all of them."""
+    names: Dict[Int, Str] = {}
+
+    def format_type(inferred_type: InferredType) -> Str:
+        # Format the arguments of each constructor before the constructor, on an explicit stack so deeply nested types don't recurse
+        formatted: List[Str] = []
+        stack: List[Tuple[InferredType, Bool]] = [(inferred_type, False)]
+        while len(stack) > 0:
+            part, is_built = stack.pop()
+            part = find(part)
+            match part:
+                case TypeVariable():
+                    name = names.get(id(part))
+                    if name is None:
+                        index = len(names)
+                        name = (
+                            "'"
+                            + chr(ord("a") + index % 26)
+                            + (Str(index // 26) if index >= 26 else "")
+                        )
+                        names[id(part)] = name
+                    formatted.append(name)
+                case TypeConstructor(name=name, arguments=()):
+                    formatted.append(name)
+                case TypeConstructor(arguments=arguments) if not is_built:
+                    stack.append((part, True))
+                    stack.extend((a, False) for a in reversed(arguments))
+                case TypeConstructor(name=name, arguments=arguments):
+                    arguments_start = len(formatted) - len(arguments)
+                    formatted_arguments = formatted[arguments_start:]
+                    del formatted[arguments_start:]
+                    if name == _FUNCTION:
+                        parameters = ", ".join(formatted_arguments[:-1])
+                        formatted.append(f"({parameters}) -> {formatted_arguments[-1]}")
+                    else:
+                        formatted.append(f"{name}[{', '.join(formatted_arguments)}]")
+        return formatted[0]
+
+    return [format_type(t) for t in inferred_types]
+
+
+class InferredTypes:
+    def __init__(self, binding_types: List[InferredType]) -> None:
+        # The type of each binding, indexed like `Resolution.bindings`
+        self.binding_types = binding_types
+        # The type of each top level statement
+        self.statement_types: List[InferredType] = []
+
+
+def _get_source_range(expression: Expression) -> SourceRange:
+    first = _get_edge_token(expression, True).source_range
+    last = _get_edge_token(expression, False).source_range
+    return SourceRange(first.source, first.start, last.end)
+
+
+def _get_edge_token(expression: Expression, is_first: Bool) -> Token:
+    # Follow the leftmost or rightmost children down to a token, without recursing
+    while True:
+        match expression:
+            case LiteralExpression(literal=token) | VariableExpression(
+                token=token
+            ) | CommentExpression(token=token):
+                return token
+            case GroupingExpression(expression=inner):
+                expression = inner
+            case UnaryExpression(operator=operator, right=right):
+                if is_first:
+                    return operator
+                expression = right
+            case BinaryExpression(left=left, right=right):
+                expression = left if is_first else right
+            case CallExpression(callee=callee, right_bracket=right_bracket):
+                if not is_first:
+                    return right_bracket
+                expression = callee
+            case BlockExpression(
+                left_curly_bracket=left_curly_bracket,
+                right_curly_bracket=right_curly_bracket,
+            ):
+                return left_curly_bracket if is_first else right_curly_bracket
+            case FunctionExpression(parameters=parameters, arrow=arrow, body=body):
+                if not is_first:
+                    expression = body
+                elif len(parameters) > 0:
+                    return parameters[0]
+                else:
+                    return arrow
+            case IfExpression(keyword=keyword, bodies=bodies, else_body=else_body):
+                if is_first:
+                    return keyword
+                expression = bodies[-1] if else_body is None else else_body
+            case WhileExpression(keyword=keyword, body=body) | ForExpression(
+                keyword=keyword, body=body
+            ):
+                if is_first:
+                    return keyword
+                expression = body
+            case MatchExpression(
+                keyword=keyword, right_curly_bracket=right_curly_bracket
+            ):
+                return keyword if is_first else right_curly_bracket
+            case LetStatement(keyword=keyword, value=value):
+                if is_first:
+                    return keyword
+                expression = value
+            case ReturnStatement(keyword=keyword, value=value) | YieldStatement(
+                keyword=keyword, value=value
+            ):
+                if is_first or value is None:
+                    return keyword
+                expression = value
+            case StructStatement(keyword=keyword, name=name, field_types=field_types):
+                if is_first:
+                    return keyword
+                return name if len(field_types) == 0 else field_types[-1]
+            case _:  # pragma: no cover
+                raise UnreachableError(f"Unknown expression type `{type(expression)}`.")
+
+
+class _Inferrer:
+    def __init__(self) -> None:
+        self.level: Int = 0
+        self.errors: List[WodeError] = []
+        # Operands whose type is checked once everything has been unified
+        self.operands: List[Tuple[InferredType, Token, Expression]] = []
+
+    def new_variable(self) -> TypeVariable:
+        return TypeVariable(self.level)
+
+    def unify(
+        self, expected: InferredType, actual: InferredType, expression: Expression
+    ) -> None:
+        pairs = [(expected, actual)]
+        while len(pairs) > 0:
+            left, right = pairs.pop()
+            left = find(left)
+            right = find(right)
+            if left is right:
+                continue
+            match left, right:
+                case TypeVariable(), TypeVariable():
+                    # Union by rank keeps the trees shallow, the root keeps the outermost level
+                    if left.rank < right.rank:
+                        left, right = right, left
+                    elif left.rank == right.rank:
+                        left.rank += 1
+                    right.link = left
+                    left.level = min(left.level, right.level)
+                case TypeVariable(), TypeConstructor():
+                    if not self.bind(left, right):
+                        return self.report(
+                            InfiniteTypeError, expected, actual, expression
+                        )
+                case TypeConstructor(), TypeVariable():
+                    if not self.bind(right, left):
+                        return self.report(
+                            InfiniteTypeError, expected, actual, expression
+                        )
+                case TypeConstructor(), TypeConstructor():
+                    if left.name != right.name or len(left.arguments) != len(
+                        right.arguments
+                    ):
+                        return self.report(
+                            TypeMismatchError, expected, actual, expression
+                        )
+                    pairs.extend(zip(left.arguments, right.arguments))
+
+    def bind(self, variable: TypeVariable, inferred_type: TypeConstructor) -> Bool:
+        # Only the type being bound is searched, both for the variable and for variables that now escape to its level
+        stack: List[InferredType] = [inferred_type]
+        while len(stack) > 0:
+            part = find(stack.pop())
+            match part:
+                case TypeVariable():
+                    if part is variable:
+                        return False
+                    part.level = min(part.level, variable.level)
+                case TypeConstructor(arguments=arguments):
+                    stack.extend(arguments)
+        variable.link = inferred_type
+        return True
+
+    def report(
+        self,
+        error_type: Callable[[SourceRange, Str, Str], WodeError],
+        expected: InferredType,
+        actual: InferredType,
+        expression: Expression,
+    ) -> None:
+        expected_name, actual_name = format_types(expected, actual)
+        self.errors.append(
+            error_type(_get_source_range(expression), expected_name, actual_name)
+        )
+
+    def generalize(self, inferred_type: InferredType) -> None:
+        # Variables created inside the `let` that haven't escaped to an outer level can be copied at every use
+        stack = [inferred_type]
+        while len(stack) > 0:
+            part = find(stack.pop())
+            match part:
+                case TypeVariable():
+                    if self.level < part.level < GENERIC_LEVEL:
+                        part.level = GENERIC_LEVEL
+                case TypeConstructor(arguments=arguments):
+                    stack.extend(arguments)
+
+    def instantiate(self, inferred_type: InferredType) -> InferredType:
+        copies: Dict[Int, InferredType] = {}
+        # Copy the arguments of each constructor before the constructor, on an explicit stack so deeply nested types don't recurse
+        copied: List[InferredType] = []
+        stack: List[Tuple[InferredType, Bool]] = [(inferred_type, False)]
+        while len(stack) > 0:
+            part, is_built = stack.pop()
+            part = find(part)
+            match part:
+                case TypeVariable():
+                    if part.level != GENERIC_LEVEL:
+                        copied.append(part)
+                        continue
+                    variable_copy = copies.get(id(part))
+                    if variable_copy is None:
+                        variable_copy = copies[id(part)] = self.new_variable()
+                    copied.append(variable_copy)
+                case TypeConstructor(arguments=()):
+                    copied.append(part)
+                case TypeConstructor(arguments=arguments) if not is_built:
+                    stack.append((part, True))
+                    stack.extend((a, False) for a in reversed(arguments))
+                case TypeConstructor(name=name, arguments=arguments):
+                    arguments_start = len(copied) - len(arguments)
+                    copied_arguments = tuple(copied[arguments_start:])
+                    del copied[arguments_start:]
+                    copied.append(TypeConstructor(name, copied_arguments))
+        return copied[0]
+
+    def check_operands(self) -> None:
+        for operand_type, operator, expression in self.operands:
+            operand_type = find(operand_type)
+            # Operands of generic functions are only known at each call, and aren't checked
+            if (
+                isinstance(operand_type, TypeConstructor)
+                and operand_type.name not in _OPERAND_TYPE_NAMES[operator.token_type]
+            ):
+                self.errors.append(
+                    OperandTypeError(
+                        _get_source_range(expression),
+                        operator.lexeme,
+                        format_types(operand_type)[0],
+                    )
+                )
+
+
+def infer_all(
+    expressions: List[Expression],
+    resolution: Resolution,
+    source: Optional[Source] = None,
+    predefined_types: Optional[Dict[Str, InferredType]] = None,
+) -> Tuple[InferredTypes, List[WodeError]]:
+    start_time = start_phase(Phase.INFER, source)
+    inferred_types, errors = _infer(expressions, resolution, predefined_types or {})
+    end_phase(Phase.INFER, source, start_time, len(expressions), errors)
+    return inferred_types, errors
+
+
+def _infer(
+    expressions: List[Expression],
+    resolution: Resolution,
+    predefined_types: Dict[Str, InferredType],
+) -> Tuple[InferredTypes, List[WodeError]]:
+    inferrer = _Inferrer()
+    # Predefined names without a type can be used as anything
+    binding_types: List[InferredType] = [
+        predefined_types.get(name) or TypeVariable(GENERIC_LEVEL)
+        for name in resolution.predefined_names
+    ]
+    binding_types.extend(
+        TypeVariable(0) for _ in range(len(resolution.bindings) - len(binding_types))
+    )
+    inferred_types = InferredTypes(binding_types)
+    # Struct names are kept apart from values, like in OCaml
+    struct_types: Dict[Str, InferredType] = dict(BUILTIN_TYPES)
+
+    def get_binding_index(token: Token) -> Int:
+        declaration_site = resolution.get_declaration_site(token)
+        assert declaration_site is not None
+        return declaration_site.binding_index
+
+    def get_use_type(expression: Expression) -> InferredType:
+        binding_site = resolution.get_binding_site(expression)
+        # Unresolved names have already been reported by the resolver
+        if binding_site is None:
+            return inferrer.new_variable()
+        return inferrer.instantiate(binding_types[binding_site.binding_index])
+
+    # The types of the expressions that have been inferred, but not used by their parents yet
+    types: List[InferredType] = []
+    # The return type of each function that's being inferred
+    return_types: List[InferredType] = []
+    # Walk the trees with an explicit stack, children are inferred before their parent is built
+    stack: List[Tuple[Int, Expression]] = []
+    for expression in expressions:
+        stack.append((_VISIT, expression))
+        while len(stack) > 0:
+            action, item = stack.pop()
+            if action == _VISIT:
+                match item:
+                    case LiteralExpression(literal=literal):
+                        if literal.token_type == TokenType.IDENTIFIER:
+                            types.append(get_use_type(item))
+                        else:
+                            types.append(_LITERAL_TYPES[literal.token_type])
+                    case VariableExpression():
+                        types.append(get_use_type(item))
+                    case GroupingExpression(expression=inner):
+                        stack.append((_VISIT, inner))
+                    case UnaryExpression(right=right):
+                        stack.append((_BUILD, item))
+                        stack.append((_VISIT, right))
+                    case BinaryExpression(left=left, right=right):
+                        stack.append((_BUILD, item))
+                        stack.append((_VISIT, right))
+                        stack.append((_VISIT, left))
+                    case CallExpression(callee=callee, arguments=arguments):
+                        stack.append((_BUILD, item))
+                        for argument in reversed(arguments):
+                            stack.append((_VISIT, argument))
+                        stack.append((_VISIT, callee))
+                    case BlockExpression(statements=statements):
+                        stack.append((_BUILD, item))
+                        for statement in reversed(statements):
+                            stack.append((_VISIT, statement))
+                    case IfExpression(
+                        conditions=conditions, bodies=bodies, else_body=else_body
+                    ):
+                        stack.append((_BUILD, item))
+                        if else_body is not None:
+                            stack.append((_VISIT, else_body))
+                        for condition, body in reversed(list(zip(conditions, bodies))):
+                            stack.append((_VISIT, body))
+                            stack.append((_VISIT, condition))
+                    case WhileExpression(condition=condition, body=body):
+                        stack.append((_BUILD, item))
+                        stack.append((_VISIT, body))
+                        stack.append((_VISIT, condition))
+                    case ForExpression(iterable=iterable, body=body):
+                        # The loop variable's type comes from the iterable, so it's bound between them
+                        stack.append((_BUILD, item))
+                        stack.append((_VISIT, body))
+                        stack.append((_BIND, item))
+                        stack.append((_VISIT, iterable))
+                    case MatchExpression(subject=subject, arms=arms):
+                        stack.append((_BUILD, item))
+                        for arm in reversed(arms):
+                            stack.append((_VISIT, arm))
+                        stack.append((_BIND, item))
+                        stack.append((_VISIT, subject))
+                    case FunctionExpression(parameters=parameters, body=body):
+                        for parameter in parameters:
+                            binding_types[
+                                get_binding_index(parameter)
+                            ] = inferrer.new_variable()
+                        return_types.append(inferrer.new_variable())
+                        stack.append((_BUILD, item))
+                        stack.append((_VISIT, body))
+                    case LetStatement(name=name, value=value):
+                        # The value is inferred a level deeper, so its own variables can be generalized
+                        inferrer.level += 1
+                        if isinstance(value, FunctionExpression):
+                            # A function is monomorphic inside its own body
+                            binding_types[
+                                get_binding_index(name)
+                            ] = inferrer.new_variable()
+                        stack.append((_BUILD, item))
+                        stack.append((_VISIT, value))
+                    case ReturnStatement(value=value) | YieldStatement(value=value):
+                        stack.append((_BUILD, item))
+                        if value is not None:
+                            stack.append((_VISIT, value))
+                    case StructStatement(name=name, field_types=field_types):
+                        # A struct's name is a function that builds it from its fields
+                        struct_type = TypeConstructor(name.lexeme)
+                        struct_types[name.lexeme] = struct_type
+                        parameter_types: List[InferredType] = []
+                        for field_type in field_types:
+                            parameter_type = struct_types.get(field_type.lexeme)
+                            if parameter_type is None:
+                                inferrer.errors.append(
+                                    UnknownTypeError(field_type.source_range)
+                                )
+                                parameter_type = inferrer.new_variable()
+                            parameter_types.append(parameter_type)
+                        binding_types[get_binding_index(name)] = function_type(
+                            parameter_types, struct_type
+                        )
+                        types.append(NOTHING_TYPE)
+                    case CommentExpression():
+                        types.append(NOTHING_TYPE)
+                    case _:  # pragma: no cover
+                        raise UnreachableError(
+                            f"Unknown expression type `{type(item)}`."
+                        )
+                continue
+
+            if action == _BIND:
+                subject_type = types[-1]
+                match item:
+                    case ForExpression(variable=variable, iterable=iterable):
+                        element_type = inferrer.new_variable()
+                        inferrer.unify(list_type(element_type), subject_type, iterable)
+                        binding_types[get_binding_index(variable)] = element_type
+                    case MatchExpression(patterns=patterns):
+                        for pattern in patterns:
+                            literal = pattern.literal
+                            if literal.token_type == TokenType.IDENTIFIER:
+                                binding_types[get_binding_index(literal)] = subject_type
+                            else:
+                                inferrer.unify(
+                                    subject_type,
+                                    _LITERAL_TYPES[literal.token_type],
+                                    pattern,
+                                )
+                    case _:  # pragma: no cover
+                        pass
+                continue
+
+            match item:
+                case UnaryExpression(operator=operator, right=right):
+                    right_type = types[-1]
+                    if operator.token_type == TokenType.BANG:
+                        inferrer.unify(BOOL_TYPE, right_type, right)
+                        types[-1] = BOOL_TYPE
+                    else:
+                        inferrer.operands.append((right_type, operator, right))
+                case BinaryExpression(left=left, operator=operator, right=right):
+                    right_type = types.pop()
+                    left_type = types.pop()
+                    match operator.token_type:
+                        case TokenType.AMPERSAND_AMPERSAND | TokenType.BAR_BAR:
+                            inferrer.unify(BOOL_TYPE, left_type, left)
+                            inferrer.unify(BOOL_TYPE, right_type, right)
+                            types.append(BOOL_TYPE)
+                        case token_type:
+                            inferrer.unify(left_type, right_type, right)
+                            if token_type in _OPERAND_TYPE_NAMES:
+                                inferrer.operands.append((left_type, operator, left))
+                            types.append(
+                                BOOL_TYPE
+                                if token_type in _COMPARISON_OPERATORS
+                                else left_type
+                            )
+                case CallExpression(callee=callee, arguments=arguments):
+                    argument_types = types[len(types) - len(arguments) :]
+                    del types[len(types) - len(arguments) :]
+                    callee_type = types.pop()
+                    result_type = inferrer.new_variable()
+                    inferrer.unify(
+                        function_type(argument_types, result_type), callee_type, callee
+                    )
+                    types.append(result_type)
+                case BlockExpression(statements=statements):
+                    # A block's value is its last statement's, like a sequence of expressions in OCaml
+                    if len(statements) == 0:
+                        types.append(NOTHING_TYPE)
+                    else:
+                        last_type = types[-1]
+                        del types[len(types) - len(statements) :]
+                        types.append(last_type)
+                case IfExpression(
+                    conditions=conditions, bodies=bodies, else_body=else_body
+                ):
+                    n_branch_types = 2 * len(conditions) + (else_body is not None)
+                    branch_types = types[len(types) - n_branch_types :]
+                    del types[len(types) - n_branch_types :]
+                    for condition, condition_type in zip(conditions, branch_types[::2]):
+                        inferrer.unify(BOOL_TYPE, condition_type, condition)
+                    if else_body is None:
+                        types.append(NOTHING_TYPE)
+                    else:
+                        # Every branch has to have the same type as the first
+                        body_types = branch_types[1::2] + branch_types[-1:]
+                        for body, body_type in zip(
+                            bodies[1:] + [else_body], body_types[1:]
+                        ):
+                            inferrer.unify(body_types[0], body_type, body)
+                        types.append(body_types[0])
+                case WhileExpression(condition=condition):
+                    types.pop()
+                    inferrer.unify(BOOL_TYPE, types.pop(), condition)
+                    types.append(NOTHING_TYPE)
+                case ForExpression():
+                    del types[-2:]
+                    types.append(NOTHING_TYPE)
+                case MatchExpression(arms=arms):
+                    arm_types = types[len(types) - len(arms) :]
+                    del types[len(types) - len(arms) - 1 :]
+                    result_type = inferrer.new_variable()
+                    for arm, arm_type in zip(arms, arm_types):
+                        inferrer.unify(result_type, arm_type, arm)
+                    types.append(result_type)
+                case FunctionExpression(parameters=parameters, body=body):
+                    return_type = return_types.pop()
+                    inferrer.unify(return_type, types.pop(), body)
+                    types.append(
+                        function_type(
+                            [binding_types[get_binding_index(p)] for p in parameters],
+                            return_type,
+                        )
+                    )
+                case LetStatement(name=name, value=value):
+                    value_type = types.pop()
+                    binding_index = get_binding_index(name)
+                    if isinstance(value, FunctionExpression):
+                        inferrer.unify(binding_types[binding_index], value_type, value)
+                    inferrer.level -= 1
+                    inferrer.generalize(value_type)
+                    binding_types[binding_index] = value_type
+                    types.append(NOTHING_TYPE)
+                case ReturnStatement(value=value):
+                    value_type = NOTHING_TYPE if value is None else types.pop()
+                    # Returning outside a function is left for a later pass to report
+                    if len(return_types) > 0:
+                        inferrer.unify(return_types[-1], value_type, item)
+                    # Nothing after a return runs, so it can be used as any type
+                    types.append(inferrer.new_variable())
+                case YieldStatement(value=value):
+                    if value is not None:
+                        types.pop()
+                    types.append(NOTHING_TYPE)
+                case _:  # pragma: no cover
+                    pass
+        inferred_types.statement_types.append(types.pop())
+
+    inferrer.check_operands()
+    return inferred_types, inferrer.errors
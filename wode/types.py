@@ -2,15 +2,27 @@ import typing
 from typing import TypeAlias
 
 Any: TypeAlias = typing.Any
+BinaryIO = typing.BinaryIO
 Bool: TypeAlias = bool
+Callable = typing.Callable
+ContextManager = typing.ContextManager
+Coroutine = typing.Coroutine
+Dict = dict
 Float: TypeAlias = float
+FrozenSet = frozenset
+Generator = typing.Generator
 Int: TypeAlias = int
+Iterable = typing.Iterable
+Iterator = typing.Iterator
 List = list
 Literal = typing.Literal
 NamedTuple: TypeAlias = typing.NamedTuple
 Optional = typing.Optional
+Sequence = typing.Sequence
+Set = set
 Str: TypeAlias = str
 Tuple = tuple
 Type = typing.Type
 TypeVar: TypeAlias = typing.TypeVar
 Union = typing.Union
+cast = typing.cast
@@ -16,6 +16,18 @@ def is_whitespace(c: Str) -> Bool:
     return c in WHITESPACE_CHARACTERS
 
 
+def _get_stop(start: Int, length: Optional[Int], end: Optional[Int]) -> Int:
+    match (length, end):
+        case (None, None):
+            raise ValueError("One of `length` or `end` must be specified.")
+        case (None, end):
+            return end  # type: ignore
+        case (length, None):
+            return start + length  # type: ignore
+        case (length, end):
+            raise ValueError("One of `length` or `end` must be specified.")
+
+
 def safe_slice(
     iterator: List[T],
     *,
@@ -24,15 +36,14 @@ def safe_slice(
     end: Optional[Int] = None,
 ) -> List[T]:
     """Slice an iterator and raise an IndexError if you try to access an out of bounds index."""
-    match (length, end):
-        case (None, None):
-            raise ValueError("One of `length` or `end` must be specified.")
-        case (None, end):
-            return [iterator[i] for i in range(start, end)]  # type: ignore
-        case (length, None):
-            return [iterator[i] for i in range(start, start + length)]  # type: ignore
-        case (length, end):
-            raise ValueError("One of `length` or `end` must be specified.")
+    stop = _get_stop(start, length, end)
+    if start >= 0:
+        # Slicing silently truncates, so only the last index needs checking
+        if start < stop and stop > len(iterator):
+            raise IndexError(f"Index `{stop - 1}` is out of bounds.")
+        return iterator[start:stop]
+    # Negative indices wrap around one at a time, like indexing each item would
+    return [iterator[i] for i in range(start, stop)]
 
 
 def safe_substring(
@@ -43,7 +54,12 @@ def safe_substring(
     end: Optional[Int] = None,
 ) -> Str:
     """Get a substring and raise an IndexError if you try to access an out of bounds index."""
-    return "".join(safe_slice(List(s), start=start, length=length, end=end))
+    stop = _get_stop(start, length, end)
+    if start >= 0:
+        if start < stop and stop > len(s):
+            raise IndexError(f"Index `{stop - 1}` is out of bounds.")
+        return s[start:stop]
+    return "".join(s[i] for i in range(start, stop))
 
 
 class UnreachableError(Exception):